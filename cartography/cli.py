@@ -142,6 +142,27 @@ class CLI:
                 "removed from the graph. By default, cartography will use a UNIX timestamp as the update tag."
             ),
         )
+        parser.add_argument(
+            "--max-parallel-stages",
+            type=int,
+            default=1,
+            help=(
+                "Maximum number of sync stages (top-level modules) to run concurrently, each on its own Neo4j "
+                "session. A stage only starts once the stages it depends on have finished: `create-indexes` always "
+                "runs first, `analysis` always runs last, and modules that attach data to nodes written by other "
+                "modules (e.g. `trivy` after `aws`) wait for them. Default: 1, which runs all stages in sequence."
+            ),
+        )
+        parser.add_argument(
+            "--max-concurrent-cleanup-statements",
+            type=int,
+            default=1,
+            help=(
+                "Maximum number of statements of a node schema's cleanup job to run concurrently, each on its own "
+                "Neo4j session. Stale nodes are deleted first, then the stale relationships of each type at the same "
+                "time. Default: 1, which runs the statements in sequence."
+            ),
+        )
         parser.add_argument(
             "--aws-sync-all-profiles",
             action="store_true",
@@ -182,6 +203,37 @@ class CLI:
                 "syncing other accounts and delay raising an exception until the very end."
             ),
         )
+        parser.add_argument(
+            "--aws-max-concurrent-accounts",
+            type=int,
+            default=1,
+            help=(
+                "Maximum number of AWS accounts to sync concurrently when syncing multiple accounts (see "
+                "`--aws-sync-all-profiles`). Each account is synced with its own boto3 session and Neo4j session. "
+                "Failures are isolated per account in the same way as the sequential sync, and the cross-account "
+                "cleanup and analysis jobs run once all accounts have finished. Default: 1, which syncs accounts one "
+                "at a time."
+            ),
+        )
+        parser.add_argument(
+            "--aws-max-concurrent-regions",
+            type=int,
+            default=1,
+            help=(
+                "Maximum number of AWS regions to fetch data from concurrently, for the AWS resources that support it "
+                "(e.g. EC2 instances, subnets and security groups, Lambda, RDS). Fetched data is still loaded to Neo4j "
+                "one region at a time, in region order. Default: 1, which fetches one region at a time."
+            ),
+        )
+        parser.add_argument(
+            "--aws-s3-max-concurrent-buckets",
+            type=int,
+            default=10,
+            help=(
+                "Maximum number of S3 buckets per region whose ACLs, policies and configurations are fetched "
+                "concurrently. Fetched bucket details are loaded to Neo4j in batches as they arrive. Default: 10."
+            ),
+        )
         parser.add_argument(
             "--aws-cloudtrail-management-events-lookback-hours",
             type=int,
@@ -286,6 +338,17 @@ class CLI:
                 "jobs are executed."
             ),
         )
+        parser.add_argument(
+            "--incremental-analysis",
+            action="store_true",
+            help=(
+                "If set, the AWS EC2 and GCP Compute internet exposure analysis jobs only recompute the AWS accounts "
+                "and GCP projects that were updated by this sync, instead of the whole graph. An account or project "
+                "is updated if any of its resources was written with the current update tag. Jobs in "
+                "--analysis-job-directory that use the $AWS_ID or $PROJECT_ID parameter are always run once per "
+                "updated account or project."
+            ),
+        )
         parser.add_argument(
             "--okta-org-id",
             type=str,
@@ -341,6 +404,15 @@ class CLI:
                 "If omitted the default permission relationships will be created"
             ),
         )
+        parser.add_argument(
+            "--permission-relationships-workers",
+            type=int,
+            default=1,
+            help=(
+                "Number of processes to calculate AWS resource permission relationships with. Principals are split "
+                "evenly between the processes. Default: 1, which calculates them in the main process."
+            ),
+        )
         parser.add_argument(
             "--jamf-base-uri",
             type=str,
@@ -402,6 +474,16 @@ class CLI:
                 "The base url for the NIST CVE data. Default = https://services.nvd.nist.gov/rest/json/cves/2.0/"
             ),
         )
+        parser.add_argument(
+            "--nist-cve-cache-dir",
+            type=str,
+            default=None,
+            help=(
+                "Optional directory in which to cache the raw NIST NVD API responses of past date windows, compressed. "
+                "Reruns and syncs that resume after a failure read these responses from disk instead of downloading "
+                "them again."
+            ),
+        )
         parser.add_argument(
             "--cve-enabled",
             action="store_true",
@@ -444,6 +526,16 @@ class CLI:
                 "The port of your statsd server. Only used if --statsd-enabled is on. Default = UDP 8125."
             ),
         )
+        parser.add_argument(
+            "--profile-report-path",
+            type=str,
+            default=None,
+            help=(
+                "If set, profiles the sync and writes a JSON report of the wall time, rows sent, Neo4j counters and "
+                "server-side timings of each stage, timed intel function and Cypher statement to this path at the end "
+                "of the sync. Flamegraph-compatible folded stacks are written next to it with the .folded extension."
+            ),
+        )
         parser.add_argument(
             "--pagerduty-api-key-env-var",
             type=str,
@@ -700,6 +792,15 @@ class CLI:
                 "Required if you are using the Trivy module. Ignored otherwise."
             ),
         )
+        parser.add_argument(
+            "--trivy-s3-download-workers",
+            type=int,
+            default=10,
+            help=(
+                "Number of Trivy scan results to download and parse concurrently. Scan results whose S3 ETag did not "
+                "change since the previous sync are not downloaded again. Default: 10."
+            ),
+        )
         parser.add_argument(
             "--scaleway-org",
             type=str,
@@ -796,6 +897,17 @@ class CLI:
         else:
             config.neo4j_password = None
 
+        # Stage concurrency
+        if config.max_parallel_stages < 1:
+            raise ValueError(
+                f"--max-parallel-stages must be at least 1, got {config.max_parallel_stages}.",
+            )
+        if config.max_concurrent_cleanup_statements < 1:
+            raise ValueError(
+                "--max-concurrent-cleanup-statements must be at least 1, got "
+                f"{config.max_concurrent_cleanup_statements}.",
+            )
+
         # Selected modules
         if config.selected_modules:
             self.sync = cartography.sync.build_sync(config.selected_modules)
@@ -805,6 +917,31 @@ class CLI:
             # No need to store the returned value; we're using this for input validation.
             parse_and_validate_aws_requested_syncs(config.aws_requested_syncs)
 
+        if config.aws_max_concurrent_accounts < 1:
+            raise ValueError(
+                f"--aws-max-concurrent-accounts must be at least 1, got {config.aws_max_concurrent_accounts}.",
+            )
+
+        if config.aws_max_concurrent_regions < 1:
+            raise ValueError(
+                f"--aws-max-concurrent-regions must be at least 1, got {config.aws_max_concurrent_regions}.",
+            )
+
+        if config.aws_s3_max_concurrent_buckets < 1:
+            raise ValueError(
+                f"--aws-s3-max-concurrent-buckets must be at least 1, got {config.aws_s3_max_concurrent_buckets}.",
+            )
+
+        if config.trivy_s3_download_workers < 1:
+            raise ValueError(
+                f"--trivy-s3-download-workers must be at least 1, got {config.trivy_s3_download_workers}.",
+            )
+
+        if config.permission_relationships_workers < 1:
+            raise ValueError(
+                f"--permission-relationships-workers must be at least 1, got {config.permission_relationships_workers}.",
+            )
+
         # AWS regions
         if config.aws_regions:
             # No need to store the returned value; we're using this for input validation.
@@ -1,8 +1,18 @@
 import logging
+import queue
+import threading
+import time
+import weakref
+from itertools import chain
+from itertools import islice
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Union
 
@@ -14,9 +24,114 @@ from cartography.graph.querybuilder import build_ingestion_query
 from cartography.graph.querybuilder import build_matchlink_query
 from cartography.models.core.nodes import CartographyNodeSchema
 from cartography.models.core.relationships import CartographyRelSchema
-from cartography.util import batch
+from cartography.profiling import get_profiler
+from cartography.stats import get_stats_client
 
 logger = logging.getLogger(__name__)
+stat_handler = get_stats_client(__name__)
+
+# Number of rows written per transaction by load_graph_data(), unless a node schema specifies its own batch_size.
+DEFAULT_LOAD_BATCH_SIZE = 10000
+# Bounds for the automatically tuned batch size.
+MIN_LOAD_BATCH_SIZE = 100
+MAX_LOAD_BATCH_SIZE = 50000
+# Batches slower than this are halved, batches faster than a quarter of this are doubled (up to the maximum).
+TARGET_LOAD_BATCH_SECONDS = 5.0
+
+# `CREATE INDEX IF NOT EXISTS` statements that have already been run, per driver connection pool and database. Every
+# load() call needs the indexes for its schema, so this lets us send each index statement to Neo4j once per process
+# instead of once per load() call. Keyed weakly so that closed drivers do not accumulate here.
+_applied_index_queries: (
+    "weakref.WeakKeyDictionary[Any, Dict[Optional[str], Set[str]]]"
+) = weakref.WeakKeyDictionary()
+_applied_index_queries_lock = threading.Lock()
+
+
+def _get_applied_index_queries(neo4j_session: neo4j.Session) -> Optional[Set[str]]:
+    """
+    Returns the set of index queries already run against the driver and database behind the given session, or None if
+    the session does not expose them (e.g. a test double), in which case index queries are always run.
+    """
+    pool = getattr(neo4j_session, "_pool", None)
+    session_config = getattr(neo4j_session, "_config", None)
+    if pool is None or session_config is None:
+        return None
+    database = getattr(session_config, "database", None)
+    with _applied_index_queries_lock:
+        try:
+            per_database = _applied_index_queries.setdefault(pool, {})
+        except TypeError:
+            # The pool object cannot be weakly referenced.
+            return None
+        return per_database.setdefault(database, set())
+
+
+class AdaptiveBatchSize:
+    """
+    Tracks the number of rows to write per transaction for one ingestion query. The size is halved when a transaction
+    is slower than TARGET_LOAD_BATCH_SECONDS or hits a TransientError (e.g. a lock timeout or the transaction memory
+    limit), and doubled when transactions are comfortably fast, within [MIN_LOAD_BATCH_SIZE, maximum].
+    """
+
+    def __init__(self, initial: int, maximum: int):
+        self.maximum = max(maximum, MIN_LOAD_BATCH_SIZE)
+        self.size = min(max(initial, MIN_LOAD_BATCH_SIZE), self.maximum)
+        self._lock = threading.Lock()
+
+    def shrink(self) -> bool:
+        """
+        Halves the batch size. Returns False if it was already at MIN_LOAD_BATCH_SIZE.
+        """
+        with self._lock:
+            if self.size <= MIN_LOAD_BATCH_SIZE:
+                return False
+            self.size = max(self.size // 2, MIN_LOAD_BATCH_SIZE)
+            return True
+
+    def record(self, rows: int, elapsed_seconds: float, retried: bool) -> None:
+        """
+        Adjusts the batch size after a successful transaction of `rows` rows that took `elapsed_seconds`. `retried` is
+        True if the driver had to retry the transaction because of transient errors.
+        """
+        if retried or elapsed_seconds > TARGET_LOAD_BATCH_SECONDS:
+            self.shrink()
+        elif (
+            rows >= self.size
+            and elapsed_seconds < TARGET_LOAD_BATCH_SECONDS / 4
+            and self.size < self.maximum
+        ):
+            with self._lock:
+                self.size = min(self.size * 2, self.maximum)
+
+
+# Batch sizes tuned so far in this process, keyed by ingestion query, so that later loads of the same schema start from
+# the size that worked last time.
+_batch_sizes: Dict[Tuple[str, Optional[int]], AdaptiveBatchSize] = {}
+_batch_sizes_lock = threading.Lock()
+
+
+def _get_adaptive_batch_size(
+    query: str,
+    batch_size: Optional[int],
+) -> AdaptiveBatchSize:
+    with _batch_sizes_lock:
+        key = (query, batch_size)
+        if key not in _batch_sizes:
+            _batch_sizes[key] = AdaptiveBatchSize(
+                batch_size or DEFAULT_LOAD_BATCH_SIZE,
+                batch_size or MAX_LOAD_BATCH_SIZE,
+            )
+        return _batch_sizes[key]
+
+
+def _run_index_queries(neo4j_session: neo4j.Session, queries: List[str]) -> None:
+    applied_queries = _get_applied_index_queries(neo4j_session)
+    for query in queries:
+        if applied_queries is not None and query in applied_queries:
+            continue
+        neo4j_session.run(query)
+        if applied_queries is not None:
+            applied_queries.add(query)
 
 
 def read_list_of_values_tx(
@@ -216,25 +331,75 @@ def write_list_of_dicts_tx(
 def load_graph_data(
     neo4j_session: neo4j.Session,
     query: str,
-    dict_list: List[Dict[str, Any]],
+    dict_list: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    stat_name: Optional[str] = None,
     **kwargs,
 ) -> None:
     """
-    Writes data to the graph.
+    Writes data to the graph in batches, one transaction per batch. The batch size adapts to the observed transaction
+    latency and transient errors; see AdaptiveBatchSize.
     :param neo4j_session: The Neo4j session
     :param query: The Neo4j write query to run. This query is not meant to be handwritten, rather it should be generated
     with cartography.graph.querybuilder.build_ingestion_query().
-    :param dict_list: The data to load to the graph represented as a list of dicts.
+    :param dict_list: The data to load to the graph represented as a list or any other iterable of dicts. Iterables are
+    consumed lazily, one batch at a time.
+    :param batch_size: The starting and largest number of rows to write per transaction. Defaults to
+    DEFAULT_LOAD_BATCH_SIZE, which may grow up to MAX_LOAD_BATCH_SIZE for fast queries.
+    :param stat_name: If specified, the batch size and rows/sec of each batch are reported to statsd as
+    `<stat_name>.load_batch_size` and `<stat_name>.load_rows_per_second`.
     :param kwargs: Allows additional keyword args to be supplied to the Neo4j query.
     :return: None
     """
-    for data_batch in batch(dict_list, size=10000):
-        neo4j_session.write_transaction(
-            write_list_of_dicts_tx,
-            query,
-            DictList=data_batch,
-            **kwargs,
-        )
+    adaptive_batch_size = _get_adaptive_batch_size(query, batch_size)
+    profiler = get_profiler()
+    rows = iter(dict_list)
+    pending: List[Dict[str, Any]] = []
+    while True:
+        if len(pending) < adaptive_batch_size.size:
+            pending.extend(islice(rows, adaptive_batch_size.size - len(pending)))
+        if not pending:
+            break
+        data_batch = pending[: adaptive_batch_size.size]
+        pending = pending[adaptive_batch_size.size :]
+
+        attempts = 0
+        summary: Optional[neo4j.ResultSummary] = None
+
+        def _write_batch(tx: neo4j.Transaction) -> None:
+            nonlocal attempts, summary
+            attempts += 1
+            if profiler is None:
+                write_list_of_dicts_tx(tx, query, DictList=data_batch, **kwargs)
+            else:
+                # Consume the result inside the transaction to read its counters and server-side timings.
+                summary = tx.run(query, dict(kwargs, DictList=data_batch)).consume()
+
+        start = time.monotonic()
+        try:
+            neo4j_session.write_transaction(_write_batch)
+        except neo4j.exceptions.TransientError:
+            if not adaptive_batch_size.shrink():
+                raise
+            logger.warning(
+                "Transient error writing a batch of %d rows, retrying with batches of %d rows.",
+                len(data_batch),
+                adaptive_batch_size.size,
+                exc_info=True,
+            )
+            pending = data_batch + pending
+            continue
+        elapsed = time.monotonic() - start
+        adaptive_batch_size.record(len(data_batch), elapsed, retried=attempts > 1)
+        if profiler is not None:
+            profiler.record_query(query, elapsed, rows=len(data_batch), summary=summary)
+
+        if stat_name:
+            stat_handler.gauge(f"{stat_name}.load_batch_size", len(data_batch))
+            stat_handler.gauge(
+                f"{stat_name}.load_rows_per_second",
+                int(len(data_batch) / elapsed) if elapsed > 0 else len(data_batch),
+            )
 
 
 def ensure_indexes(
@@ -244,7 +409,7 @@ def ensure_indexes(
     """
     Creates indexes if they don't exist for the given CartographyNodeSchema object, as well as for all of the
     relationships defined on its `other_relationships` and `sub_resource_relationship` fields. This operation is
-    idempotent.
+    idempotent, and each index query is only sent once per process for a given driver and database.
 
     This ensures that every time we need to MATCH on a node to draw a relationship to it, the field used for the MATCH
     will be indexed, making the operation fast.
@@ -258,7 +423,7 @@ def ensure_indexes(
             raise ValueError(
                 'Query provided to `ensure_indexes()` does not start with "CREATE INDEX IF NOT EXISTS".',
             )
-        neo4j_session.run(query)
+    _run_index_queries(neo4j_session, queries)
 
 
 def ensure_indexes_for_matchlinks(
@@ -277,13 +442,28 @@ def ensure_indexes_for_matchlinks(
             raise ValueError(
                 'Query provided to `ensure_indexes_for_matchlinks()` does not start with "CREATE INDEX IF NOT EXISTS".',
             )
-        neo4j_session.run(query)
+    _run_index_queries(neo4j_session, queries)
+
+
+def _non_empty_iter(
+    items: Iterable[Dict[str, Any]],
+) -> Optional[Iterator[Dict[str, Any]]]:
+    """
+    Returns an iterator over the given items, or None if there are none. Only the first item of a generator is consumed
+    to find out, so that streamed data does not need to be materialized.
+    """
+    it = iter(items)
+    try:
+        first = next(it)
+    except StopIteration:
+        return None
+    return chain([first], it)
 
 
 def load(
     neo4j_session: neo4j.Session,
     node_schema: CartographyNodeSchema,
-    dict_list: List[Dict[str, Any]],
+    dict_list: Iterable[Dict[str, Any]],
     **kwargs,
 ) -> None:
     """
@@ -291,34 +471,44 @@ def load(
     to the graph and then performs the load operation.
     :param neo4j_session: The Neo4j session
     :param node_schema: The CartographyNodeSchema object to create indexes for and generate a query.
-    :param dict_list: The data to load to the graph represented as a list of dicts.
+    :param dict_list: The data to load to the graph represented as a list of dicts, or as a generator of dicts so that
+    large result sets can be streamed page by page without holding them in memory.
     :param kwargs: Allows additional keyword args to be supplied to the Neo4j query.
     :return: None
     """
-    if len(dict_list) == 0:
+    rows = _non_empty_iter(dict_list)
+    if rows is None:
         # If there is no data to load, save some time.
         return
     ensure_indexes(neo4j_session, node_schema)
     ingestion_query = build_ingestion_query(node_schema)
-    load_graph_data(neo4j_session, ingestion_query, dict_list, **kwargs)
+    load_graph_data(
+        neo4j_session,
+        ingestion_query,
+        rows,
+        batch_size=node_schema.batch_size,
+        stat_name=node_schema.label,
+        **kwargs,
+    )
 
 
 def load_matchlinks(
     neo4j_session: neo4j.Session,
     rel_schema: CartographyRelSchema,
-    dict_list: list[dict[str, Any]],
+    dict_list: Iterable[dict[str, Any]],
     **kwargs,
 ) -> None:
     """
     Main entrypoint for intel modules to write relationships to the graph between two existing nodes.
     :param neo4j_session: The Neo4j session
     :param rel_schema: The CartographyRelSchema object to generate a query.
-    :param dict_list: The data to load to the graph represented as a list of dicts. The dicts must contain the source and
-    target node ids.
+    :param dict_list: The data to load to the graph represented as a list or generator of dicts. The dicts must contain
+    the source and target node ids.
     :param kwargs: Allows additional keyword args to be supplied to the Neo4j query.
     :return: None
     """
-    if len(dict_list) == 0:
+    rows = _non_empty_iter(dict_list)
+    if rows is None:
         # If there is no data to load, save some time.
         return
 
@@ -337,4 +527,102 @@ def load_matchlinks(
     ensure_indexes_for_matchlinks(neo4j_session, rel_schema)
     matchlink_query = build_matchlink_query(rel_schema)
     logger.debug(f"Matchlink query: {matchlink_query}")
-    load_graph_data(neo4j_session, matchlink_query, dict_list, **kwargs)
+    load_graph_data(
+        neo4j_session,
+        matchlink_query,
+        rows,
+        stat_name=rel_schema.rel_label,
+        **kwargs,
+    )
+
+
+# Number of batches that LoadPipeline holds in memory before producers block.
+DEFAULT_PIPELINE_MAX_QUEUED_BATCHES = 4
+_PIPELINE_DONE = object()
+
+
+class LoadPipeline:
+    """
+    Overlaps fetching data from an API with writing it to Neo4j. Producers call submit() with a load function and its
+    arguments, and a background writer thread runs `load_func(neo4j_session, *args, **kwargs)` for each submission, in
+    submission order. At most `max_queued_batches` submissions wait in the queue; submit() blocks when the queue is
+    full so that memory stays bounded when the API is faster than the database.
+
+    The writer thread owns the session while the pipeline is open, so the caller must not use `neo4j_session` itself
+    until the `with` block exits. If a load fails, the error is raised from the next submit() call or when the `with`
+    block exits, and the remaining submissions are discarded.
+
+    Example:
+        with LoadPipeline(neo4j_session) as pipeline:
+            for region in regions:
+                data = transform(get(boto3_session, region))
+                pipeline.submit(load_subnets, data, region, current_aws_account_id, update_tag)
+        cleanup(neo4j_session, common_job_parameters)
+    """
+
+    def __init__(
+        self,
+        neo4j_session: neo4j.Session,
+        max_queued_batches: int = DEFAULT_PIPELINE_MAX_QUEUED_BATCHES,
+    ):
+        if max_queued_batches < 1:
+            raise ValueError("max_queued_batches must be a positive integer.")
+        self._neo4j_session = neo4j_session
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queued_batches)
+        self._error: Optional[BaseException] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "LoadPipeline":
+        self._writer = threading.Thread(
+            target=self._write_batches,
+            name="cartography-load-pipeline",
+            daemon=True,
+        )
+        self._writer.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        if exc_type is None and self._error is not None:
+            raise self._error
+
+    def submit(self, load_func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Queues `load_func(neo4j_session, *args, **kwargs)` to run on the writer thread, blocking while the queue is full.
+        :param load_func: A function taking a Neo4j session as its first argument, e.g. load() or a module's load_*().
+        :param args: Positional args to pass to `load_func` after the session.
+        :param kwargs: Keyword args to pass to `load_func`.
+        :return: None
+        """
+        if self._writer is None:
+            raise RuntimeError(
+                "LoadPipeline.submit() must be called inside a `with` block."
+            )
+        if self._error is not None:
+            raise self._error
+        self._queue.put((load_func, args, kwargs))
+
+    def close(self) -> None:
+        """
+        Waits for all submitted loads to finish and stops the writer thread.
+        """
+        if self._writer is None:
+            return
+        self._queue.put(_PIPELINE_DONE)
+        self._writer.join()
+        self._writer = None
+
+    def _write_batches(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _PIPELINE_DONE:
+                return
+            if self._error is not None:
+                # Keep draining so that producers blocked in submit() are released.
+                continue
+            load_func, args, kwargs = item
+            try:
+                load_func(self._neo4j_session, *args, **kwargs)
+            except BaseException as e:
+                logger.error("Pipelined load %r failed.", load_func, exc_info=True)
+                self._error = e
@@ -23,6 +23,13 @@ class Config:
     :param selected_modules: Comma-separated list of cartography top-level modules to sync. Optional.
     :type update_tag: int
     :param update_tag: Update tag for a cartography sync run. Optional.
+    :type max_parallel_stages: int
+    :param max_parallel_stages: Maximum number of sync stages to run concurrently, each on its own Neo4j session.
+        Stages only start once the stages they depend on have finished. Defaults to 1, which runs all stages in
+        sequence. Optional.
+    :type max_concurrent_cleanup_statements: int
+    :param max_concurrent_cleanup_statements: Maximum number of statements of a node schema's cleanup job to run
+        concurrently, each on its own Neo4j session. Defaults to 1, which runs the statements in sequence. Optional.
     :type aws_sync_all_profiles: bool
     :param aws_sync_all_profiles: If True, AWS sync will run for all non-default profiles in the AWS_CONFIG_FILE. If
         False (default), AWS sync will run using the default credentials only. Optional.
@@ -31,6 +38,15 @@ class Config:
     :type aws_best_effort_mode: bool
     :param aws_best_effort_mode: If True, AWS sync will not raise any exceptions, just log. If False (default),
         exceptions will be raised.
+    :type aws_max_concurrent_accounts: int
+    :param aws_max_concurrent_accounts: Maximum number of AWS accounts to sync concurrently, each with its own boto3
+        and Neo4j session. Defaults to 1, which syncs accounts one at a time. Optional.
+    :type aws_max_concurrent_regions: int
+    :param aws_max_concurrent_regions: Maximum number of AWS regions to fetch data from concurrently for the AWS
+        resources that support it. Data is still loaded to Neo4j one region at a time. Defaults to 1. Optional.
+    :type aws_s3_max_concurrent_buckets: int
+    :param aws_s3_max_concurrent_buckets: Maximum number of S3 buckets per region whose ACLs, policies and
+        configurations are fetched concurrently. Defaults to 10. Optional.
     :type aws_cloudtrail_management_events_lookback_hours: int
     :param aws_cloudtrail_management_events_lookback_hours: Number of hours back to retrieve CloudTrail management events from. Optional.
     :type azure_sync_all_subscriptions: bool
@@ -58,6 +74,10 @@ class Config:
         severity level will be synced. Valid values: LOW, MEDIUM, HIGH, CRITICAL. Optional.
     :type analysis_job_directory: str
     :param analysis_job_directory: Path to a directory tree containing analysis jobs to run. Optional.
+    :type incremental_analysis: bool
+    :param incremental_analysis: If True, the analysis jobs that have a scoped version in
+        cartography.data.jobs.scoped_analysis only recompute the AWS accounts and GCP projects updated by the current
+        sync. Optional.
     :type oci_sync_all_profiles: bool
     :param oci_sync_all_profiles: whether OCI will sync non-default profiles in OCI_CONFIG_FILE. Optional.
     :type okta_org_id: str
@@ -72,6 +92,9 @@ class Config:
     :param digitalocean_token: DigitalOcean access token. Optional.
     :type permission_relationships_file: str
     :param permission_relationships_file: File path for the resource permission relationships file. Optional.
+    :type permission_relationships_workers: int
+    :param permission_relationships_workers: Number of processes to calculate AWS resource permission relationships
+        with. Defaults to 1, which calculates them in the current process. Optional.
     :type jamf_base_uri: string
     :param jamf_base_uri: Jamf data provider base URI, e.g. https://example.com/JSSResource. Optional.
     :type jamf_user: string
@@ -90,6 +113,11 @@ class Config:
     :param statsd_host: If statsd_enabled is True, send metrics to this host. Optional.
     :type: statsd_port: int
     :param statsd_port: If statsd_enabled is True, send metrics to this port on statsd_host. Optional.
+    :type: profile_report_path: str
+    :param profile_report_path: If set, the sync is profiled and a JSON report of the wall time, rows sent, Neo4j
+        counters and server-side timings of each stage, timed function and Cypher statement is written to this path at
+        the end of the sync, together with flamegraph-compatible folded stacks in a `.folded` file next to it.
+        Optional.
     :type: k8s_kubeconfig: str
     :param k8s_kubeconfig: Path to kubeconfig file for kubernetes cluster(s). Optional
     :type: pagerduty_api_key: str
@@ -98,6 +126,9 @@ class Config:
     :param pagerduty_request_timeout: Seconds to timeout for pagerduty session requests. Optional
     :type: nist_cve_url: str
     :param nist_cve_url: NIST CVE data provider base URI, e.g. https://nvd.nist.gov/feeds/json/cve/1.1. Optional.
+    :type: nist_cve_cache_dir: str
+    :param nist_cve_cache_dir: Directory in which to cache the raw NIST NVD API responses of past date windows, so that
+        reruns and resumed syncs do not download them again. Optional.
     :type: gsuite_auth_method: str
     :param gsuite_auth_method: Auth method (delegated, oauth) used for Google Workspace. Optional.
     :type gsuite_config: str
@@ -152,6 +183,9 @@ class Config:
     :param trivy_s3_bucket: The S3 bucket name containing Trivy scan results. Optional.
     :type trivy_s3_prefix: str
     :param trivy_s3_prefix: The S3 prefix path containing Trivy scan results. Optional.
+    :type trivy_s3_download_workers: int
+    :param trivy_s3_download_workers: Number of Trivy scan results to download and parse concurrently. Defaults to 10.
+        Optional.
     :type scaleway_access_key: str
     :param scaleway_access_key: Scaleway access key. Optional.
     :type scaleway_secret_key: str
@@ -175,9 +209,14 @@ class Config:
         neo4j_database=None,
         selected_modules=None,
         update_tag=None,
+        max_parallel_stages=1,
+        max_concurrent_cleanup_statements=1,
         aws_sync_all_profiles=False,
         aws_regions=None,
         aws_best_effort_mode=False,
+        aws_max_concurrent_accounts=1,
+        aws_max_concurrent_regions=1,
+        aws_s3_max_concurrent_buckets=10,
         aws_cloudtrail_management_events_lookback_hours=None,
         azure_sync_all_subscriptions=False,
         azure_sp_auth=None,
@@ -190,6 +229,7 @@ class Config:
         aws_requested_syncs=None,
         aws_guardduty_severity_threshold=None,
         analysis_job_directory=None,
+        incremental_analysis=False,
         oci_sync_all_profiles=None,
         okta_org_id=None,
         okta_api_key=None,
@@ -197,6 +237,7 @@ class Config:
         github_config=None,
         digitalocean_token=None,
         permission_relationships_file=None,
+        permission_relationships_workers=1,
         jamf_base_uri=None,
         jamf_user=None,
         jamf_password=None,
@@ -208,9 +249,11 @@ class Config:
         statsd_prefix=None,
         statsd_host=None,
         statsd_port=None,
+        profile_report_path=None,
         pagerduty_api_key=None,
         pagerduty_request_timeout=None,
         nist_cve_url=None,
+        nist_cve_cache_dir=None,
         cve_enabled=False,
         cve_api_key: str | None = None,
         crowdstrike_client_id=None,
@@ -243,6 +286,7 @@ class Config:
         airbyte_api_url=None,
         trivy_s3_bucket=None,
         trivy_s3_prefix=None,
+        trivy_s3_download_workers=10,
         scaleway_access_key=None,
         scaleway_secret_key=None,
         scaleway_org=None,
@@ -257,9 +301,14 @@ class Config:
         self.neo4j_database = neo4j_database
         self.selected_modules = selected_modules
         self.update_tag = update_tag
+        self.max_parallel_stages = max_parallel_stages
+        self.max_concurrent_cleanup_statements = max_concurrent_cleanup_statements
         self.aws_sync_all_profiles = aws_sync_all_profiles
         self.aws_regions = aws_regions
         self.aws_best_effort_mode = aws_best_effort_mode
+        self.aws_max_concurrent_accounts = aws_max_concurrent_accounts
+        self.aws_max_concurrent_regions = aws_max_concurrent_regions
+        self.aws_s3_max_concurrent_buckets = aws_s3_max_concurrent_buckets
         self.aws_cloudtrail_management_events_lookback_hours = (
             aws_cloudtrail_management_events_lookback_hours
         )
@@ -274,6 +323,7 @@ class Config:
         self.aws_requested_syncs = aws_requested_syncs
         self.aws_guardduty_severity_threshold = aws_guardduty_severity_threshold
         self.analysis_job_directory = analysis_job_directory
+        self.incremental_analysis = incremental_analysis
         self.oci_sync_all_profiles = oci_sync_all_profiles
         self.okta_org_id = okta_org_id
         self.okta_api_key = okta_api_key
@@ -281,6 +331,7 @@ class Config:
         self.github_config = github_config
         self.digitalocean_token = digitalocean_token
         self.permission_relationships_file = permission_relationships_file
+        self.permission_relationships_workers = permission_relationships_workers
         self.jamf_base_uri = jamf_base_uri
         self.jamf_user = jamf_user
         self.jamf_password = jamf_password
@@ -292,9 +343,11 @@ class Config:
         self.statsd_prefix = statsd_prefix
         self.statsd_host = statsd_host
         self.statsd_port = statsd_port
+        self.profile_report_path = profile_report_path
         self.pagerduty_api_key = pagerduty_api_key
         self.pagerduty_request_timeout = pagerduty_request_timeout
         self.nist_cve_url = nist_cve_url
+        self.nist_cve_cache_dir = nist_cve_cache_dir
         self.cve_enabled = cve_enabled
         self.cve_api_key: str | None = cve_api_key
         self.crowdstrike_client_id = crowdstrike_client_id
@@ -327,6 +380,7 @@ class Config:
         self.airbyte_api_url = airbyte_api_url
         self.trivy_s3_bucket = trivy_s3_bucket
         self.trivy_s3_prefix = trivy_s3_prefix
+        self.trivy_s3_download_workers = trivy_s3_download_workers
         self.scaleway_access_key = scaleway_access_key
         self.scaleway_secret_key = scaleway_secret_key
         self.scaleway_org = scaleway_org
@@ -5,6 +5,8 @@ from marshmallow import ValidationError
 
 from cartography.driftdetect.serializers import ShortcutSchema
 from cartography.driftdetect.storage import FileSystem
+from cartography.driftdetect.storage import SQLITE_STATE_FILENAME
+from cartography.driftdetect.storage import SQLiteStateStore
 from cartography.driftdetect.util import valid_directory
 
 logger = logging.getLogger(__name__)
@@ -22,6 +24,11 @@ def run_add_shortcut(config):
         logger.error("Invalid Drift Detection Directory")
         return
     try:
+        if config.state_store == "sqlite":
+            add_shortcut_sqlite(
+                config.query_directory, config.shortcut, config.filename
+            )
+            return
         add_shortcut(
             FileSystem,
             ShortcutSchema(),
@@ -68,3 +75,28 @@ def add_shortcut(storage, shortcut_serializer, query_directory, alias, filename)
     shortcut.shortcuts[alias] = fp
     new_shortcut_data = shortcut_serializer.dump(shortcut)
     storage.write(new_shortcut_data, shortcut_path)
+
+
+def add_shortcut_sqlite(query_directory, alias, snapshot):
+    """
+    Adds a shortcut to a state saved in the SQLite state store of a query directory. If a shortcut already exists for
+    an alias, it replaces that shortcut.
+
+    :type query_directory: String.
+    :param query_directory: Path to Query Directory.
+    :type alias: String.
+    :param alias: Alias for the state.
+    :type snapshot: String.
+    :param snapshot: Name of the state or shortcut to that state.
+    :return:
+    """
+    with SQLiteStateStore(
+        os.path.join(query_directory, SQLITE_STATE_FILENAME)
+    ) as store:
+        if store.has_snapshot(alias):
+            logger.error(
+                f"Shortcut {alias} is the name of another state in directory {query_directory}.",
+            )
+            return
+        if not store.add_shortcut(alias, snapshot):
+            logger.error(f"State {snapshot} not found in directory {query_directory}.")
@@ -98,6 +98,27 @@ class CLI:
                 "them. Drift-detection does not guarantee the order in which the detector jobs are executed."
             ),
         )
+        parser_get_state.add_argument(
+            "--state-store",
+            type=str,
+            choices=["json", "sqlite"],
+            default="json",
+            help=(
+                "Where to save states: 'json' (default) writes one JSON file per state to each query directory, 'sqlite' "
+                "saves them to a states.sqlite3 database in each query directory, which stores unchanged results once "
+                "and makes comparing states fast."
+            ),
+        )
+        parser_get_state.add_argument(
+            "--max-concurrent-queries",
+            type=int,
+            default=1,
+            help=(
+                "The number of drift detection queries to run at the same time, each in its own Neo4j read session. "
+                "With a neo4j:// URI, read sessions are routed to read replicas when the cluster has them. Defaults "
+                "to 1, which runs the queries one after the other."
+            ),
+        )
         parser_get_drift = subparsers.add_parser(
             name="get-drift",
             help=(
@@ -127,6 +148,23 @@ class CLI:
             default=None,
             help=("The filename of the later state chronologically to be compared to."),
         )
+        parser_get_drift.add_argument(
+            "--state-store",
+            type=str,
+            choices=["json", "sqlite"],
+            default="json",
+            help=(
+                "Where the states were saved by get-state: 'json' (default) or 'sqlite'."
+            ),
+        )
+        parser_get_drift.add_argument(
+            "--streaming",
+            action="store_true",
+            help=(
+                "Compare the states with bounded memory, for queries with very large results: results are read "
+                "incrementally and sorted on disk, and differences are reported as they are found."
+            ),
+        )
         parser_add_shortcut = subparsers.add_parser(
             name="add-shortcut",
             help=("Adds a shortcut to a specific file in a query directory."),
@@ -151,6 +189,15 @@ class CLI:
             default=None,
             help=("The desired name of the file to be replaced."),
         )
+        parser_add_shortcut.add_argument(
+            "--state-store",
+            type=str,
+            choices=["json", "sqlite"],
+            default="json",
+            help=(
+                "Where the states were saved by get-state: 'json' (default) or 'sqlite'."
+            ),
+        )
         return parser
 
     def configure(self, argv):
@@ -170,6 +217,10 @@ class CLI:
             logging.getLogger("driftdetect").setLevel(logging.INFO)
         logger.debug("Launching driftdetect with CLI configuration: %r", vars(config))
         if config.command == "get-state":
+            if config.max_concurrent_queries < 1:
+                raise ValueError(
+                    f"--max-concurrent-queries must be at least 1, got {config.max_concurrent_queries}.",
+                )
             config = configure_get_state_neo4j(config)
         return config
 
@@ -17,6 +17,12 @@ class UpdateConfig:
     :param neo4j_user: User name for a Neo4j graph database service. Optional.
     :type neo4j_password: string
     :param neo4j_password: Password for a Neo4j graph database service. Optional.
+    :type state_store: string
+    :param state_store: Where states are saved: "json" for one JSON file per state, or "sqlite" for a SQLite database
+        in each query directory. Optional, defaults to "json".
+    :type max_concurrent_queries: int
+    :param max_concurrent_queries: Number of queries to run at the same time, each in its own read session. Optional,
+        defaults to 1, which runs the queries one after the other in a single session.
     """
 
     def __init__(
@@ -25,11 +31,15 @@ class UpdateConfig:
         neo4j_uri: str,
         neo4j_user: Optional[str] = None,
         neo4j_password: Optional[str] = None,
+        state_store: str = "json",
+        max_concurrent_queries: int = 1,
     ):
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         self.drift_detection_directory = drift_detection_directory
+        self.state_store = state_store
+        self.max_concurrent_queries = max_concurrent_queries
 
 
 class GetDriftConfig:
@@ -45,6 +55,11 @@ class GetDriftConfig:
     :param start_state: Filename (without the directory prefix) of the earlier state to be compared with. Required.
     :type end_state: string
     :param end_state: Filename (without the directory prefix) of the later state to be compared with. Required.
+    :type state_store: string
+    :param state_store: Where states are read from: "json" or "sqlite", see UpdateConfig. Optional, defaults to "json".
+    :type streaming: bool
+    :param streaming: Compare the states with bounded memory and report differences as they are found, instead of
+        loading both states into memory. Optional, defaults to False.
     """
 
     def __init__(
@@ -52,10 +67,14 @@ class GetDriftConfig:
         query_directory: str,
         start_state: str,
         end_state: str,
+        state_store: str = "json",
+        streaming: bool = False,
     ):
         self.query_directory: str = query_directory
         self.start_state: str = start_state
         self.end_state: str = end_state
+        self.state_store: str = state_store
+        self.streaming: bool = streaming
 
 
 class AddShortcutConfig:
@@ -71,6 +90,8 @@ class AddShortcutConfig:
     :param shortcut: Name of shortcut to access the file. Required.
     :type filename: string
     :param filename: Filename (without the directory prefix) of the state to be shortcut. Required.
+    :type state_store: string
+    :param state_store: Where states are read from: "json" or "sqlite", see UpdateConfig. Optional, defaults to "json".
     """
 
     def __init__(
@@ -78,7 +99,9 @@ class AddShortcutConfig:
         query_directory: str,
         shortcut: str,
         filename: str,
+        state_store: str = "json",
     ):
         self.query_directory: str = query_directory
         self.shortcut: str = shortcut
         self.filename: str = filename
+        self.state_store: str = state_store
@@ -1,5 +1,12 @@
+import contextlib
+import heapq
+import itertools
+import json
 import logging
 import os
+import tempfile
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Union
 
@@ -8,19 +15,31 @@ from marshmallow import ValidationError
 from cartography.driftdetect.config import GetDriftConfig
 from cartography.driftdetect.model import State
 from cartography.driftdetect.reporter import report_drift
+from cartography.driftdetect.reporter import report_drift_streaming
 from cartography.driftdetect.serializers import ShortcutSchema
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
+from cartography.driftdetect.storage import SQLITE_STATE_FILENAME
+from cartography.driftdetect.storage import SQLiteStateStore
 from cartography.driftdetect.util import valid_directory
 
 logger = logging.getLogger(__name__)
 
+# Number of results sorted in memory at a time by a streaming comparison, see sort_results_on_disk().
+SORT_RUN_SIZE = 100000
+
 
 def run_drift_detection(config: GetDriftConfig) -> None:
     try:
         if not valid_directory(config.query_directory):
             logger.error("Invalid Drift Detection Directory")
             return
+        if config.state_store == "sqlite":
+            run_drift_detection_sqlite(config)
+            return
+        if config.streaming:
+            run_streaming_drift_detection(config)
+            return
         state_serializer = StateSchema()
         shortcut_serializer = ShortcutSchema()
         shortcut_data = FileSystem.load(
@@ -67,6 +86,158 @@ def run_drift_detection(config: GetDriftConfig) -> None:
         logger.exception(msg)
 
 
+def run_drift_detection_sqlite(config: GetDriftConfig) -> None:
+    """
+    Reports the drift between two states saved in the SQLite state store of the query directory.
+    """
+    with SQLiteStateStore(
+        os.path.join(config.query_directory, SQLITE_STATE_FILENAME),
+    ) as store:
+        start_state = store.get_header(config.start_state)
+        end_state = store.get_header(config.end_state)
+        _check_states_match(start_state, end_state)
+        if config.streaming:
+            report_drift_streaming(
+                (
+                    _to_drift(result)
+                    for result in store.iter_added_results(
+                        config.start_state,
+                        config.end_state,
+                    )
+                ),
+                (
+                    _to_drift(result)
+                    for result in store.iter_added_results(
+                        config.end_state,
+                        config.start_state,
+                    )
+                ),
+                end_state.name,
+                end_state.properties,
+            )
+            return
+        new_results = sorted(
+            store.iter_added_results(config.start_state, config.end_state),
+        )
+        missing_results = sorted(
+            store.iter_added_results(config.end_state, config.start_state),
+        )
+    report_drift(
+        [_to_drift(result) for result in new_results],
+        [_to_drift(result) for result in missing_results],
+        end_state.name,
+        end_state.properties,
+    )
+
+
+def run_streaming_drift_detection(config: GetDriftConfig) -> None:
+    """
+    Reports the drift between two JSON states with bounded memory, regardless of the size of the states: the results of
+    each state are read incrementally, sorted on disk, and merged, and the differences are reported as they are found.
+    """
+    shortcut = ShortcutSchema().load(
+        FileSystem.load(os.path.join(config.query_directory, "shortcut.json")),
+    )
+    start_path = os.path.join(
+        config.query_directory,
+        shortcut.shortcuts.get(config.start_state, config.start_state),
+    )
+    end_path = os.path.join(
+        config.query_directory,
+        shortcut.shortcuts.get(config.end_state, config.end_state),
+    )
+    state_serializer = StateSchema()
+    start_state = state_serializer.load(FileSystem.load_header(start_path))
+    end_state = state_serializer.load(FileSystem.load_header(end_path))
+    _check_states_match(start_state, end_state)
+    with tempfile.TemporaryDirectory(prefix="driftdetect-") as sort_directory:
+        start_runs = sort_results_on_disk(
+            FileSystem.iter_results(start_path),
+            sort_directory,
+        )
+        end_runs = sort_results_on_disk(
+            FileSystem.iter_results(end_path),
+            sort_directory,
+        )
+        report_drift_streaming(
+            (
+                _to_drift(result)
+                for result in iter_added_results(
+                    merge_sorted_runs(start_runs),
+                    merge_sorted_runs(end_runs),
+                )
+            ),
+            (
+                _to_drift(result)
+                for result in iter_added_results(
+                    merge_sorted_runs(end_runs),
+                    merge_sorted_runs(start_runs),
+                )
+            ),
+            end_state.name,
+            end_state.properties,
+        )
+
+
+def sort_results_on_disk(
+    results: Iterable[List[str]],
+    directory: str,
+    run_size: int = SORT_RUN_SIZE,
+) -> List[str]:
+    """
+    Splits the results into sorted runs of at most `run_size` results, each written to a file in `directory`.
+
+    :return: The paths of the runs, to be merged with merge_sorted_runs().
+    """
+    runs = []
+    results = iter(results)
+    for run in iter(lambda: list(itertools.islice(results, run_size)), []):
+        run.sort()
+        fd, path = tempfile.mkstemp(dir=directory, suffix=".jsonl")
+        with os.fdopen(fd, "w") as run_file:
+            for result in run:
+                run_file.write(json.dumps(result, separators=(",", ":")))
+                run_file.write("\n")
+        runs.append(path)
+    return runs
+
+
+def merge_sorted_runs(runs: List[str]) -> Iterator[List[str]]:
+    """
+    Yields the results of the runs written by sort_results_on_disk() in sorted order.
+    """
+    with contextlib.ExitStack() as stack:
+        files = [stack.enter_context(open(path)) for path in runs]
+        yield from heapq.merge(
+            *((json.loads(line) for line in run_file) for run_file in files),
+        )
+
+
+def iter_added_results(
+    start_results: Iterator[List[str]],
+    end_results: Iterator[List[str]],
+) -> Iterator[List[str]]:
+    """
+    Yields the results of `end_results` that are not in `start_results`, both of which must be sorted. Like
+    compare_states(), duplicates of an added result are all yielded.
+    """
+    start_result = next(start_results, None)
+    for result in end_results:
+        while start_result is not None and start_result < result:
+            start_result = next(start_results, None)
+        if start_result != result:
+            yield result
+
+
+def _check_states_match(start_state: State, end_state: State) -> None:
+    if start_state.name != end_state.name:
+        raise ValueError("State names do not match.")
+    if start_state.validation_query != end_state.validation_query:
+        raise ValueError("State queries do not match.")
+    if start_state.properties != end_state.properties:
+        raise ValueError("State properties do not match.")
+
+
 def perform_drift_detection(start_state: State, end_state: State):
     """
     Returns differences (additions and missing results) between two States.
@@ -78,12 +249,7 @@ def perform_drift_detection(start_state: State, end_state: State):
     :return: tuple of additions and subtractions between the end and start detector in the form of drift_info_detector
     pairs
     """
-    if start_state.name != end_state.name:
-        raise ValueError("State names do not match.")
-    if start_state.validation_query != end_state.validation_query:
-        raise ValueError("State queries do not match.")
-    if start_state.properties != end_state.properties:
-        raise ValueError("State properties do not match.")
+    _check_states_match(start_state, end_state)
     new_results = compare_states(start_state, end_state)
     missing_results = compare_states(end_state, start_state)
     return new_results, missing_results
@@ -105,12 +271,19 @@ def compare_states(start_state: State, end_state: State):
     for result in end_state.results:
         if tuple(result) in start_state_results:
             continue
-        drift: List[Union[str, List[str]]] = []
-        for field in result:
-            value = field.split("|")
-            if len(value) > 1:
-                drift.append(value)
-            else:
-                drift.append(field)
-        differences.append(drift)
+        differences.append(_to_drift(result))
     return differences
+
+
+def _to_drift(result: List[str]) -> List[Union[str, List[str]]]:
+    """
+    Splits the fields of a result that hold lists, which get_state() joins with "|".
+    """
+    drift: List[Union[str, List[str]]] = []
+    for field in result:
+        value = field.split("|")
+        if len(value) > 1:
+            drift.append(value)
+        else:
+            drift.append(field)
+    return drift
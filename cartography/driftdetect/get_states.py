@@ -1,10 +1,13 @@
 import logging
 import os.path
 import time
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
 from typing import List
 
+import neo4j
 import neo4j.exceptions
 from marshmallow import ValidationError
 from neo4j import GraphDatabase
@@ -16,6 +19,8 @@ from cartography.driftdetect.model import State
 from cartography.driftdetect.serializers import ShortcutSchema
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
+from cartography.driftdetect.storage import SQLITE_STATE_FILENAME
+from cartography.driftdetect.storage import SQLiteStateStore
 from cartography.driftdetect.util import valid_directory
 
 logger = logging.getLogger(__name__)
@@ -73,39 +78,95 @@ def run_get_states(config: UpdateConfig) -> None:
             )
         return
 
-    with neo4j_driver.session() as session:
-        filename = ".".join([str(i) for i in time.gmtime()] + ["json"])
-        state_serializer = StateSchema()
-        shortcut_serializer = ShortcutSchema()
-        for query_directory in FileSystem.walk(config.drift_detection_directory):
-            try:
-                get_query_state(
-                    session,
-                    query_directory,
-                    state_serializer,
-                    FileSystem,
-                    filename,
-                )
-                add_shortcut(
-                    FileSystem,
-                    shortcut_serializer,
-                    query_directory,
-                    "most-recent",
-                    filename,
-                )
-            except ValidationError as err:
-                msg = "Unable to create State for directory {}, with data \n{}".format(
-                    query_directory,
-                    err.messages,
-                )
-                logger.exception(msg)
-            except KeyError as err:
-                msg = f"Could not find {err} field in state template for directory {query_directory}."
-                logger.exception(msg)
-            except FileNotFoundError as err:
-                logger.exception(err)
-            except neo4j.exceptions.CypherSyntaxError as err:
-                logger.exception(err)
+    filename = ".".join([str(i) for i in time.gmtime()] + ["json"])
+    query_directories = list(FileSystem.walk(config.drift_detection_directory))
+    max_concurrent_queries = config.max_concurrent_queries
+    if max_concurrent_queries <= 1:
+        with neo4j_driver.session() as session:
+            for query_directory in query_directories:
+                update_query_directory(session, config, query_directory, filename)
+        return
+
+    logger.info(
+        f"Running {len(query_directories)} drift detection queries, up to {max_concurrent_queries} at a time.",
+    )
+
+    def update_in_own_session(query_directory: str) -> None:
+        # neo4j sessions are not thread-safe, so every query gets its own. Read sessions are routed to read replicas
+        # when the driver is connected to a cluster.
+        with neo4j_driver.session(
+            default_access_mode=neo4j.READ_ACCESS,
+        ) as session:
+            update_query_directory(session, config, query_directory, filename)
+
+    with ThreadPoolExecutor(
+        max_workers=max_concurrent_queries,
+        thread_name_prefix="driftdetect-get-state",
+    ) as executor:
+        for future in as_completed(
+            executor.submit(update_in_own_session, query_directory)
+            for query_directory in query_directories
+        ):
+            future.result()
+
+
+def update_query_directory(
+    session: neo4j.Session,
+    config: UpdateConfig,
+    query_directory: str,
+    filename: str,
+) -> None:
+    """
+    Gets the current state of the query in a query directory, saves it and points the `most-recent` shortcut to it.
+    Errors specific to the query directory are logged rather than raised, so that the other queries are still updated.
+
+    :type session: neo4j session.
+    :param session: neo4j session to connect to.
+    :type config: Config Object
+    :param config: Config Object from CLI
+    :type query_directory: String.
+    :param query_directory: Path to query directory.
+    :type filename: String.
+    :param filename: Name of the state file, or of the snapshot when states are saved to SQLite.
+    :return:
+    """
+    state_serializer = StateSchema()
+    try:
+        if config.state_store == "sqlite":
+            get_query_state_sqlite(
+                session,
+                query_directory,
+                state_serializer,
+                filename,
+            )
+        else:
+            get_query_state(
+                session,
+                query_directory,
+                state_serializer,
+                FileSystem,
+                filename,
+            )
+            add_shortcut(
+                FileSystem,
+                ShortcutSchema(),
+                query_directory,
+                "most-recent",
+                filename,
+            )
+    except ValidationError as err:
+        msg = "Unable to create State for directory {}, with data \n{}".format(
+            query_directory,
+            err.messages,
+        )
+        logger.exception(msg)
+    except KeyError as err:
+        msg = f"Could not find {err} field in state template for directory {query_directory}."
+        logger.exception(msg)
+    except FileNotFoundError as err:
+        logger.exception(err)
+    except neo4j.exceptions.CypherSyntaxError as err:
+        logger.exception(err)
 
 
 def get_query_state(
@@ -139,6 +200,40 @@ def get_query_state(
     return state
 
 
+def get_query_state_sqlite(
+    session: neo4j.Session,
+    query_directory: str,
+    state_serializer: StateSchema,
+    snapshot: str,
+) -> State:
+    """
+    Gets the most recent state of a query and saves it to the SQLite state store of the query directory, where it
+    becomes the `most-recent` shortcut.
+
+    :type session: neo4j session.
+    :param session: neo4j session to connect to.
+    :type query_directory: String.
+    :param query_directory: Path to query directory.
+    :type state_serializer: Schema
+    :param state_serializer: Schema to serialize and deserialize states.
+    :type snapshot: String.
+    :param snapshot: Name of the snapshot to save the state as.
+    :return: The created state.
+    """
+    state_data = FileSystem.load(os.path.join(query_directory, "template.json"))
+    state = state_serializer.load(state_data)
+    get_state(session, state)
+    with SQLiteStateStore(
+        os.path.join(query_directory, SQLITE_STATE_FILENAME),
+    ) as store:
+        if not store.save_state(state, snapshot):
+            logger.debug(
+                f"Results of {state.name} did not change since a previous state.",
+            )
+        store.add_shortcut("most-recent", snapshot)
+    return state
+
+
 def get_state(session: neo4j.Session, state: State) -> None:
     """
     Connects to a neo4j session, runs the validation query, then saves the results to a state.
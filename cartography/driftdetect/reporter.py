@@ -46,3 +46,30 @@ def report_drift(new_results, missing_results, state_name, state_properties):
     print()
     if missing_results:
         report_drift_missing(missing_results, state_properties)
+
+
+def report_drift_streaming(new_results, missing_results, state_name, state_properties):
+    """
+    Prints the results between two states as they are produced, so that the differences never need to be held in
+    memory.
+    :param new_results: Iterable of new results.
+    :param missing_results: Iterable of missing results.
+    :param state_name: Query Name.
+    :param state_properties: Query Properties.
+    :return: None.
+    """
+    print("Query Name: ", state_name)
+    print()
+    _report_drift_streaming("New Query Results:", new_results, state_properties)
+    print()
+    _report_drift_streaming("Missing Query Results:", missing_results, state_properties)
+
+
+def _report_drift_streaming(title, results, state_properties):
+    for i, result in enumerate(results):
+        if i == 0:
+            print(title)
+            print()
+        for field, value in zip(state_properties, result):
+            print(field, ": ", value)
+        print()
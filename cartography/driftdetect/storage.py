@@ -1,5 +1,106 @@
+import collections
+import hashlib
 import json
 import os
+import sqlite3
+import threading
+import time
+
+from cartography.driftdetect.model import State
+
+# Key of the results in a JSON state; the only value of a state that may be too large to load into memory.
+STATE_RESULTS_KEY = "results"
+
+
+class _JSONObjectStream:
+    """
+    Reads the top-level JSON object of a file one key at a time, reading one array value item by item, so that a state
+    with millions of results can be read with bounded memory.
+    """
+
+    def __init__(self, json_file, chunk_size=1 << 16):
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON state file.")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON state file.")
+        self._pos += 1
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value may continue in the next chunk.
+                if self._eof or not self._fill():
+                    raise
+                continue
+            if end == len(self._buffer) and not self._eof and self._fill():
+                # A number at the end of the buffer may continue in the next chunk.
+                continue
+            self._pos = end
+            return value
+
+    def _iter_array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("]")
+            return
+
+    def items(self, streamed_key):
+        """
+        Yields the (key, value) pairs of the object. The value of `streamed_key` is yielded as an iterator over the items
+        of the array, which must be consumed or discarded before the next pair is read.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._decode()
+            self._expect(":")
+            if key == streamed_key:
+                items = self._iter_array()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self._decode()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
 
 
 class FileSystem:
@@ -18,16 +119,51 @@ class FileSystem:
     @classmethod
     def write(cls, data, file_path):
         """
-        Writes a JSON object (dict) to a file.
+        Writes a JSON object (dict) to a file. The file is replaced atomically, so that readers never see a partially
+        written file.
         :type data: Dict
         :param data: Dictionary in JSON format.
         :type file_path: string
         :param file_path: Filepath to be written to.
         :return:
         """
-        with open(file_path, "w") as json_file:
-            json.dump(data, json_file, sort_keys=True, indent=4)
-            json_file.write("\n")
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as json_file:
+                json.dump(data, json_file, sort_keys=True, indent=4)
+                json_file.write("\n")
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load_header(cls, file_path):
+        """
+        Loads a JSON state from a file without its results, reading the results incrementally instead of loading them.
+        :type file_path: string.
+        :param file_path: Filepath for the file.
+        :return: Dictionary in JSON format, with an empty list of results.
+        """
+        header = {}
+        with open(file_path) as json_file:
+            for key, value in _JSONObjectStream(json_file).items(STATE_RESULTS_KEY):
+                header[key] = [] if key == STATE_RESULTS_KEY else value
+        return header
+
+    @classmethod
+    def iter_results(cls, file_path):
+        """
+        Yields the results of a JSON state one at a time, without loading the file into memory.
+        :type file_path: string.
+        :param file_path: Filepath for the file.
+        :yield: Each result, a list of strings.
+        """
+        with open(file_path) as json_file:
+            for key, value in _JSONObjectStream(json_file).items(STATE_RESULTS_KEY):
+                if key == STATE_RESULTS_KEY:
+                    yield from value
 
     @classmethod
     def walk(cls, drift_detection_directory):
@@ -50,3 +186,227 @@ class FileSystem:
         :return: Bool
         """
         return os.path.isfile(filename)
+
+
+# Name of the SQLite database in which SQLiteStateStore keeps the states of a query directory.
+SQLITE_STATE_FILENAME = "states.sqlite3"
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_rows (
+    hash BLOB PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS contents (
+    content_hash BLOB NOT NULL,
+    row_hash BLOB NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (content_hash, row_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    state_name TEXT NOT NULL,
+    validation_query TEXT NOT NULL,
+    properties TEXT NOT NULL,
+    content_hash BLOB NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_created_at ON snapshots (created_at);
+CREATE TABLE IF NOT EXISTS shortcuts (
+    alias TEXT PRIMARY KEY,
+    snapshot TEXT NOT NULL REFERENCES snapshots (name)
+);
+"""
+
+
+def _hash(value):
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+
+
+class SQLiteStateStore:
+    """
+    Stores the history of states of one query directory in a SQLite database, as an alternative to one JSON file per
+    state.
+
+    Each distinct result row is stored once, and each distinct content of a state is stored once as its row hashes with
+    the number of times each row occurs, so that a state whose results did not change since an earlier state only costs
+    one row in the snapshots table. Diffing two states is an indexed difference of their row hashes. Like with JSON
+    states, duplicate result rows are kept, and all the duplicates of an added result are reported.
+
+    :type path: string
+    :param path: Path to the SQLite database. It is created if it does not exist.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SQLITE_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def save_state(self, state, snapshot):
+        """
+        Saves a state, replacing any state previously saved under the same snapshot name.
+        :type state: State
+        :param state: The state to save.
+        :type snapshot: string
+        :param snapshot: Name of the snapshot, e.g. the filename that the state would have been written to.
+        :return: True if the results of the state were not stored yet, False if they were deduplicated.
+        """
+        rows = collections.Counter(
+            json.dumps(result, separators=(",", ":")) for result in state.results
+        )
+        row_hashes = sorted((_hash(row), row, count) for row, count in rows.items())
+        content = hashlib.blake2b(digest_size=16)
+        for row_hash, _, count in row_hashes:
+            content.update(row_hash)
+            content.update(count.to_bytes(8, "big"))
+        content_hash = content.digest()
+        with self._connection:
+            is_new = (
+                self._connection.execute(
+                    "SELECT 1 FROM contents WHERE content_hash = ? LIMIT 1",
+                    (content_hash,),
+                ).fetchone()
+                is None
+            )
+            if is_new:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO result_rows (hash, value) VALUES (?, ?)",
+                    ((row_hash, row) for row_hash, row, _ in row_hashes),
+                )
+                self._connection.executemany(
+                    "INSERT INTO contents (content_hash, row_hash, count) VALUES (?, ?, ?)",
+                    (
+                        (content_hash, row_hash, count)
+                        for row_hash, _, count in row_hashes
+                    ),
+                )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO snapshots "
+                "(name, created_at, state_name, validation_query, properties, content_hash, row_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    snapshot,
+                    time.time(),
+                    state.name,
+                    state.validation_query,
+                    json.dumps(state.properties),
+                    content_hash,
+                    sum(rows.values()),
+                ),
+            )
+        return is_new
+
+    def resolve(self, name):
+        """
+        Resolves a shortcut to the name of its snapshot. Names that are not shortcuts are returned unchanged.
+        """
+        row = self._connection.execute(
+            "SELECT snapshot FROM shortcuts WHERE alias = ?",
+            (name,),
+        ).fetchone()
+        return row[0] if row else name
+
+    def has_snapshot(self, snapshot):
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM snapshots WHERE name = ?",
+                (snapshot,),
+            ).fetchone()
+            is not None
+        )
+
+    def list_snapshots(self):
+        """
+        :return: The names of the saved snapshots, oldest first.
+        """
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT name FROM snapshots ORDER BY created_at, name",
+            )
+        ]
+
+    def add_shortcut(self, alias, snapshot):
+        """
+        Points the shortcut `alias` to a snapshot, or to the snapshot of another shortcut.
+        :return: False if the snapshot does not exist.
+        """
+        snapshot = self.resolve(snapshot)
+        if not self.has_snapshot(snapshot):
+            return False
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO shortcuts (alias, snapshot) VALUES (?, ?)",
+                (alias, snapshot),
+            )
+        return True
+
+    def _snapshot(self, snapshot):
+        name = self.resolve(snapshot)
+        row = self._connection.execute(
+            "SELECT state_name, validation_query, properties, content_hash FROM snapshots WHERE name = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"State {snapshot} not found in {self.path}.")
+        return row
+
+    def load_state(self, snapshot):
+        """
+        Loads a saved state by snapshot name or shortcut.
+        :rtype: State
+        """
+        state_name, validation_query, properties, content_hash = self._snapshot(
+            snapshot,
+        )
+        results = sorted(
+            json.loads(value)
+            for value, count in self._connection.execute(
+                "SELECT r.value, c.count FROM contents c JOIN result_rows r ON r.hash = c.row_hash "
+                "WHERE c.content_hash = ?",
+                (content_hash,),
+            )
+            for _ in range(count)
+        )
+        return State(state_name, validation_query, json.loads(properties), results)
+
+    def get_header(self, snapshot):
+        """
+        Loads a saved state without its results.
+        :rtype: State
+        """
+        state_name, validation_query, properties, _ = self._snapshot(snapshot)
+        return State(state_name, validation_query, json.loads(properties), [])
+
+    def iter_added_results(self, start_snapshot, end_snapshot):
+        """
+        Yields the results of the end snapshot that are not in the start snapshot, in no particular order. Like
+        compare_states(), duplicates of an added result are all yielded.
+        :rtype: Iterator of List of Strings
+        """
+        start_hash = self._snapshot(start_snapshot)[3]
+        end_hash = self._snapshot(end_snapshot)[3]
+        if start_hash == end_hash:
+            return
+        cursor = self._connection.execute(
+            """
+            SELECT r.value, c.count FROM contents c JOIN result_rows r ON r.hash = c.row_hash
+            WHERE c.content_hash = ? AND NOT EXISTS (
+                SELECT 1 FROM contents s WHERE s.content_hash = ? AND s.row_hash = c.row_hash
+            )
+            """,
+            (end_hash, start_hash),
+        )
+        for value, count in cursor:
+            result = json.loads(value)
+            for _ in range(count):
+                yield result
@@ -5,6 +5,7 @@ from typing import List
 
 from cartography.graph.querybuilder import _asdict_with_validate_relprops
 from cartography.graph.querybuilder import _build_match_clause
+from cartography.graph.querybuilder import _memoize_by_schema_class
 from cartography.graph.querybuilder import rel_present_on_node_schema
 from cartography.models.core.common import PropertyRef
 from cartography.models.core.nodes import CartographyNodeSchema
@@ -13,6 +14,7 @@ from cartography.models.core.relationships import LinkDirection
 from cartography.models.core.relationships import TargetNodeMatcher
 
 
+@_memoize_by_schema_class
 def build_cleanup_queries(node_schema: CartographyNodeSchema) -> List[str]:
     """
     Generates queries to clean up stale nodes and relationships from the given CartographyNodeSchema.
@@ -337,6 +339,7 @@ def _validate_target_node_matcher_for_cleanup_job(tgm: TargetNodeMatcher):
             )
 
 
+@_memoize_by_schema_class
 def build_cleanup_query_for_matchlink(rel_schema: CartographyRelSchema) -> str:
     """
     Generates a cleanup query for a matchlink relationship.
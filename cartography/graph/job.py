@@ -1,11 +1,15 @@
 import json
 import logging
 import string
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from pathlib import Path
 from string import Template
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 from typing import Set
 from typing import Union
@@ -22,6 +26,41 @@ from cartography.models.core.relationships import CartographyRelSchema
 logger = logging.getLogger(__name__)
 
 
+class _ConcurrentCleanupSettings(NamedTuple):
+    neo4j_driver: neo4j.Driver
+    max_concurrent_statements: int
+    neo4j_database: Optional[str]
+
+
+# Global _concurrent_cleanup
+# Will be set for the duration of cartography.sync.run_with_config when config.max_concurrent_cleanup_statements > 1
+_concurrent_cleanup: Optional[_ConcurrentCleanupSettings] = None
+
+
+def set_concurrent_cleanup(
+    neo4j_driver: Optional[neo4j.Driver],
+    max_concurrent_statements: int = 1,
+    neo4j_database: Optional[str] = None,
+) -> None:
+    """
+    Makes the cleanup jobs built by GraphJob.from_node_schema() run their statements concurrently, on sessions from
+    `neo4j_driver`. Call with None, or with `max_concurrent_statements` of 1, to run them in sequence again.
+    """
+    global _concurrent_cleanup
+    if neo4j_driver is None or max_concurrent_statements <= 1:
+        _concurrent_cleanup = None
+    else:
+        _concurrent_cleanup = _ConcurrentCleanupSettings(
+            neo4j_driver,
+            max_concurrent_statements,
+            neo4j_database,
+        )
+
+
+def _deletes_nodes(statement: GraphStatement) -> bool:
+    return "DETACH DELETE" in statement.query
+
+
 def _get_identifiers(template: string.Template) -> List[str]:
     """
     :param template: A string Template
@@ -78,12 +117,15 @@ class GraphJob:
         name: str,
         statements: List[GraphStatement],
         short_name: Optional[str] = None,
+        independent_statements: bool = False,
     ):
         # E.g. "Okta intel module cleanup"
         self.name = name
         self.statements: List[GraphStatement] = statements
         # E.g. "okta_import_cleanup"
         self.short_name = short_name
+        # Whether the statements can run concurrently, see run_concurrently()
+        self.independent_statements = independent_statements
 
     def merge_parameters(self, parameters: Dict) -> None:
         """
@@ -94,8 +136,24 @@ class GraphJob:
 
     def run(self, neo4j_session: neo4j.Session) -> None:
         """
-        Run the job. This will execute all statements sequentially.
+        Run the job. This will execute all statements sequentially, unless the job's statements are independent and
+        concurrent cleanup was enabled with set_concurrent_cleanup(), in which case they run with run_concurrently().
         """
+        settings = _concurrent_cleanup
+        if (
+            settings is not None
+            and self.independent_statements
+            and len(self.statements) > 1
+        ):
+            self.run_concurrently(
+                settings.neo4j_driver,
+                settings.max_concurrent_statements,
+                settings.neo4j_database,
+            )
+            return
+        self._run_sequentially(neo4j_session)
+
+    def _run_sequentially(self, neo4j_session: neo4j.Session) -> None:
         logger.debug("Starting job '%s'.", self.name)
         for stm in self.statements:
             try:
@@ -107,6 +165,9 @@ class GraphJob:
                     e,
                 )
                 raise
+        self._log_finished()
+
+    def _log_finished(self) -> None:
         log_msg = (
             f"Finished job {self.short_name}"
             if self.short_name
@@ -114,6 +175,59 @@ class GraphJob:
         )
         logger.info(log_msg)
 
+    def run_concurrently(
+        self,
+        neo4j_driver: neo4j.Driver,
+        max_concurrent_statements: int,
+        neo4j_database: Optional[str] = None,
+    ) -> None:
+        """
+        Run the job's statements concurrently, each on its own session from the given driver. Only use this for jobs
+        whose statements do not depend on each other's results, like the cleanup jobs built by from_node_schema(),
+        where each statement deletes a different kind of stale node or relationship. Statements that delete nodes run
+        first, on their own, since they also delete the relationships of those nodes that the other statements clean
+        up. Deadlocks between statements are retried by the driver's managed transactions.
+        :param neo4j_driver: The driver to open sessions from.
+        :param max_concurrent_statements: The maximum number of statements to run at the same time.
+        :param neo4j_database: The database to run the statements against. Defaults to the driver's default database.
+        """
+        if max_concurrent_statements <= 1 or len(self.statements) <= 1:
+            with neo4j_driver.session(database=neo4j_database) as neo4j_session:
+                self._run_sequentially(neo4j_session)
+            return
+
+        logger.debug(
+            "Starting job '%s' with %d concurrent statements.",
+            self.name,
+            max_concurrent_statements,
+        )
+
+        def run_statement(stm: GraphStatement) -> None:
+            with neo4j_driver.session(database=neo4j_database) as neo4j_session:
+                stm.run(neo4j_session)
+
+        node_statements = [stm for stm in self.statements if _deletes_nodes(stm)]
+        rel_statements = [stm for stm in self.statements if not _deletes_nodes(stm)]
+        with ThreadPoolExecutor(
+            max_workers=max_concurrent_statements,
+            thread_name_prefix="cartography-graph-job",
+        ) as executor:
+            for statements in [[stm] for stm in node_statements] + [rel_statements]:
+                futures = [executor.submit(run_statement, stm) for stm in statements]
+                done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done:
+                    future.cancel()
+                for future in done:
+                    e = future.exception()
+                    if e is not None:
+                        logger.error(
+                            "Unhandled error while executing statement in job '%s': %s",
+                            self.name,
+                            e,
+                        )
+                        raise e
+        self._log_finished()
+
     def as_dict(self) -> Dict:
         """
         Convert job to a dictionary.
@@ -176,6 +290,7 @@ class GraphJob:
             f"Cleanup {node_schema.label}",
             statements,
             node_schema.label,
+            independent_statements=True,
         )
 
     @classmethod
@@ -1,11 +1,16 @@
 import logging
 from dataclasses import asdict
+from functools import wraps
 from string import Template
+from typing import Any
+from typing import Callable
+from typing import cast
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Set
 from typing import Tuple
+from typing import TypeVar
 
 from cartography.models.core.common import PropertyRef
 from cartography.models.core.nodes import CartographyNodeProperties
@@ -19,6 +24,45 @@ from cartography.models.core.relationships import TargetNodeMatcher
 
 logger = logging.getLogger(__name__)
 
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _schema_cache_key(value: Any) -> Any:
+    """
+    Cartography schemas are stateless frozen dataclasses whose fields are all class-level defaults, so two instances of
+    the same schema class always generate the same queries. We therefore key cached queries on the schema class.
+    """
+    if isinstance(value, (CartographyNodeSchema, CartographyRelSchema)):
+        return type(value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_schema_cache_key(item) for item in value)
+    return value
+
+
+def _memoize_by_schema_class(func: F) -> F:
+    """
+    Caches the queries generated by the wrapped query builder function, keyed by the class of the schema it is called
+    with (plus any other arguments, e.g. selected relationships). Intel modules call the query builders on every load
+    and cleanup, often once per region or per account, so this avoids regenerating the same Cypher thousands of times
+    per sync. Lists are copied on the way out so that callers cannot alter the cached value. Exceptions are not cached.
+    """
+    cache: Dict[Any, Any] = {}
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = (
+            tuple(_schema_cache_key(arg) for arg in args),
+            tuple(sorted((k, _schema_cache_key(v)) for k, v in kwargs.items())),
+        )
+        try:
+            result = cache[key]
+        except KeyError:
+            result = cache[key] = func(*args, **kwargs)
+        return list(result) if isinstance(result, list) else result
+
+    wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+    return cast(F, wrapper)
+
 
 def _build_node_properties_statement(
     node_property_map: Dict[str, PropertyRef],
@@ -424,6 +468,7 @@ def filter_selected_relationships(
     return sub_resource_rel, filtered_other_rels
 
 
+@_memoize_by_schema_class
 def build_ingestion_query(
     node_schema: CartographyNodeSchema,
     selected_relationships: Optional[Set[CartographyRelSchema]] = None,
@@ -487,6 +532,7 @@ def build_ingestion_query(
     return ingest_query
 
 
+@_memoize_by_schema_class
 def build_create_index_queries(node_schema: CartographyNodeSchema) -> List[str]:
     """
     Generate queries to create indexes for the given CartographyNodeSchema and all node types attached to it via its
@@ -551,6 +597,7 @@ def build_create_index_queries(node_schema: CartographyNodeSchema) -> List[str]:
     return result
 
 
+@_memoize_by_schema_class
 def build_create_index_queries_for_matchlink(
     rel_schema: CartographyRelSchema,
 ) -> list[str]:
@@ -613,6 +660,7 @@ def build_create_index_queries_for_matchlink(
     return result
 
 
+@_memoize_by_schema_class
 def build_matchlink_query(rel_schema: CartographyRelSchema) -> str:
     """
     Generate a Neo4j query to link two existing nodes when given a CartographyRelSchema object.
@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Any
 from typing import Dict
@@ -9,11 +10,18 @@ from typing import Union
 
 import neo4j
 
+from cartography.profiling import get_profiler
 from cartography.stats import get_stats_client
 
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Iterative statements start at their `iterationsize` and may grow up to this many rows per transaction when their
+# transactions are fast, so that large cleanups take fewer round trips.
+MAX_ITERATION_SIZE = 10000
+# Iterations slower than this are halved, iterations faster than a quarter of this are doubled.
+TARGET_ITERATION_SECONDS = 2.0
+
 
 class GraphStatementJSONEncoder(json.JSONEncoder):
     """
@@ -91,15 +99,31 @@ class GraphStatement:
             "iterationsize": self.iterationsize,
         }
 
-    def _run_noniterative(self, tx: neo4j.Transaction) -> neo4j.ResultSummary:
+    def _run_noniterative(
+        self,
+        tx: neo4j.Transaction,
+        parameters: Optional[Dict[Any, Any]] = None,
+    ) -> neo4j.ResultSummary:
         """
         Non-iterative statement execution.
         Returns a ResultSummary instead of Result to avoid ResultConsumedError.
+        :param parameters: The query parameters to use instead of self.parameters, e.g. with a different LIMIT_SIZE.
         """
-        result: neo4j.Result = tx.run(self.query, self.parameters)
+        start = time.monotonic()
+        result: neo4j.Result = tx.run(
+            self.query,
+            self.parameters if parameters is None else parameters,
+        )
 
         # Ensure we consume the result inside the transaction
         summary: neo4j.ResultSummary = result.consume()
+        profiler = get_profiler()
+        if profiler is not None:
+            profiler.record_query(
+                self.query,
+                time.monotonic() - start,
+                summary=summary,
+            )
 
         # Handle stats
         stat_handler.incr("constraints_added", summary.counters.constraints_added)
@@ -125,17 +149,45 @@ class GraphStatement:
         Iterative statement execution.
 
         Expects the query to return the total number of records updated.
+
+        The number of records per transaction (LIMIT_SIZE) starts at `iterationsize`. It doubles while transactions take
+        less than a quarter of TARGET_ITERATION_SECONDS, up to MAX_ITERATION_SIZE, and halves, but never below
+        `iterationsize`, when a transaction is slower than that or fails with a transient error.
         """
         self.parameters["LIMIT_SIZE"] = self.iterationsize
+        min_size = self.iterationsize
+        max_size = max(MAX_ITERATION_SIZE, min_size)
+        size = min_size
 
         while True:
-            summary: neo4j.ResultSummary = session.write_transaction(
-                self._run_noniterative
-            )
+            start = time.monotonic()
+            try:
+                summary: neo4j.ResultSummary = session.write_transaction(
+                    self._run_noniterative,
+                    {**self.parameters, "LIMIT_SIZE": size},
+                )
+            except neo4j.exceptions.TransientError:
+                if size <= min_size:
+                    raise
+                size = max(size // 2, min_size)
+                logger.warning(
+                    "Transient error in %s statement #%s, retrying with LIMIT_SIZE %d.",
+                    self.parent_job_name,
+                    self.parent_job_sequence_num,
+                    size,
+                    exc_info=True,
+                )
+                continue
+            elapsed = time.monotonic() - start
 
             if not summary.counters.contains_updates:
                 break
 
+            if elapsed > TARGET_ITERATION_SECONDS:
+                size = max(size // 2, min_size)
+            elif elapsed < TARGET_ITERATION_SECONDS / 4:
+                size = min(size * 2, max_size)
+
     @classmethod
     def create_from_json(
         cls,
@@ -0,0 +1,329 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import TypeVar
+
+from requests import Response
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Connect and read timeouts of 60 seconds each; see https://requests.readthedocs.io/en/master/user/advanced/#timeouts
+DEFAULT_TIMEOUT = (60, 60)
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_POOL_SIZE = 10
+# Reset headers larger than this are epoch timestamps (GitHub, Okta, SnipeIT); smaller ones are a number of seconds
+# from now (IETF RateLimit headers).
+_EPOCH_THRESHOLD_SECONDS = 1_000_000_000
+# Rate limit header names, by vendor convention, as (remaining, limit, reset).
+_RATE_LIMIT_HEADERS = (
+    ("x-ratelimit-remaining", "x-ratelimit-limit", "x-ratelimit-reset"),
+    ("x-rate-limit-remaining", "x-rate-limit-limit", "x-rate-limit-reset"),
+    ("ratelimit-remaining", "ratelimit-limit", "ratelimit-reset"),
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter. The bucket starts full with `capacity` tokens and is refilled at `rate`
+    tokens per second; acquire() takes one token, sleeping until it is available.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            # Taking the token before it is available reserves it, so concurrent callers queue up behind each other.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class SlidingWindowRateLimiter:
+    """
+    Thread-safe rate limiter for quotas of `max_requests` per rolling window of `window_seconds`, like the NVD API's.
+    acquire() sleeps until a request can be sent without exceeding the quota of any window, so requests can be sent in
+    a burst of `max_requests` and then at a sustained rate of `max_requests / window_seconds`.
+    """
+
+    def __init__(self, max_requests: int, window_seconds: float) -> None:
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        # Send times of the last `max_requests` requests, including the ones still waiting for their slot.
+        self._sent: Deque[float] = deque(maxlen=max_requests)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = now
+            if len(self._sent) == self.max_requests:
+                slot = max(now, self._sent[0] + self.window_seconds)
+            # Reserving the slot before it comes makes concurrent callers queue up behind each other.
+            self._sent.append(slot)
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimit(NamedTuple):
+    remaining: int
+    limit: Optional[int]
+    # Epoch time at which the quota is replenished, if the API tells us.
+    reset_at: Optional[float]
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Optional[RateLimit]:
+    """
+    Reads the rate limit advertised by an API response, from the `X-RateLimit-*` (GitHub, SnipeIT), `X-Rate-Limit-*`
+    (Okta) or `RateLimit-*` (IETF draft) headers.
+    :param headers: The response headers. Lookups must be case-insensitive, as with requests.Response.headers.
+    :return: The rate limit, or None if the response has no remaining-requests header.
+    """
+    for remaining_name, limit_name, reset_name in _RATE_LIMIT_HEADERS:
+        remaining = headers.get(remaining_name)
+        if remaining is None:
+            continue
+        try:
+            limit = headers.get(limit_name)
+            reset = headers.get(reset_name)
+            reset_at = None
+            if reset is not None:
+                reset_at = float(reset)
+                if reset_at < _EPOCH_THRESHOLD_SECONDS:
+                    reset_at += time.time()
+            return RateLimit(
+                remaining=int(remaining),
+                limit=int(limit) if limit is not None else None,
+                reset_at=reset_at,
+            )
+        except ValueError:
+            logger.debug(
+                "Ignoring malformed rate limit headers %s",
+                {
+                    name: headers.get(name)
+                    for name in (remaining_name, limit_name, reset_name)
+                },
+            )
+            return None
+    return None
+
+
+class HeaderRateLimiter:
+    """
+    Thread-safe rate limiter driven by the rate limit headers of the API's responses. Requests are let through while
+    the quota advertised by the last response stays above a reserve; once it is used up, wait() blocks every caller
+    until the quota is reset.
+
+    Requests sent since the last response are counted against the quota, so that concurrent callers do not all spend
+    the last requests of the window at once.
+    """
+
+    def __init__(
+        self,
+        min_remaining: int = 0,
+        min_remaining_fraction: float = 0.0,
+        reset_margin_seconds: float = 0.0,
+        name: str = "API",
+    ) -> None:
+        """
+        :param min_remaining: Wait for the reset once this many requests or fewer remain in the window.
+        :param min_remaining_fraction: Wait for the reset once this fraction of the window's limit or less remains.
+        :param reset_margin_seconds: Extra time to wait after the advertised reset, to absorb clock skew.
+        :param name: The name of the API, for logging.
+        """
+        self.min_remaining = min_remaining
+        self.min_remaining_fraction = min_remaining_fraction
+        self.reset_margin_seconds = reset_margin_seconds
+        self.name = name
+        self._rate_limit: Optional[RateLimit] = None
+        self._lock = threading.Lock()
+
+    @property
+    def has_state(self) -> bool:
+        """
+        Whether a response advertising the rate limit has been seen since the last reset.
+        """
+        return self._rate_limit is not None
+
+    def update(self, response: Response) -> None:
+        """
+        Records the rate limit advertised by `response`. Responses without rate limit headers are ignored.
+        """
+        rate_limit = parse_rate_limit_headers(response.headers)
+        if rate_limit is not None:
+            with self._lock:
+                self._rate_limit = rate_limit
+
+    def _reserve(self, rate_limit: RateLimit) -> float:
+        reserve = float(self.min_remaining)
+        if rate_limit.limit is not None:
+            reserve = max(reserve, rate_limit.limit * self.min_remaining_fraction)
+        return reserve
+
+    def wait(self) -> None:
+        """
+        Blocks until a request may be sent without going over the reserve, then counts that request against the
+        quota.
+        """
+        with self._lock:
+            rate_limit = self._rate_limit
+            if rate_limit is None:
+                return
+            if rate_limit.remaining > self._reserve(rate_limit):
+                self._rate_limit = rate_limit._replace(
+                    remaining=rate_limit.remaining - 1,
+                )
+                return
+            if rate_limit.reset_at is None:
+                # Without a reset time, let the API throttle us; the session retries 429s after their Retry-After.
+                return
+            # Reset headers have a precision of one second.
+            sleep_seconds = math.ceil(
+                rate_limit.reset_at - time.time() + self.reset_margin_seconds,
+            )
+            if sleep_seconds <= 0:
+                self._rate_limit = None
+                return
+            logger.warning(
+                f"{self.name} rate limit has {rate_limit.remaining} requests remaining, waiting {sleep_seconds} "
+                f"seconds until it is reset.",
+            )
+            # Sleeping with the lock held makes every other caller wait for the same reset.
+            time.sleep(sleep_seconds)
+            self._rate_limit = None
+
+
+class RateLimitedSession(Session):
+    """
+    requests.Session for calling SaaS APIs at the highest rate they allow:
+
+    - connections are pooled, with room for `pool_size` concurrent requests per host;
+    - requests failing with a connection error or one of `retry_statuses` are retried with exponential backoff,
+      honoring the Retry-After header of 429 and 503 responses;
+    - if a `token_bucket` is given, requests are sent at most at its rate;
+    - if a `rate_limiter` is given, it is updated from the headers of every response and requests wait for the reset
+      once the advertised quota is used up;
+    - requests without an explicit timeout use `timeout`.
+
+    The session can be shared by threads, e.g. with fetch_concurrently().
+    """
+
+    def __init__(
+        self,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        max_retries: int = 5,
+        backoff_factor: float = 1.0,
+        retry_statuses: Sequence[int] = DEFAULT_RETRY_STATUSES,
+        retry_methods: Iterable[str] = Retry.DEFAULT_ALLOWED_METHODS,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        rate_limiter: Optional[HeaderRateLimiter] = None,
+        token_bucket: Optional[TokenBucket] = None,
+    ) -> None:
+        super().__init__()
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.token_bucket = token_bucket
+        retry_policy = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=frozenset(retry_methods),
+            # Return the last response once the retries are exhausted, so that callers get a requests.HTTPError
+            # from raise_for_status() rather than a requests.exceptions.RetryError.
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry_policy,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(  # type: ignore[override]
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        kwargs.setdefault("timeout", self.timeout)
+        if self.token_bucket is not None:
+            self.token_bucket.acquire()
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        response = super().request(method, url, *args, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response)
+        return response
+
+
+def fetch_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = DEFAULT_POOL_SIZE,
+) -> Iterator[R]:
+    """
+    Calls `func(item)` for every item, up to `max_workers` at the same time on a thread pool, and yields the results
+    in the order of `items`. At most `max_workers` results are held in memory ahead of the caller. With
+    `max_workers=1` the items are fetched one at a time on the calling thread.
+
+    Example:
+        pages = fetch_concurrently(lambda offset: get_page(session, offset), offsets, max_workers=4)
+
+    :param func: The function fetching one item, typically with a shared RateLimitedSession.
+    :param items: The items to fetch, e.g. page offsets.
+    :param max_workers: The maximum number of concurrent calls. Should not exceed the session's pool size.
+    :return: An iterator of the results, in the order of `items`.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    in_flight: Deque[Future] = deque()
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="cartography-http",
+    ) as executor:
+        try:
+            for item in items:
+                in_flight.append(executor.submit(func, item))
+                if len(in_flight) >= max_workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
@@ -4,11 +4,46 @@ import pathlib
 import neo4j
 
 from cartography.config import Config
+from cartography.graph.job import get_parameters
 from cartography.graph.job import GraphJob
+from cartography.util import get_sub_resources_updated_in_sync
+from cartography.util import SUB_RESOURCE_PARAMETERS
 
 logger = logging.getLogger(__name__)
 
 
+def _run_job_file(
+    neo4j_session: neo4j.Session,
+    path: pathlib.Path,
+    update_tag: int,
+) -> None:
+    """
+    Runs the analysis job at `path` over the whole graph or, if its queries use one of the sub resource parameters of
+    cartography.util.SUB_RESOURCE_PARAMETERS (e.g. `$AWS_ID`), once for each of those sub resources updated by the
+    current sync.
+    """
+    job = GraphJob.from_json_file(path)
+    parameters = get_parameters([statement.query for statement in job.statements])
+    scopes = sorted(parameters & SUB_RESOURCE_PARAMETERS.keys())
+    if len(scopes) > 1:
+        raise ValueError(
+            f"Analysis job {path} uses more than one sub resource parameter: {scopes}.",
+        )
+    if not scopes:
+        job.merge_parameters({"UPDATE_TAG": update_tag})
+        job.run(neo4j_session)
+        return
+
+    sub_resource_ids = get_sub_resources_updated_in_sync(
+        neo4j_session,
+        SUB_RESOURCE_PARAMETERS[scopes[0]],
+        update_tag,
+    )
+    for sub_resource_id in sub_resource_ids:
+        job.merge_parameters({"UPDATE_TAG": update_tag, scopes[0]: sub_resource_id})
+        job.run(neo4j_session)
+
+
 def run(neo4j_session: neo4j.Session, config: Config) -> None:
     analysis_job_directory_path = config.analysis_job_directory
     if not analysis_job_directory_path:
@@ -31,11 +66,7 @@ def run(neo4j_session: neo4j.Session, config: Config) -> None:
     for path in analysis_job_directory.glob("**/*.json"):
         logger.info("Running discovered analysis job: %s", path)
         try:
-            GraphJob.run_from_json_file(
-                path,
-                neo4j_session,
-                {"UPDATE_TAG": config.update_tag},
-            )
+            _run_job_file(neo4j_session, path, config.update_tag)
         except (KeyboardInterrupt, SystemExit):
             raise
         except Exception:
@@ -1,6 +1,8 @@
 import datetime
 import logging
 import traceback
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
 from typing import Iterable
@@ -14,11 +16,14 @@ from cartography.config import Config
 from cartography.intel.aws.util.common import parse_and_validate_aws_regions
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
 from cartography.stats import get_stats_client
+from cartography.util import build_neo4j_driver
+from cartography.util import INCREMENTAL_ANALYSIS_PARAM
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_analysis_and_ensure_deps
 from cartography.util import run_analysis_job
 from cartography.util import run_cleanup_job
 from cartography.util import run_scoped_analysis_job
+from cartography.util import thread_event_loop
 from cartography.util import timeit
 
 from . import ec2
@@ -170,6 +175,23 @@ def _autodiscover_accounts(
         )
 
 
+def _get_boto3_session_for_profile(
+    profile_name: str,
+    num_accounts: int,
+) -> boto3.session.Session:
+    if num_accounts == 1:
+        # Use the default boto3 session because boto3 gets confused if you give it a profile name with 1 account
+        return boto3.Session()
+    return boto3.Session(profile_name=profile_name)
+
+
+def _format_account_exception(account_id: str, e: Exception) -> str:
+    timestamp = datetime.datetime.now()
+    exception_traceback = traceback.TracebackException.from_exception(e)
+    traceback_string = "".join(exception_traceback.format())
+    return f"{timestamp} - Exception for account ID: {account_id}\n{traceback_string}"
+
+
 def _sync_multiple_accounts(
     neo4j_session: neo4j.Session,
     accounts: Dict[str, str],
@@ -178,70 +200,82 @@ def _sync_multiple_accounts(
     aws_best_effort_mode: bool,
     aws_requested_syncs: List[str] = [],
     regions: list[str] | None = None,
+    neo4j_driver: neo4j.Driver | None = None,
+    neo4j_database: str | None = None,
+    max_concurrent_accounts: int = 1,
 ) -> bool:
     logger.info("Syncing AWS accounts: %s", ", ".join(accounts.values()))
     organizations.sync(neo4j_session, accounts, sync_tag, common_job_parameters)
 
-    failed_account_ids = []
-    exception_tracebacks = []
-
-    num_accounts = len(accounts)
+    failed_account_ids: List[str] = []
+    exception_tracebacks: List[str] = []
 
-    for profile_name, account_id in accounts.items():
-        logger.info(
-            "Syncing AWS account with ID '%s' using configured profile '%s'.",
-            account_id,
-            profile_name,
-        )
-        common_job_parameters["AWS_ID"] = account_id
-        if num_accounts == 1:
-            # Use the default boto3 session because boto3 gets confused if you give it a profile name with 1 account
-            boto3_session = boto3.Session()
-        else:
-            boto3_session = boto3.Session(profile_name=profile_name)
-
-        _autodiscover_accounts(
+    if neo4j_driver and max_concurrent_accounts > 1 and len(accounts) > 1:
+        _sync_accounts_concurrently(
             neo4j_session,
-            boto3_session,
-            account_id,
+            neo4j_driver,
+            neo4j_database,
+            accounts,
             sync_tag,
             common_job_parameters,
+            aws_best_effort_mode,
+            aws_requested_syncs,
+            regions,
+            max_concurrent_accounts,
+            failed_account_ids,
+            exception_tracebacks,
         )
+    else:
+        num_accounts = len(accounts)
 
-        try:
-            _sync_one_account(
+        for profile_name, account_id in accounts.items():
+            logger.info(
+                "Syncing AWS account with ID '%s' using configured profile '%s'.",
+                account_id,
+                profile_name,
+            )
+            common_job_parameters["AWS_ID"] = account_id
+            boto3_session = _get_boto3_session_for_profile(profile_name, num_accounts)
+
+            _autodiscover_accounts(
                 neo4j_session,
                 boto3_session,
                 account_id,
                 sync_tag,
                 common_job_parameters,
-                regions=regions,
-                aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
             )
-        except Exception as e:
-            if aws_best_effort_mode:
-                timestamp = datetime.datetime.now()
-                failed_account_ids.append(account_id)
-                exception_traceback = traceback.TracebackException.from_exception(e)
-                traceback_string = "".join(exception_traceback.format())
-                exception_tracebacks.append(
-                    f"{timestamp} - Exception for account ID: {account_id}\n{traceback_string}",
-                )
-                logger.warning(
-                    f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are continuing "
-                    f"on to the next AWS account. All exceptions will be aggregated and re-logged at the end of the "
-                    f"sync.",
-                    exc_info=True,
+
+            try:
+                _sync_one_account(
+                    neo4j_session,
+                    boto3_session,
+                    account_id,
+                    sync_tag,
+                    common_job_parameters,
+                    regions=regions,
+                    aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
                 )
-                continue
-            else:
-                raise
+            except Exception as e:
+                if aws_best_effort_mode:
+                    failed_account_ids.append(account_id)
+                    exception_tracebacks.append(
+                        _format_account_exception(account_id, e),
+                    )
+                    logger.warning(
+                        f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are continuing "
+                        f"on to the next AWS account. All exceptions will be aggregated and re-logged at the end of the "
+                        f"sync.",
+                        exc_info=True,
+                    )
+                    continue
+                else:
+                    raise
 
     if failed_account_ids:
         logger.error(f"AWS sync failed for accounts {failed_account_ids}")
         raise Exception("\n".join(exception_tracebacks))
 
-    del common_job_parameters["AWS_ID"]
+    common_job_parameters.pop("AWS_ID", None)
 
     # There may be orphan Principals which point outside of known AWS accounts. This job cleans
     # up those nodes after all AWS accounts have been synced.
@@ -255,6 +289,117 @@ def _sync_multiple_accounts(
     return False
 
 
+def _sync_accounts_concurrently(
+    neo4j_session: neo4j.Session,
+    neo4j_driver: neo4j.Driver,
+    neo4j_database: str | None,
+    accounts: Dict[str, str],
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_best_effort_mode: bool,
+    aws_requested_syncs: List[str],
+    regions: list[str] | None,
+    max_concurrent_accounts: int,
+    failed_account_ids: List[str],
+    exception_tracebacks: List[str],
+) -> None:
+    """
+    Syncs the given accounts on a pool of `max_concurrent_accounts` threads. Each account gets its own boto3 session,
+    Neo4j session and copy of `common_job_parameters`. Account autodiscovery runs first, serially, on the given
+    session so that workers do not race to MERGE the same AWSAccount nodes.
+
+    Failed accounts are appended to `failed_account_ids` and `exception_tracebacks` in best effort mode. Otherwise
+    the first failure is re-raised once the accounts already being synced have finished, and no new accounts are
+    started.
+    """
+    num_accounts = len(accounts)
+    for profile_name, account_id in accounts.items():
+        _autodiscover_accounts(
+            neo4j_session,
+            _get_boto3_session_for_profile(profile_name, num_accounts),
+            account_id,
+            sync_tag,
+            common_job_parameters,
+        )
+
+    logger.info(
+        "Syncing %d AWS accounts with up to %d accounts at a time.",
+        num_accounts,
+        max_concurrent_accounts,
+    )
+    with ThreadPoolExecutor(
+        max_workers=max_concurrent_accounts,
+        thread_name_prefix="cartography-aws-account",
+    ) as executor:
+        futures = {
+            executor.submit(
+                _sync_one_account_in_new_session,
+                neo4j_driver,
+                neo4j_database,
+                profile_name,
+                account_id,
+                num_accounts,
+                sync_tag,
+                common_job_parameters,
+                regions,
+                aws_requested_syncs,
+            ): account_id
+            for profile_name, account_id in accounts.items()
+        }
+        for future in as_completed(futures):
+            account_id = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                if not aws_best_effort_mode:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                failed_account_ids.append(account_id)
+                exception_tracebacks.append(_format_account_exception(account_id, e))
+                logger.warning(
+                    f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are continuing "
+                    f"with the other AWS accounts. All exceptions will be aggregated and re-logged at the end of the "
+                    f"sync.",
+                    exc_info=e,
+                )
+
+
+def _sync_one_account_in_new_session(
+    neo4j_driver: neo4j.Driver,
+    neo4j_database: str | None,
+    profile_name: str,
+    account_id: str,
+    num_accounts: int,
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    regions: list[str] | None,
+    aws_requested_syncs: List[str],
+) -> None:
+    logger.info(
+        "Syncing AWS account with ID '%s' using configured profile '%s'.",
+        account_id,
+        profile_name,
+    )
+    account_job_parameters = {**common_job_parameters, "AWS_ID": account_id}
+    boto3_session = _get_boto3_session_for_profile(profile_name, num_accounts)
+    with (
+        thread_event_loop(),
+        neo4j_driver.session(
+            database=neo4j_database,
+        ) as neo4j_session,
+    ):
+        _sync_one_account(
+            neo4j_session,
+            boto3_session,
+            account_id,
+            sync_tag,
+            account_job_parameters,
+            regions=regions,
+            aws_requested_syncs=aws_requested_syncs,
+        )
+
+
 @timeit
 def _perform_aws_analysis(
     requested_syncs: List[str],
@@ -278,6 +423,7 @@ def _perform_aws_analysis(
         requested_syncs_as_set,
         common_job_parameters,
         neo4j_session,
+        sub_resource_parameter="AWS_ID",
     )
 
     run_analysis_and_ensure_deps(
@@ -312,6 +458,10 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
         "permission_relationships_file": config.permission_relationships_file,
         "aws_guardduty_severity_threshold": config.aws_guardduty_severity_threshold,
         "aws_cloudtrail_management_events_lookback_hours": config.aws_cloudtrail_management_events_lookback_hours,
+        "aws_max_concurrent_regions": config.aws_max_concurrent_regions,
+        "aws_s3_max_concurrent_buckets": config.aws_s3_max_concurrent_buckets,
+        "permission_relationships_workers": config.permission_relationships_workers,
+        INCREMENTAL_ANALYSIS_PARAM: config.incremental_analysis,
     }
     try:
         boto3_session = boto3.Session()
@@ -359,15 +509,28 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
     else:
         regions = None
 
-    sync_successful = _sync_multiple_accounts(
-        neo4j_session,
-        aws_accounts,
-        config.update_tag,
-        common_job_parameters,
-        config.aws_best_effort_mode,
-        requested_syncs,
-        regions=regions,
-    )
+    max_concurrent_accounts = config.aws_max_concurrent_accounts or 1
+    neo4j_driver = None
+    if max_concurrent_accounts > 1 and len(aws_accounts) > 1:
+        # Each concurrently synced account needs its own Neo4j session.
+        neo4j_driver = build_neo4j_driver(config)
+
+    try:
+        sync_successful = _sync_multiple_accounts(
+            neo4j_session,
+            aws_accounts,
+            config.update_tag,
+            common_job_parameters,
+            config.aws_best_effort_mode,
+            requested_syncs,
+            regions=regions,
+            neo4j_driver=neo4j_driver,
+            neo4j_database=config.neo4j_database,
+            max_concurrent_accounts=max_concurrent_accounts,
+        )
+    finally:
+        if neo4j_driver:
+            neo4j_driver.close()
 
     if sync_successful:
         _perform_aws_analysis(requested_syncs, neo4j_session, common_job_parameters)
@@ -11,6 +11,8 @@ import neo4j
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
 from cartography.intel.aws.ec2.util import get_botocore_config
+from cartography.intel.aws.util.regions import fetch_regions_concurrently
+from cartography.intel.aws.util.regions import get_max_concurrent_regions
 from cartography.models.aws.ec2.auto_scaling_groups import (
     EC2InstanceAutoScalingGroupSchema,
 )
@@ -416,13 +418,17 @@ def sync_ec2_instances(
     update_tag: int,
     common_job_parameters: Dict[str, Any],
 ) -> None:
-    for region in regions:
+    for region, reservations in fetch_regions_concurrently(
+        get_ec2_instances,
+        boto3_session,
+        regions,
+        max_workers=get_max_concurrent_regions(common_job_parameters),
+    ):
         logger.info(
             "Syncing EC2 instances for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        reservations = get_ec2_instances(boto3_session, region)
         ec2_data = transform_ec2_instances(reservations, region, current_aws_account_id)
         load_ec2_instance_data(
             neo4j_session,
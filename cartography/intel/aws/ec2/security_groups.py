@@ -9,6 +9,8 @@ import neo4j
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.intel.aws.util.regions import fetch_regions_concurrently
+from cartography.intel.aws.util.regions import get_max_concurrent_regions
 from cartography.models.aws.ec2.security_group_rules import IpPermissionInboundSchema
 from cartography.models.aws.ec2.security_group_rules import IpRangeSchema
 from cartography.models.aws.ec2.security_group_rules import IpRuleSchema
@@ -213,13 +215,17 @@ def sync_ec2_security_groupinfo(
     update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
-    for region in regions:
+    for region, data in fetch_regions_concurrently(
+        get_ec2_security_group_data,
+        boto3_session,
+        regions,
+        max_workers=get_max_concurrent_regions(common_job_parameters),
+    ):
         logger.info(
             "Syncing EC2 security groups for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_ec2_security_group_data(boto3_session, region)
         transformed = transform_ec2_security_group_data(data)
         load_ec2_security_groupinfo(
             neo4j_session,
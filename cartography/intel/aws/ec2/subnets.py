@@ -5,7 +5,10 @@ import boto3
 import neo4j
 
 from cartography.client.core.tx import load
+from cartography.client.core.tx import LoadPipeline
 from cartography.graph.job import GraphJob
+from cartography.intel.aws.util.regions import fetch_regions_concurrently
+from cartography.intel.aws.util.regions import get_max_concurrent_regions
 from cartography.models.aws.ec2.auto_scaling_groups import (
     EC2SubnetAutoScalingGroupSchema,
 )
@@ -87,19 +90,25 @@ def sync_subnets(
     update_tag: int,
     common_job_parameters: dict[str, Any],
 ) -> None:
-    for region in regions:
-        logger.info(
-            "Syncing EC2 subnets for region '%s' in account '%s'.",
-            region,
-            current_aws_account_id,
-        )
-        data = get_subnet_data(boto3_session, region)
-        transformed = transform_subnet_data(data)
-        load_subnets(
-            neo4j_session,
-            transformed,
-            region,
-            current_aws_account_id,
-            update_tag,
-        )
+    # Write each region's subnets while the next regions are being fetched.
+    with LoadPipeline(neo4j_session) as pipeline:
+        for region, data in fetch_regions_concurrently(
+            get_subnet_data,
+            boto3_session,
+            regions,
+            max_workers=get_max_concurrent_regions(common_job_parameters),
+        ):
+            logger.info(
+                "Syncing EC2 subnets for region '%s' in account '%s'.",
+                region,
+                current_aws_account_id,
+            )
+            transformed = transform_subnet_data(data)
+            pipeline.submit(
+                load_subnets,
+                transformed,
+                region,
+                current_aws_account_id,
+                update_tag,
+            )
     cleanup_subnets(neo4j_session, common_job_parameters)
@@ -1,9 +1,18 @@
 import logging
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
+from typing import Deque
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 import boto3
+import botocore.client
+import botocore.config
 import neo4j
 
 from cartography.client.core.tx import load
@@ -13,11 +22,15 @@ from cartography.models.aws.ecr.repository import ECRRepositorySchema
 from cartography.models.aws.ecr.repository_image import ECRRepositoryImageSchema
 from cartography.util import aws_handle_regions
 from cartography.util import timeit
-from cartography.util import to_asynchronous
-from cartography.util import to_synchronous
 
 logger = logging.getLogger(__name__)
 
+# Number of repositories whose images are fetched concurrently in a region.
+MAX_CONCURRENT_REPOSITORIES = 10
+# Number of repositories whose images are transformed and loaded to the graph together. Together with
+# MAX_CONCURRENT_REPOSITORIES, this bounds the number of repositories whose images are held in memory at once.
+REPOSITORY_CHUNK_SIZE = 100
+
 
 @timeit
 @aws_handle_regions
@@ -37,14 +50,18 @@ def get_ecr_repositories(
 @timeit
 @aws_handle_regions
 def get_ecr_repository_images(
-    boto3_session: boto3.session.Session, region: str, repository_name: str
+    boto3_session: boto3.session.Session,
+    region: str,
+    repository_name: str,
+    client: Optional[botocore.client.BaseClient] = None,
 ) -> List[Dict]:
     logger.debug(
         "Getting ECR images in repository '%s' for region '%s'.",
         repository_name,
         region,
     )
-    client = boto3_session.client("ecr", region_name=region)
+    if client is None:
+        client = boto3_session.client("ecr", region_name=region)
     list_paginator = client.get_paginator("list_images")
     ecr_repository_images: List[Dict] = []
     for page in list_paginator.paginate(repositoryName=repository_name):
@@ -170,27 +187,64 @@ def _get_image_data(
     boto3_session: boto3.session.Session,
     region: str,
     repositories: List[Dict[str, Any]],
-) -> Dict[str, Any]:
+    max_workers: int = MAX_CONCURRENT_REPOSITORIES,
+    chunk_size: int = REPOSITORY_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
     """
-    Given a list of repositories, get the image data for each repository,
-    return as a mapping from repositoryUri to image object
-    """
-    image_data = {}
+    Given a list of repositories, get the image data for each repository and yield it in chunks of `chunk_size`
+    repositories, each as a mapping from repositoryUri to image objects.
 
-    async def async_get_images(repo: Dict[str, Any]) -> None:
-        repo_image_obj = await to_asynchronous(
-            get_ecr_repository_images,
-            boto3_session,
-            region,
-            repo["repositoryName"],
-        )
-        image_data[repo["repositoryUri"]] = repo_image_obj
+    Repositories are fetched in name order by `max_workers` threads sharing one ECR client, and at most twice as many
+    repositories are fetched ahead of the caller. The client uses botocore's adaptive retry mode, so that when ECR
+    throttles one worker, all of them slow down instead of retrying independently.
+    """
+    client = boto3_session.client(
+        "ecr",
+        region_name=region,
+        config=botocore.config.Config(
+            max_pool_connections=max(max_workers, 10),
+            retries={"max_attempts": 10, "mode": "adaptive"},
+        ),
+    )
 
     # Sort repositories by name to ensure consistent processing order
-    sorted_repos = sorted(repositories, key=lambda x: x["repositoryName"])
-    to_synchronous(*[async_get_images(repo) for repo in sorted_repos])
-
-    return image_data
+    sorted_repos = iter(sorted(repositories, key=lambda x: x["repositoryName"]))
+    in_flight: Deque[Tuple[str, Future]] = deque()
+    chunk: Dict[str, Any] = {}
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="cartography-ecr-repository",
+    ) as executor:
+        try:
+            while True:
+                for repo in sorted_repos:
+                    in_flight.append(
+                        (
+                            repo["repositoryUri"],
+                            executor.submit(
+                                get_ecr_repository_images,
+                                boto3_session,
+                                region,
+                                repo["repositoryName"],
+                                client=client,
+                            ),
+                        ),
+                    )
+                    if len(in_flight) >= 2 * max_workers:
+                        break
+                if not in_flight:
+                    break
+                repo_uri, future = in_flight.popleft()
+                chunk[repo_uri] = future.result()
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = {}
+        finally:
+            # If the caller stops early or a fetch fails, don't start the repositories that are still queued.
+            for _, future in in_flight:
+                future.cancel()
+    if chunk:
+        yield chunk
 
 
 @timeit
@@ -208,10 +262,7 @@ def sync(
             region,
             current_aws_account_id,
         )
-        image_data = {}
         repositories = get_ecr_repositories(boto3_session, region)
-        image_data = _get_image_data(boto3_session, region, repositories)
-        # len here should be 1!
         load_ecr_repositories(
             neo4j_session,
             repositories,
@@ -219,12 +270,13 @@ def sync(
             current_aws_account_id,
             update_tag,
         )
-        repo_images_list = transform_ecr_repository_images(image_data)
-        load_ecr_repository_images(
-            neo4j_session,
-            repo_images_list,
-            region,
-            current_aws_account_id,
-            update_tag,
-        )
+        for image_data in _get_image_data(boto3_session, region, repositories):
+            repo_images_list = transform_ecr_repository_images(image_data)
+            load_ecr_repository_images(
+                neo4j_session,
+                repo_images_list,
+                region,
+                current_aws_account_id,
+                update_tag,
+            )
     cleanup(neo4j_session, common_job_parameters)
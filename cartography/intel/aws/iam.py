@@ -1,16 +1,29 @@
 import enum
 import json
 import logging
+from string import Template
 from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Tuple
 
 import boto3
 import neo4j
 
+from cartography.client.core.tx import load
+from cartography.client.core.tx import load_graph_data
+from cartography.client.core.tx import load_matchlinks
+from cartography.intel.aws.permission_relationships import (
+    calculate_permission_relationships,
+)
 from cartography.intel.aws.permission_relationships import parse_statement_node
-from cartography.intel.aws.permission_relationships import principal_allowed_on_resource
+from cartography.models.aws.iam.access_key import AccountAccessKeySchema
+from cartography.models.aws.iam.group import AWSGroupSchema
+from cartography.models.aws.iam.group import AWSUserToAWSGroupMatchLink
+from cartography.models.aws.iam.role import AWSRoleSchema
+from cartography.models.aws.iam.role import AWSTrustedPrincipalSchema
+from cartography.models.aws.iam.user import AWSUserSchema
 from cartography.stats import get_stats_client
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_cleanup_job
@@ -279,6 +292,65 @@ def get_account_access_key_data(
     return access_keys
 
 
+def transform_users(users: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "Arn": user["Arn"],
+            "UserId": user["UserId"],
+            "UserName": user["UserName"],
+            "Path": user["Path"],
+            "CreateDate": str(user["CreateDate"]),
+            "PasswordLastUsed": str(user.get("PasswordLastUsed", "")),
+        }
+        for user in users
+    ]
+
+
+def transform_groups(groups: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "Arn": group["Arn"],
+            "GroupId": group["GroupId"],
+            "GroupName": group["GroupName"],
+            "Path": group["Path"],
+            "CreateDate": str(group["CreateDate"]),
+        }
+        for group in groups
+    ]
+
+
+def _backfill_node_ids(
+    neo4j_session: neo4j.Session,
+    label: str,
+    key: str,
+    ids: Iterable[str],
+) -> None:
+    """
+    IAM nodes used to be merged on `key` and did not always have an `id`, while the data model loaders merge on `id`.
+    Sets `id` on the nodes written by older versions of cartography, or by other modules that merge bare nodes on
+    `key`, so that the data model loaders update these nodes instead of creating duplicates of them. Nodes that already
+    have an `id` are left untouched, so this only writes to the graph when there is something to backfill.
+    :param neo4j_session: The Neo4j session
+    :param label: The label that the loader merges on
+    :param key: The property that the nodes were merged on; the same value is used as `id`
+    :param ids: The ids of the nodes about to be loaded
+    """
+    query = Template(
+        """
+        UNWIND $DictList AS item
+        MATCH (n:$label{$key: item.id})
+        WHERE n.id IS NULL
+        SET n.id = item.id
+        """,
+    ).safe_substitute(label=label, key=key)
+    load_graph_data(
+        neo4j_session,
+        query,
+        ({"id": node_id} for node_id in ids),
+        stat_name=f"{label}.id_backfill",
+    )
+
+
 @timeit
 def load_users(
     neo4j_session: neo4j.Session,
@@ -286,31 +358,16 @@ def load_users(
     current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    ingest_user = """
-    MERGE (unode:AWSUser{arn: $ARN})
-    ON CREATE SET unode:AWSPrincipal, unode.userid = $USERID, unode.firstseen = timestamp(),
-    unode.createdate = $CREATE_DATE
-    SET unode.name = $USERNAME, unode.path = $PATH, unode.passwordlastused = $PASSWORD_LASTUSED,
-    unode.lastupdated = $aws_update_tag
-    WITH unode
-    MATCH (aa:AWSAccount{id: $AWS_ACCOUNT_ID})
-    MERGE (aa)-[r:RESOURCE]->(unode)
-    ON CREATE SET r.firstseen = timestamp()
-    SET r.lastupdated = $aws_update_tag
-    """
     logger.info(f"Loading {len(users)} IAM users.")
-    for user in users:
-        neo4j_session.run(
-            ingest_user,
-            ARN=user["Arn"],
-            USERID=user["UserId"],
-            CREATE_DATE=str(user["CreateDate"]),
-            USERNAME=user["UserName"],
-            PATH=user["Path"],
-            PASSWORD_LASTUSED=str(user.get("PasswordLastUsed", "")),
-            AWS_ACCOUNT_ID=current_aws_account_id,
-            aws_update_tag=aws_update_tag,
-        )
+    data = transform_users(users)
+    _backfill_node_ids(neo4j_session, "AWSUser", "arn", (u["Arn"] for u in data))
+    load(
+        neo4j_session,
+        AWSUserSchema(),
+        data,
+        lastupdated=aws_update_tag,
+        AWS_ID=current_aws_account_id,
+    )
 
 
 @timeit
@@ -320,28 +377,16 @@ def load_groups(
     current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    ingest_group = """
-    MERGE (gnode:AWSGroup{arn: $ARN})
-    ON CREATE SET gnode.groupid = $GROUP_ID, gnode.firstseen = timestamp(), gnode.createdate = $CREATE_DATE
-    SET gnode:AWSPrincipal, gnode.name = $GROUP_NAME, gnode.path = $PATH,gnode.lastupdated = $aws_update_tag
-    WITH gnode
-    MATCH (aa:AWSAccount{id: $AWS_ACCOUNT_ID})
-    MERGE (aa)-[r:RESOURCE]->(gnode)
-    ON CREATE SET r.firstseen = timestamp()
-    SET r.lastupdated = $aws_update_tag
-    """
     logger.info(f"Loading {len(groups)} IAM groups to the graph.")
-    for group in groups:
-        neo4j_session.run(
-            ingest_group,
-            ARN=group["Arn"],
-            GROUP_ID=group["GroupId"],
-            CREATE_DATE=str(group["CreateDate"]),
-            GROUP_NAME=group["GroupName"],
-            PATH=group["Path"],
-            AWS_ACCOUNT_ID=current_aws_account_id,
-            aws_update_tag=aws_update_tag,
-        )
+    data = transform_groups(groups)
+    _backfill_node_ids(neo4j_session, "AWSGroup", "arn", (g["Arn"] for g in data))
+    load(
+        neo4j_session,
+        AWSGroupSchema(),
+        data,
+        lastupdated=aws_update_tag,
+        AWS_ID=current_aws_account_id,
+    )
 
 
 def _parse_principal_entries(principal: Dict) -> List[Tuple[Any, Any]]:
@@ -359,6 +404,41 @@ def _parse_principal_entries(principal: Dict) -> List[Tuple[Any, Any]]:
     return principal_entries
 
 
+def transform_roles(roles: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "Arn": role["Arn"],
+            "RoleId": role["RoleId"],
+            "RoleName": role["RoleName"],
+            "Path": role["Path"],
+            "CreateDate": str(role["CreateDate"]),
+        }
+        for role in roles
+    ]
+
+
+def transform_trusted_principals(roles: List[Dict]) -> List[Dict]:
+    """
+    Flattens the AssumeRolePolicyDocument of every role to one entry per (role, trusted principal) pair.
+    `AccountId` is the account named in the principal ARN, or None for principals like ec2.amazonaws.com.
+    """
+    # TODO support conditions
+    trusted_principals = []
+    for role in roles:
+        for statement in role["AssumeRolePolicyDocument"]["Statement"]:
+            principal_entries = _parse_principal_entries(statement["Principal"])
+            for principal_type, principal_value in principal_entries:
+                trusted_principals.append(
+                    {
+                        "Arn": principal_value,
+                        "Type": principal_type,
+                        "RoleArn": role["Arn"],
+                        "AccountId": get_account_from_arn(principal_value) or None,
+                    },
+                )
+    return trusted_principals
+
+
 @timeit
 def load_roles(
     neo4j_session: neo4j.Session,
@@ -366,33 +446,23 @@ def load_roles(
     current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    ingest_role = """
-    MERGE (rnode:AWSPrincipal{arn: $Arn})
-    ON CREATE SET rnode.firstseen = timestamp()
-    SET
-        rnode:AWSRole,
-        rnode.roleid = $RoleId,
-        rnode.createdate = $CreateDate,
-        rnode.name = $RoleName,
-        rnode.path = $Path,
-        rnode.lastupdated = $aws_update_tag
-    WITH rnode
-    MATCH (aa:AWSAccount{id: $AWS_ACCOUNT_ID})
-    MERGE (aa)-[r:RESOURCE]->(rnode)
-    ON CREATE SET r.firstseen = timestamp()
-    SET r.lastupdated = $aws_update_tag
-    """
+    logger.info(f"Loading {len(roles)} IAM roles to the graph.")
+    role_data = transform_roles(roles)
+    trusted_principals = transform_trusted_principals(roles)
 
-    ingest_policy_statement = """
-    MERGE (spnnode:AWSPrincipal{arn: $SpnArn})
-    ON CREATE SET spnnode.firstseen = timestamp()
-    SET spnnode.lastupdated = $aws_update_tag, spnnode.type = $SpnType
-    WITH spnnode
-    MATCH (role:AWSRole{arn: $RoleArn})
-    MERGE (role)-[r:TRUSTS_AWS_PRINCIPAL]->(spnnode)
-    ON CREATE SET r.firstseen = timestamp()
-    SET r.lastupdated = $aws_update_tag
-    """
+    _backfill_node_ids(
+        neo4j_session,
+        "AWSPrincipal",
+        "arn",
+        {r["Arn"] for r in role_data} | {p["Arn"] for p in trusted_principals},
+    )
+    load(
+        neo4j_session,
+        AWSRoleSchema(),
+        role_data,
+        lastupdated=aws_update_tag,
+        AWS_ID=current_aws_account_id,
+    )
 
     # Note - why we don't set inscope or foreign attribute on the account
     #
@@ -401,102 +471,99 @@ def load_roles(
     # but not sync yet.
     # - The inscope attribute - set when the account is being sync.
     # - The foreign attribute - the attribute assignment logic is in aws_foreign_accounts.json analysis job
-    # - Why seperate statement is needed - the arn may point to service level principals ex - ec2.amazonaws.com
-    ingest_spnmap_statement = """
-    MERGE (aa:AWSAccount{id: $SpnAccountId})
+    ingest_trusted_accounts = """
+    UNWIND $DictList AS item
+    MERGE (aa:AWSAccount{id: item.AccountId})
     ON CREATE SET aa.firstseen = timestamp()
     SET aa.lastupdated = $aws_update_tag
-    WITH aa
-    MATCH (spnnode:AWSPrincipal{arn: $SpnArn})
-    WITH spnnode, aa
-    MERGE (aa)-[r:RESOURCE]->(spnnode)
-    ON CREATE SET r.firstseen = timestamp()
     """
+    trusted_account_ids = {
+        p["AccountId"] for p in trusted_principals if p["AccountId"] is not None
+    }
+    load_graph_data(
+        neo4j_session,
+        ingest_trusted_accounts,
+        [{"AccountId": account_id} for account_id in sorted(trusted_account_ids)],
+        stat_name="AWSAccount.trusted_accounts",
+        aws_update_tag=aws_update_tag,
+    )
+    load(
+        neo4j_session,
+        AWSTrustedPrincipalSchema(),
+        trusted_principals,
+        lastupdated=aws_update_tag,
+    )
 
-    # TODO support conditions
-    logger.info(f"Loading {len(roles)} IAM roles to the graph.")
-    for role in roles:
-        neo4j_session.run(
-            ingest_role,
-            Arn=role["Arn"],
-            RoleId=role["RoleId"],
-            CreateDate=str(role["CreateDate"]),
-            RoleName=role["RoleName"],
-            Path=role["Path"],
-            AWS_ACCOUNT_ID=current_aws_account_id,
-            aws_update_tag=aws_update_tag,
-        )
 
-        for statement in role["AssumeRolePolicyDocument"]["Statement"]:
-            principal_entries = _parse_principal_entries(statement["Principal"])
-            for principal_type, principal_value in principal_entries:
-                neo4j_session.run(
-                    ingest_policy_statement,
-                    SpnArn=principal_value,
-                    SpnType=principal_type,
-                    RoleArn=role["Arn"],
-                    aws_update_tag=aws_update_tag,
-                )
-                spn_arn = get_account_from_arn(principal_value)
-                if spn_arn:
-                    neo4j_session.run(
-                        ingest_spnmap_statement,
-                        SpnArn=principal_value,
-                        SpnAccountId=get_account_from_arn(principal_value),
-                        aws_update_tag=aws_update_tag,
-                    )
+def transform_group_memberships(group_memberships: Dict) -> List[Dict]:
+    return [
+        {"GroupArn": group_arn, "UserArn": info["Arn"]}
+        for group_arn, membership_data in group_memberships.items()
+        for info in membership_data.get("Users", [])
+    ]
 
 
 @timeit
 def load_group_memberships(
     neo4j_session: neo4j.Session,
     group_memberships: Dict,
+    current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    ingest_membership = """
-    MATCH (group:AWSGroup{arn: $GroupArn})
-    WITH group
-    MATCH (user:AWSUser{arn: $PrincipalArn})
-    MERGE (user)-[r:MEMBER_AWS_GROUP]->(group)
-    ON CREATE SET r.firstseen = timestamp()
-    SET r.lastupdated = $aws_update_tag
-    WITH user, group
+    memberships = transform_group_memberships(group_memberships)
+    load_matchlinks(
+        neo4j_session,
+        AWSUserToAWSGroupMatchLink(),
+        memberships,
+        lastupdated=aws_update_tag,
+        _sub_resource_label="AWSAccount",
+        _sub_resource_id=current_aws_account_id,
+    )
+
+    # Users inherit the policies of the groups they belong to.
+    ingest_inherited_policies = """
+    UNWIND $DictList AS item
+    MATCH (user:AWSUser{arn: item.UserArn})-[:MEMBER_AWS_GROUP]->(group:AWSGroup{arn: item.GroupArn})
     MATCH (group)-[:POLICY]->(policy:AWSPolicy)
-    MERGE (user)-[r2:POLICY]->(policy)
-    SET r2.lastupdated = $aws_update_tag
+    MERGE (user)-[r:POLICY]->(policy)
+    SET r.lastupdated = $aws_update_tag
     """
-
-    for group_arn, membership_data in group_memberships.items():
-        for info in membership_data.get("Users", []):
-            principal_arn = info["Arn"]
-            neo4j_session.run(
-                ingest_membership,
-                GroupArn=group_arn,
-                PrincipalArn=principal_arn,
-                aws_update_tag=aws_update_tag,
-            )
+    load_graph_data(
+        neo4j_session,
+        ingest_inherited_policies,
+        memberships,
+        stat_name="AWSUser.group_policies",
+        aws_update_tag=aws_update_tag,
+    )
 
 
 @timeit
-def get_policies_for_principal(
+def get_policies_for_principals(
     neo4j_session: neo4j.Session,
-    principal_arn: str,
-) -> Dict:
+    principal_arns: Iterable[str],
+) -> Dict[str, Dict]:
+    """
+    Reads the policies of all the given principals in one query.
+    :return: A dict of principal ARN to a dict of policy id to the policy's statements. Principals without policies
+    are omitted.
+    """
     get_policy_query = """
+    UNWIND $Arns AS arn
     MATCH
-    (principal:AWSPrincipal{arn:$Arn})-[:POLICY]->
+    (principal:AWSPrincipal{arn:arn})-[:POLICY]->
     (policy:AWSPolicy)-[:STATEMENT]->
     (statements:AWSPolicyStatement)
     RETURN
-    DISTINCT policy.id AS policy_id,
+    DISTINCT principal.arn AS principal_arn, policy.id AS policy_id,
     COLLECT(DISTINCT statements) AS statements
     """
-    results = neo4j_session.run(
-        get_policy_query,
-        Arn=principal_arn,
-    )
-    policies = {r["policy_id"]: parse_statement_node(r["statements"]) for r in results}
-    return policies
+    results = neo4j_session.run(get_policy_query, Arns=sorted(set(principal_arns)))
+    principals: Dict[str, Dict] = {}
+    for r in results:
+        principals.setdefault(r["principal_arn"], {})[r["policy_id"]] = (
+            parse_statement_node(r["statements"])
+        )
+    return principals
 
 
 @timeit
@@ -522,10 +589,9 @@ def sync_assumerole_relationships(
     """
 
     ingest_policies_assume_role = """
-    MATCH (source:AWSPrincipal{arn: $SourceArn})
-    WITH source
-    MATCH (role:AWSRole{arn: $TargetArn})
-    WITH role, source
+    UNWIND $DictList AS item
+    MATCH (source:AWSPrincipal{arn: item.principal_arn})
+    MATCH (role:AWSRole{arn: item.resource_arn})
     MERGE (source)-[r:STS_ASSUMEROLE_ALLOW]->(role)
     ON CREATE SET r.firstseen = timestamp()
     SET r.lastupdated = $aws_update_tag
@@ -535,16 +601,31 @@ def sync_assumerole_relationships(
         query_potential_matches,
         AccountId=current_aws_account_id,
     )
-    potential_matches = [(r["source_arn"], r["target_arn"]) for r in results]
-    for source_arn, target_arn in potential_matches:
-        policies = get_policies_for_principal(neo4j_session, source_arn)
-        if principal_allowed_on_resource(policies, target_arn, ["sts:AssumeRole"]):
-            neo4j_session.run(
-                ingest_policies_assume_role,
-                SourceArn=source_arn,
-                TargetArn=target_arn,
-                aws_update_tag=aws_update_tag,
-            )
+    potential_matches = {(r["source_arn"], r["target_arn"]) for r in results}
+
+    # Evaluate every source principal against every target role at once, then keep the pairs where the role trusts the
+    # principal. See calculate_permission_relationships().
+    principals = get_policies_for_principals(
+        neo4j_session,
+        (source_arn for source_arn, _ in potential_matches),
+    )
+    target_arns = sorted({target_arn for _, target_arn in potential_matches})
+    allowed_mappings = [
+        mapping
+        for mapping in calculate_permission_relationships(
+            principals,
+            target_arns,
+            ["sts:AssumeRole"],
+        )
+        if (mapping["principal_arn"], mapping["resource_arn"]) in potential_matches
+    ]
+    load_graph_data(
+        neo4j_session,
+        ingest_policies_assume_role,
+        allowed_mappings,
+        stat_name="AWSRole.assumerole_relationships",
+        aws_update_tag=aws_update_tag,
+    )
     run_cleanup_job(
         "aws_import_roles_policy_cleanup.json",
         neo4j_session,
@@ -552,43 +633,44 @@ def sync_assumerole_relationships(
     )
 
 
+def transform_user_access_keys(user_access_keys: Dict) -> List[Dict]:
+    return [
+        {
+            "UserArn": arn,
+            "AccessKeyId": key["AccessKeyId"],
+            "CreateDate": str(key["CreateDate"]),
+            "Status": key["Status"],
+            "LastUsedDate": key["LastUsedDate"],
+            "LastUsedService": key["LastUsedService"],
+            "LastUsedRegion": key["LastUsedRegion"],
+        }
+        for arn, access_keys in user_access_keys.items()
+        for key in access_keys["AccessKeyMetadata"]
+        if key.get("AccessKeyId")
+    ]
+
+
 @timeit
 def load_user_access_keys(
     neo4j_session: neo4j.Session,
     user_access_keys: Dict,
+    current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    # TODO change the node label to reflect that this is a user access key, not an account access key
-    ingest_account_key = """
-    MATCH (user:AWSUser{arn: $UserARN})
-    WITH user
-    MERGE (key:AccountAccessKey{accesskeyid: $AccessKeyId})
-    ON CREATE SET key.firstseen = timestamp(), key.createdate = $CreateDate
-    SET key.status = $Status,
-        key.lastupdated = $aws_update_tag,
-        key.lastuseddate = $LastUsedDate,
-        key.lastusedservice = $LastUsedService,
-        key.lastusedregion = $LastUsedRegion
-    WITH user,key
-    MERGE (user)-[r:AWS_ACCESS_KEY]->(key)
-    ON CREATE SET r.firstseen = timestamp()
-    SET r.lastupdated = $aws_update_tag
-    """
-
-    for arn, access_keys in user_access_keys.items():
-        for key in access_keys["AccessKeyMetadata"]:
-            if key.get("AccessKeyId"):
-                neo4j_session.run(
-                    ingest_account_key,
-                    UserARN=arn,
-                    AccessKeyId=key["AccessKeyId"],
-                    CreateDate=str(key["CreateDate"]),
-                    Status=key["Status"],
-                    LastUsedDate=key["LastUsedDate"],
-                    LastUsedService=key["LastUsedService"],
-                    LastUsedRegion=key["LastUsedRegion"],
-                    aws_update_tag=aws_update_tag,
-                )
+    data = transform_user_access_keys(user_access_keys)
+    _backfill_node_ids(
+        neo4j_session,
+        "AccountAccessKey",
+        "accesskeyid",
+        (k["AccessKeyId"] for k in data),
+    )
+    load(
+        neo4j_session,
+        AccountAccessKeySchema(),
+        data,
+        lastupdated=aws_update_tag,
+        AWS_ID=current_aws_account_id,
+    )
 
 
 def ensure_list(obj: Any) -> List[Any]:
@@ -982,7 +1064,12 @@ def sync_group_memberships(
         group["arn"]: get_group_membership_data(boto3_session, group["name"])
         for group in groups
     }
-    load_group_memberships(neo4j_session, groups_membership, aws_update_tag)
+    load_group_memberships(
+        neo4j_session,
+        groups_membership,
+        current_aws_account_id,
+        aws_update_tag,
+    )
     run_cleanup_job(
         "aws_import_groups_membership_cleanup.json",
         neo4j_session,
@@ -1006,11 +1093,18 @@ def sync_user_access_keys(
         "MATCH (user:AWSUser)<-[:RESOURCE]-(:AWSAccount{id: $AWS_ACCOUNT_ID}) "
         "RETURN user.name as name, user.arn as arn"
     )
-    for user in neo4j_session.run(query, AWS_ACCOUNT_ID=current_aws_account_id):
+    users = neo4j_session.run(query, AWS_ACCOUNT_ID=current_aws_account_id).data()
+    account_access_keys: Dict = {}
+    for user in users:
         access_keys = get_account_access_key_data(boto3_session, user["name"])
         if access_keys:
-            account_access_keys = {user["arn"]: access_keys}
-            load_user_access_keys(neo4j_session, account_access_keys, aws_update_tag)
+            account_access_keys[user["arn"]] = access_keys
+    load_user_access_keys(
+        neo4j_session,
+        account_access_keys,
+        current_aws_account_id,
+        aws_update_tag,
+    )
     run_cleanup_job(
         "aws_import_account_access_key_cleanup.json",
         neo4j_session,
@@ -8,6 +8,8 @@ import boto3
 import botocore
 import neo4j
 
+from cartography.intel.aws.util.regions import fetch_regions_concurrently
+from cartography.intel.aws.util.regions import get_max_concurrent_regions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -140,6 +142,14 @@ def get_lambda_function_details(
     return details
 
 
+def _get_lambda_data_and_details(
+    boto3_session: boto3.session.Session,
+    region: str,
+) -> Tuple[List[Dict], List[Tuple[str, List[Any], List[Any], List[Any]]]]:
+    data = get_lambda_data(boto3_session, region)
+    return data, get_lambda_function_details(boto3_session, data, region)
+
+
 @timeit
 def load_lambda_function_details(
     neo4j_session: neo4j.Session,
@@ -283,13 +293,17 @@ def sync_lambda_functions(
     aws_update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
-    for region in regions:
+    for region, (data, lambda_function_details) in fetch_regions_concurrently(
+        _get_lambda_data_and_details,
+        boto3_session,
+        regions,
+        max_workers=get_max_concurrent_regions(common_job_parameters),
+    ):
         logger.info(
             "Syncing Lambda for region in '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_lambda_data(boto3_session, region)
         load_lambda_functions(
             neo4j_session,
             data,
@@ -297,11 +311,6 @@ def sync_lambda_functions(
             current_aws_account_id,
             aws_update_tag,
         )
-        lambda_function_details = get_lambda_function_details(
-            boto3_session,
-            data,
-            region,
-        )
         load_lambda_function_details(
             neo4j_session,
             lambda_function_details,
@@ -113,7 +113,7 @@ def load_aws_accounts(
     WITH aa
     MERGE (root:AWSPrincipal{arn: $RootArn})
     ON CREATE SET root.firstseen = timestamp(), root.type = 'AWS'
-    SET root.lastupdated = $aws_update_tag
+    SET root.lastupdated = $aws_update_tag, root.id = $RootArn
     WITH aa, root
     MERGE (aa)-[r:RESOURCE]->(root)
     ON CREATE SET r.firstseen = timestamp()
@@ -1,9 +1,15 @@
 import logging
+import multiprocessing
 import os
 import re
+from bisect import bisect_left
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
 from string import Template
 from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Pattern
 from typing import Tuple
@@ -13,10 +19,16 @@ import neo4j
 import yaml
 
 from cartography.graph.statement import GraphStatement
+from cartography.util import batch
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+# Key in common_job_parameters holding the value of `--permission-relationships-workers`.
+WORKERS_PARAM = "permission_relationships_workers"
+# Number of principal-to-resource mappings written per Neo4j query by load_principal_mappings().
+PRINCIPAL_MAPPINGS_BATCH_SIZE = 10000
+
 
 def evaluate_clause(clause: str, match: str) -> bool:
     """Evaluates the a clause in IAM. Clauses can be AWS [not]actions and [not]resources
@@ -178,6 +190,215 @@ def principal_allowed_on_resource(
     return granted
 
 
+# Characters that end the literal prefix of a clause regex built by compile_regex().
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]()|\\")
+# Regex quantifiers, which make the character before them optional or repeated.
+_REGEX_QUANTIFIERS = frozenset("*+?{")
+_STATEMENT_CLAUSES = ("action", "notaction", "resource", "notresource")
+
+
+def _literal_prefix(clause: Pattern) -> str:
+    """
+    Returns the lowercased literal text that every ARN fully matched by the given case-insensitive clause must start
+    with, e.g. "arn:aws:s3:::bucket-" for the clause "arn:aws:s3:::bucket-*". Returns "" if there is none, in which case
+    the clause has to be tested against every resource.
+    """
+    regex = clause.pattern
+    if not clause.flags & re.IGNORECASE or "|" in regex:
+        return ""
+    prefix: List[str] = []
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\" and regex[i + 1 : i + 2] == ".":
+            prefix.append(".")
+            i += 2
+            continue
+        if char in _REGEX_QUANTIFIERS:
+            if prefix:
+                prefix.pop()
+            break
+        if char in _REGEX_SPECIAL_CHARS or not char.isascii():
+            break
+        prefix.append(char.lower())
+        i += 1
+    return "".join(prefix)
+
+
+def _indexes_to_mask(indexes: List[int], size: int) -> int:
+    bits = bytearray(size // 8 + 1)
+    for i in indexes:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _mask_to_indexes(mask: int) -> Iterator[int]:
+    bits = bin(mask)[:1:-1]
+    i = bits.find("1")
+    while i != -1:
+        yield i
+        i = bits.find("1", i + 1)
+
+
+class _ResourceIndex:
+    """
+    The resources that permission relationships are evaluated against. Sets of resources are represented as int
+    bitmasks, where bit i stands for resource_arns[i], so that a policy can be evaluated against every resource at once
+    with a few bitwise operations. Resource clauses are matched through an index of ARNs sorted by their literal prefix,
+    and each distinct clause is only matched once.
+    """
+
+    def __init__(self, resource_arns: List[str]):
+        self.resource_arns = resource_arns
+        self.all_resources = (1 << len(resource_arns)) - 1
+        indexed = sorted(
+            (arn.lower(), i) for i, arn in enumerate(resource_arns) if arn.isascii()
+        )
+        self._sorted_arns = [arn for arn, _ in indexed]
+        self._sorted_positions = [i for _, i in indexed]
+        # Non-ASCII ARNs can match case-insensitively in ways that lower() does not capture, so always test them.
+        self._unindexed = [
+            i for i, arn in enumerate(resource_arns) if not arn.isascii()
+        ]
+        self._clause_masks: Dict[Tuple[str, int], int] = {}
+
+    def match(self, clause: Pattern) -> int:
+        key = (clause.pattern, clause.flags)
+        mask = self._clause_masks.get(key)
+        if mask is None:
+            mask = self._match_uncached(clause)
+            self._clause_masks[key] = mask
+        return mask
+
+    def _match_uncached(self, clause: Pattern) -> int:
+        prefix = _literal_prefix(clause)
+        start = bisect_left(self._sorted_arns, prefix)
+        end = bisect_left(self._sorted_arns, prefix + "\x80", lo=start)
+        candidates = self._sorted_positions[start:end] + self._unindexed
+        matched = [
+            i for i in candidates if clause.fullmatch(self.resource_arns[i]) is not None
+        ]
+        return _indexes_to_mask(matched, len(self.resource_arns))
+
+
+class _PermissionEvaluator:
+    """
+    Evaluates principals' policies against every resource of a _ResourceIndex at once, with the same semantics as
+    principal_allowed_on_resource(). Decisions are cached per clause, per statement and per policy, since the same
+    managed policies and wildcard resources are shared by many principals.
+    """
+
+    def __init__(self, resources: _ResourceIndex, permissions: List[str]):
+        self.resources = resources
+        self.permissions = permissions
+        self._compiled: Dict[Any, Pattern] = {}
+        self._action_matches: Dict[Tuple[Tuple[str, int], str], bool] = {}
+        self._statement_masks: Dict[Tuple, int] = {}
+        self._policy_masks: Dict[Tuple, Tuple[int, int]] = {}
+
+    def _clauses(self, statement: Dict, clause_name: str) -> Tuple[Pattern, ...]:
+        clauses = []
+        for clause in statement.get(clause_name, ()):
+            if isinstance(clause, str):
+                if clause not in self._compiled:
+                    self._compiled[clause] = compile_regex(clause)
+                clause = self._compiled[clause]
+            clauses.append(clause)
+        return tuple(clauses)
+
+    def _any_action_matches(
+        self, clauses: Tuple[Pattern, ...], permission: str
+    ) -> bool:
+        for clause in clauses:
+            key = ((clause.pattern, clause.flags), permission)
+            matched = self._action_matches.get(key)
+            if matched is None:
+                matched = clause.fullmatch(permission) is not None
+                self._action_matches[key] = matched
+            if matched:
+                return True
+        return False
+
+    def _resource_mask(
+        self,
+        resource: Tuple[Pattern, ...],
+        notresource: Tuple[Pattern, ...],
+    ) -> int:
+        key = (resource, notresource)
+        mask = self._statement_masks.get(key)
+        if mask is None:
+            mask = 0
+            for clause in resource:
+                mask |= self.resources.match(clause)
+            for clause in notresource:
+                mask &= ~self.resources.match(clause)
+            self._statement_masks[key] = mask
+        return mask
+
+    def evaluate_policy(self, statements: List[Dict]) -> Tuple[int, int]:
+        """
+        Returns (allowed, explicitly_denied) resource masks for one policy. Like evaluate_policy_for_permissions(), a
+        policy decides a resource on the first permission that it denies or allows.
+        """
+        parsed = []
+        for statement in statements:
+            clauses = {
+                name: self._clauses(statement, name) for name in _STATEMENT_CLAUSES
+            }
+            parsed.append(
+                (
+                    statement["effect"],
+                    "action" in statement,
+                    clauses["action"],
+                    clauses["notaction"],
+                    clauses["resource"],
+                    clauses["notresource"],
+                ),
+            )
+        key = tuple(parsed)
+        cached = self._policy_masks.get(key)
+        if cached is not None:
+            return cached
+
+        undecided = self.resources.all_resources
+        allowed = 0
+        denied = 0
+        for permission in self.permissions:
+            deny_mask = 0
+            allow_mask = 0
+            for effect, has_action, action, notaction, resource, notresource in parsed:
+                if effect not in ("Allow", "Deny"):
+                    continue
+                if self._any_action_matches(notaction, permission):
+                    continue
+                if has_action and not self._any_action_matches(action, permission):
+                    continue
+                if effect == "Deny":
+                    deny_mask |= self._resource_mask(resource, notresource)
+                else:
+                    allow_mask |= self._resource_mask(resource, notresource)
+            denied |= undecided & deny_mask
+            allowed |= undecided & allow_mask & ~deny_mask
+            undecided &= ~(deny_mask | allow_mask)
+            if not undecided:
+                break
+        self._policy_masks[key] = (allowed, denied)
+        return allowed, denied
+
+    def evaluate_principal(self, policies: Dict) -> int:
+        """
+        Returns the mask of resources that the given policies allow, i.e. that at least one policy allows and that no
+        policy explicitly denies.
+        """
+        granted = 0
+        denied = 0
+        for statements in policies.values():
+            allowed, explicit_deny = self.evaluate_policy(statements)
+            granted |= allowed
+            denied |= explicit_deny
+        return granted & ~denied
+
+
 def calculate_permission_relationships(
     principals: Dict,
     resource_arns: List[str],
@@ -189,6 +410,9 @@ def calculate_permission_relationships(
     Permission Boundaries - Boundaries for an IAM principal
     Session Policies - Special policies for Federated users
 
+    The result is the same as calling principal_allowed_on_resource() for every resource and principal, but each
+    policy is evaluated once against all resources instead of once per resource. See _PermissionEvaluator.
+
     AWS Policy evaluation reference
     https://docs.aws.amazon.com/IAM/latest/UserGuide/reference_policies_evaluation-logic.html
 
@@ -198,16 +422,75 @@ def calculate_permission_relationships(
         permissions {[str]} -- The permissions to evaluate
 
     Returns:
-        [dict] -- The allowed mappings
+        [dict] -- The allowed mappings, ordered by resource and then by principal
     """
-    allowed_mappings: List[Dict] = []
-    for resource_arn in resource_arns:
-        for principal_arn, policies in principals.items():
-            if principal_allowed_on_resource(policies, resource_arn, permissions):
-                allowed_mappings.append(
-                    {"principal_arn": principal_arn, "resource_arn": resource_arn},
-                )
-    return allowed_mappings
+    if not isinstance(permissions, list):
+        raise ValueError("permissions is not a list")
+    evaluator = _PermissionEvaluator(_ResourceIndex(resource_arns), permissions)
+    allowed_pairs: List[Tuple[int, int]] = []
+    for principal_index, policies in enumerate(principals.values()):
+        allowed = evaluator.evaluate_principal(policies)
+        allowed_pairs.extend(
+            (resource_index, principal_index)
+            for resource_index in _mask_to_indexes(allowed)
+        )
+    allowed_pairs.sort()
+
+    principal_arns = list(principals.keys())
+    return [
+        {
+            "principal_arn": principal_arns[principal_index],
+            "resource_arn": resource_arns[resource_index],
+        }
+        for resource_index, principal_index in allowed_pairs
+    ]
+
+
+def _shard_principals(principals: Dict, shards: int) -> List[Dict]:
+    """
+    Splits the principals into at most `shards` dicts of about the same size.
+    """
+    items = list(principals.items())
+    return [dict(items[i::shards]) for i in range(min(shards, len(items)))]
+
+
+def calculate_permission_relationships_in_processes(
+    executor: ProcessPoolExecutor,
+    principals: Dict,
+    resource_arns: List[str],
+    permissions: List[str],
+    shards: int,
+) -> Iterator[List[Dict]]:
+    """
+    Runs calculate_permission_relationships() on `shards` shards of the principals in the given process pool, and
+    yields each shard's allowed mappings as soon as it is ready. Together, the yielded lists contain the same mappings
+    as calculate_permission_relationships(principals, resource_arns, permissions), in a different order.
+
+    Arguments:
+        executor {ProcessPoolExecutor} -- The process pool to run the shards in
+        principals {[dict]} -- The principals to check permission for, with compiled statements
+        resource_arns {[str]} -- The resources to test the permission against
+        permissions {[str]} -- The permissions to evaluate
+        shards {int} -- The number of shards to split the principals into, usually the number of workers
+
+    Returns:
+        [[dict]] -- An iterator of allowed mappings, one list per shard
+    """
+    futures = [
+        executor.submit(
+            calculate_permission_relationships,
+            shard,
+            resource_arns,
+            permissions,
+        )
+        for shard in _shard_principals(principals, shards)
+    ]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
 
 
 def parse_statement_node(node_group: List[Any]) -> List[Any]:
@@ -341,11 +624,15 @@ def load_principal_mappings(
         node_label=node_label,
         relationship_name=relationship_name,
     )
-    neo4j_session.run(
-        map_policy_query_template,
-        Mapping=principal_mappings,
-        aws_update_tag=update_tag,
-    )
+    for mappings_batch in batch(
+        principal_mappings,
+        size=PRINCIPAL_MAPPINGS_BATCH_SIZE,
+    ):
+        neo4j_session.run(
+            map_policy_query_template,
+            Mapping=mappings_batch,
+            aws_update_tag=update_tag,
+        )
 
 
 def cleanup_rpr(
@@ -431,6 +718,41 @@ def sync(
         )
         return
     relationship_mapping = parse_permission_relationships_file(pr_file)
+    workers = common_job_parameters.get(WORKERS_PARAM) or 1
+    if workers > 1 and len(principals) > 1:
+        # Use fresh interpreters rather than forking this process, which may be running other sync threads.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            _sync_relationship_mapping(
+                neo4j_session,
+                relationship_mapping,
+                principals,
+                current_aws_account_id,
+                update_tag,
+                executor,
+                workers,
+            )
+    else:
+        _sync_relationship_mapping(
+            neo4j_session,
+            relationship_mapping,
+            principals,
+            current_aws_account_id,
+            update_tag,
+        )
+
+
+def _sync_relationship_mapping(
+    neo4j_session: neo4j.Session,
+    relationship_mapping: List[Any],
+    principals: Dict,
+    current_aws_account_id: str,
+    update_tag: int,
+    executor: ProcessPoolExecutor | None = None,
+    workers: int = 1,
+) -> None:
     for rpr in relationship_mapping:
         if not is_valid_rpr(rpr):
             raise ValueError(
@@ -452,18 +774,31 @@ def sync(
             relationship_name,
             target_label,
         )
-        allowed_mappings = calculate_permission_relationships(
-            principals,
-            resource_arns,
-            permissions,
-        )
-        load_principal_mappings(
-            neo4j_session,
-            allowed_mappings,
-            target_label,
-            relationship_name,
-            update_tag,
-        )
+        mappings_per_shard: Iterable[List[Dict]]
+        if executor is None:
+            mappings_per_shard = [
+                calculate_permission_relationships(
+                    principals,
+                    resource_arns,
+                    permissions,
+                ),
+            ]
+        else:
+            mappings_per_shard = calculate_permission_relationships_in_processes(
+                executor,
+                principals,
+                resource_arns,
+                permissions,
+                workers,
+            )
+        for allowed_mappings in mappings_per_shard:
+            load_principal_mappings(
+                neo4j_session,
+                allowed_mappings,
+                target_label,
+                relationship_name,
+                update_tag,
+            )
         cleanup_rpr(
             neo4j_session,
             target_label,
@@ -6,6 +6,8 @@ from typing import List
 import boto3
 import neo4j
 
+from cartography.intel.aws.util.regions import fetch_regions_concurrently
+from cartography.intel.aws.util.regions import get_max_concurrent_regions
 from cartography.stats import get_stats_client
 from cartography.util import aws_handle_regions
 from cartography.util import aws_paginate
@@ -656,13 +658,17 @@ def sync_rds_clusters(
     """
     Grab RDS instance data from AWS, ingest to neo4j, and run the cleanup job.
     """
-    for region in regions:
+    for region, data in fetch_regions_concurrently(
+        get_rds_cluster_data,
+        boto3_session,
+        regions,
+        max_workers=get_max_concurrent_regions(common_job_parameters),
+    ):
         logger.info(
             "Syncing RDS for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_rds_cluster_data(boto3_session, region)
         load_rds_clusters(neo4j_session, data, region, current_aws_account_id, update_tag)  # type: ignore
     cleanup_rds_clusters(neo4j_session, common_job_parameters)
 
@@ -679,13 +685,17 @@ def sync_rds_instances(
     """
     Grab RDS instance data from AWS, ingest to neo4j, and run the cleanup job.
     """
-    for region in regions:
+    for region, data in fetch_regions_concurrently(
+        get_rds_instance_data,
+        boto3_session,
+        regions,
+        max_workers=get_max_concurrent_regions(common_job_parameters),
+    ):
         logger.info(
             "Syncing RDS for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_rds_instance_data(boto3_session, region)
         load_rds_instances(neo4j_session, data, region, current_aws_account_id, update_tag)  # type: ignore
     cleanup_rds_instances_and_db_subnet_groups(neo4j_session, common_job_parameters)
 
@@ -702,13 +712,17 @@ def sync_rds_snapshots(
     """
     Grab RDS snapshot data from AWS, ingest to neo4j, and run the cleanup job.
     """
-    for region in regions:
+    for region, data in fetch_regions_concurrently(
+        get_rds_snapshot_data,
+        boto3_session,
+        regions,
+        max_workers=get_max_concurrent_regions(common_job_parameters),
+    ):
         logger.info(
             "Syncing RDS for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_rds_snapshot_data(boto3_session, region)
         load_rds_snapshots(neo4j_session, data, region, current_aws_account_id, update_tag)  # type: ignore
     cleanup_rds_snapshots(neo4j_session, common_job_parameters)
 
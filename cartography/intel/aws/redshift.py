@@ -145,6 +145,7 @@ def _attach_iam_roles(
     attach_cluster_to_role = """
     MATCH (c:RedshiftCluster{id:$ClusterArn})
     MERGE (p:AWSPrincipal{arn:$RoleArn})
+    SET p.id = $RoleArn
     MERGE (c)-[s:STS_ASSUMEROLE_ALLOW]->(p)
     ON CREATE SET s.firstseen = timestamp()
     SET s.lastupdated = $aws_update_tag
@@ -1,7 +1,9 @@
 import logging
+from collections import defaultdict
 from string import Template
 from typing import Dict
 from typing import List
+from typing import Optional
 
 import boto3
 import neo4j
@@ -14,6 +16,11 @@ from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of resource types passed in the ResourceTypeFilters of a single get_resources sweep.
+MAX_RESOURCE_TYPE_FILTERS = 100
+# Number of tag mappings written per transaction by load_tags().
+TAG_LOAD_BATCH_SIZE = 1000
+
 
 def get_short_id_from_ec2_arn(arn: str) -> str:
     """
@@ -153,6 +160,13 @@ TAG_RESOURCE_TYPE_MAPPINGS: Dict = {
     "sqs": {"label": "SQSQueue", "property": "id"},
 }
 
+# Resource types of TAG_RESOURCE_TYPE_MAPPINGS whose ARNs name their resource differently, keyed by the
+# "<service>:<resource segment>" read from the ARN.
+# e.g. Elastic IP ARNs are arn:aws:ec2:<region>:<account>:elastic-ip/eipalloc-1234.
+ARN_RESOURCE_TYPE_ALIASES: Dict[str, str] = {
+    "ec2:elastic-ip": "ec2:elastic-ip-address",
+}
+
 
 @timeit
 @aws_handle_regions
@@ -182,6 +196,83 @@ def get_tags(
     return resources
 
 
+@timeit
+@aws_handle_regions
+def get_tags_for_resource_types(
+    boto3_session: boto3.session.Session,
+    resource_types: List[str],
+    region: str,
+) -> List[Dict]:
+    """
+    Retrieve the tag data of all the given resource types in the region with a single paginated get_resources sweep,
+    instead of one sweep per resource type as done by get_tags(). IAM roles are not supported by
+    resourcegroupstaggingapi and are skipped; use get_tags(boto3_session, "iam:role", region) for them.
+    """
+    resource_types = [rt for rt in resource_types if rt != "iam:role"]
+    client = boto3_session.client("resourcegroupstaggingapi", region_name=region)
+    paginator = client.get_paginator("get_resources")
+    resources: List[Dict] = []
+    for i in range(0, len(resource_types), MAX_RESOURCE_TYPE_FILTERS):
+        for page in paginator.paginate(
+            ResourceTypeFilters=resource_types[i : i + MAX_RESOURCE_TYPE_FILTERS],
+        ):
+            resources.extend(page["ResourceTagMappingList"])
+    return resources
+
+
+def get_resource_type_from_arn(arn: str, resource_types: List[str]) -> Optional[str]:
+    """
+    Return the key of `resource_types` that the ARN belongs to, or None if it matches none of them.
+    For example, for "arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/app/foo/ab123", return
+    'elasticloadbalancing:loadbalancer/app'; for "arn:aws:rds:us-east-1:1234:db:foo", return 'rds:db'; and for
+    "arn:aws:s3:::bucket_name", return 's3'. ARN resource segments listed in ARN_RESOURCE_TYPE_ALIASES are matched
+    as their alias, e.g. "arn:aws:ec2:us-east-1:1234:elastic-ip/eipalloc-1" as 'ec2:elastic-ip-address'.
+    :param arn: The resource's full ARN
+    :param resource_types: The resource types to match, as used in ResourceTypeFilters
+    :return: The matching resource type
+    """
+    parts = arn.split(":", 5)
+    if len(parts) < 6:
+        return None
+    service = parts[2]
+    resource_path = parts[5].replace(":", "/").split("/")
+    candidates = [service]
+    if resource_path[0]:
+        candidates.insert(0, f"{service}:{resource_path[0]}")
+        # e.g. elasticloadbalancing:loadbalancer/app, but not a classic load balancer named "app"
+        if len(resource_path) > 2:
+            candidates.insert(0, f"{service}:{resource_path[0]}/{resource_path[1]}")
+    for candidate in candidates:
+        candidate = ARN_RESOURCE_TYPE_ALIASES.get(candidate, candidate)
+        if candidate in resource_types:
+            return candidate
+    return None
+
+
+@timeit
+def group_tags_by_resource_type(
+    tag_data: List[Dict],
+    resource_types: List[str],
+) -> Dict[str, List[Dict]]:
+    """
+    Route the tag mappings returned by get_tags_for_resource_types() to their resource type, so that each type can be
+    transformed and loaded to its node label. Mappings of other resource types are dropped.
+    """
+    grouped: Dict[str, List[Dict]] = defaultdict(list)
+    for tag_mapping in tag_data:
+        resource_type = get_resource_type_from_arn(
+            tag_mapping["ResourceARN"],
+            resource_types,
+        )
+        if resource_type is None:
+            logger.debug(
+                f"Skipping tags of unsupported resource {tag_mapping['ResourceARN']}",
+            )
+            continue
+        grouped[resource_type].append(tag_mapping)
+    return grouped
+
+
 def _load_tags_tx(
     tx: neo4j.Transaction,
     tag_data: Dict,
@@ -235,7 +326,7 @@ def load_tags(
     if len(tag_data) == 0:
         # If there is no data to load, save some time.
         return
-    for tag_data_batch in batch(tag_data, size=100):
+    for tag_data_batch in batch(tag_data, size=TAG_LOAD_BATCH_SIZE):
         neo4j_session.write_transaction(
             _load_tags_tx,
             tag_data=tag_data_batch,
@@ -281,12 +372,19 @@ def sync(
     common_job_parameters: Dict,
     tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
 ) -> None:
-    for region in regions:
+    resource_types = list(tag_resource_type_mappings.keys())
+    for i, region in enumerate(regions):
         logger.info(
             f"Syncing AWS tags for account {current_aws_account_id} and region {region}",
         )
-        for resource_type in tag_resource_type_mappings.keys():
-            tag_data = get_tags(boto3_session, resource_type, region)
+        tag_data_by_type = group_tags_by_resource_type(
+            get_tags_for_resource_types(boto3_session, resource_types, region),
+            resource_types,
+        )
+        # IAM roles are global and are not returned by resourcegroupstaggingapi: fetch their tags once per account.
+        if i == 0 and "iam:role" in tag_resource_type_mappings:
+            tag_data_by_type["iam:role"] = get_tags(boto3_session, "iam:role", region)
+        for resource_type, tag_data in tag_data_by_type.items():
             transform_tags(tag_data, resource_type)  # type: ignore
             logger.info(
                 f"Loading {len(tag_data)} tags for resource type {resource_type}",
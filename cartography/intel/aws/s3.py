@@ -2,7 +2,11 @@ import asyncio
 import hashlib
 import json
 import logging
+from collections import Counter
+from collections import defaultdict
+from collections import deque
 from typing import Any
+from typing import Deque
 from typing import Dict
 from typing import Generator
 from typing import List
@@ -23,11 +27,26 @@ from cartography.util import run_analysis_job
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 from cartography.util import to_asynchronous
-from cartography.util import to_synchronous
 
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Key in common_job_parameters holding the value of `--aws-s3-max-concurrent-buckets`.
+MAX_CONCURRENT_BUCKETS_PARAM = "aws_s3_max_concurrent_buckets"
+DEFAULT_MAX_CONCURRENT_BUCKETS = 10
+# Number of buckets whose details are parsed and loaded to the graph together by load_s3_details().
+S3_DETAILS_BATCH_SIZE = 1000
+
+BucketDetail = Tuple[
+    str,
+    Dict[str, Any],
+    Dict[str, Any],
+    Dict[str, Any],
+    Dict[str, Any],
+    Dict[str, Any],
+    Dict[str, Any],
+]
+
 
 @timeit
 def get_s3_bucket_list(boto3_session: boto3.session.Session) -> List[Dict]:
@@ -51,28 +70,36 @@ def get_s3_bucket_list(boto3_session: boto3.session.Session) -> List[Dict]:
     return buckets
 
 
+def get_max_concurrent_buckets(common_job_parameters: Dict[str, Any]) -> int:
+    """
+    Returns the number of buckets per region whose details are fetched concurrently, as configured with
+    `--aws-s3-max-concurrent-buckets`. Defaults to DEFAULT_MAX_CONCURRENT_BUCKETS.
+    """
+    return max(
+        common_job_parameters.get(MAX_CONCURRENT_BUCKETS_PARAM)
+        or DEFAULT_MAX_CONCURRENT_BUCKETS,
+        1,
+    )
+
+
 @timeit
 def get_s3_bucket_details(
     boto3_session: boto3.session.Session,
     bucket_data: Dict,
-) -> Generator[Tuple[str, Dict, Dict, Dict, Dict, Dict, Dict], None, None]:
+    max_concurrent_buckets: int = DEFAULT_MAX_CONCURRENT_BUCKETS,
+) -> Generator[BucketDetail, None, None]:
     """
     Iterates over all S3 buckets. Yields bucket name (string), S3 bucket policies (JSON), ACLs (JSON),
     default encryption policy (JSON), Versioning (JSON), and Public Access Block (JSON)
+
+    Details are yielded as soon as they are fetched, so not in the order of `bucket_data`. At most
+    `max_concurrent_buckets` buckets are fetched at the same time with each regional client, and the buckets that are
+    not started yet are kept in a queue per region, so that only the details of the in-flight buckets are held in
+    memory ahead of the caller.
     """
     # a local store for s3 clients so that we may re-use clients for an AWS region
     s3_regional_clients: Dict[Any, Any] = {}
 
-    BucketDetail = Tuple[
-        str,
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-    ]
-
     async def _get_bucket_detail(bucket: Dict[str, Any]) -> BucketDetail:
         # Note: bucket['Region'] is sometimes None because
         # client.get_bucket_location() does not return a location constraint for buckets
@@ -106,10 +133,41 @@ def get_s3_bucket_details(
             bucket_ownership_controls,
         )
 
-    bucket_details = to_synchronous(
-        *[_get_bucket_detail(bucket) for bucket in bucket_data["Buckets"]],
-    )
-    yield from bucket_details
+    queued: Dict[Optional[str], Deque[Dict[str, Any]]] = defaultdict(deque)
+    for bucket in bucket_data["Buckets"]:
+        queued[bucket["Region"]].append(bucket)
+    running: Dict["asyncio.Task[BucketDetail]", Optional[str]] = {}
+    running_per_region: Counter = Counter()
+    loop = asyncio.get_event_loop()
+
+    def _start_queued_buckets() -> None:
+        for region, buckets in queued.items():
+            while buckets and running_per_region[region] < max_concurrent_buckets:
+                task = loop.create_task(_get_bucket_detail(buckets.popleft()))
+                running[task] = region
+                running_per_region[region] += 1
+
+    try:
+        _start_queued_buckets()
+        while running:
+            done, _ = loop.run_until_complete(
+                asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED),
+            )
+            for task in done:
+                running_per_region[running.pop(task)] -= 1
+            # Start the next buckets before handing the results to the caller, so that their API calls run in the
+            # default executor while the caller loads the results to the graph.
+            _start_queued_buckets()
+            for task in done:
+                yield task.result()
+    finally:
+        # If the caller stops early or a fetch fails, don't leave the remaining tasks pending on the event loop.
+        for task in running:
+            task.cancel()
+        if running:
+            loop.run_until_complete(
+                asyncio.gather(*running, return_exceptions=True),
+            )
 
 
 @timeit
@@ -295,6 +353,16 @@ def _load_s3_acls(
     """
     Ingest S3 ACL into neo4j.
     """
+    _ingest_s3_acls(neo4j_session, acls, update_tag)
+    _run_s3_acl_analysis(neo4j_session, aws_account_id)
+
+
+@timeit
+def _ingest_s3_acls(
+    neo4j_session: neo4j.Session,
+    acls: List[Dict[str, Any]],
+    update_tag: int,
+) -> None:
     ingest_acls = """
     UNWIND $acls AS acl
     MERGE (a:S3Acl{id: acl.id})
@@ -313,6 +381,12 @@ def _load_s3_acls(
         UpdateTag=update_tag,
     )
 
+
+def _run_s3_acl_analysis(neo4j_session: neo4j.Session, aws_account_id: str) -> None:
+    """
+    Sets anonymous_access and anonymous_actions on the account's S3 buckets from their S3Acls. The job appends to
+    anonymous_actions, so it must run once per sync, after all the ACLs of the account are loaded.
+    """
     # implement the acl permission
     # https://docs.aws.amazon.com/AmazonS3/latest/dev/acl-overview.html#permissions
     run_analysis_job(
@@ -505,17 +579,28 @@ def load_s3_details(
     s3_details_iter: Generator[Any, Any, Any],
     aws_account_id: str,
     update_tag: int,
+    batch_size: int = S3_DETAILS_BATCH_SIZE,
 ) -> None:
     """
-    Create dictionaries for all bucket ACLs and all bucket policies so we can import them in a single query for each
+    Parse the bucket details yielded by `s3_details_iter` and load them `batch_size` buckets at a time, importing the
+    ACLs, policies and configurations of a batch in a single query for each, so that the details of the first buckets
+    are written while the rest are still being fetched.
     """
+    # cleanup existing policy properties set on S3 Buckets
+    run_cleanup_job(
+        "aws_s3_details.json",
+        neo4j_session,
+        {"UPDATE_TAG": update_tag, "AWS_ID": aws_account_id},
+    )
+
     acls: List[Dict] = []
     policies: List[Dict] = []
-    statements = []
+    statements: List[Dict] = []
     encryption_configs: List[Dict] = []
     versioning_configs: List[Dict] = []
     public_access_block_configs: List[Dict] = []
     bucket_ownership_controls_configs: List[Dict] = []
+    buckets_in_batch = 0
     for (
         bucket,
         acl,
@@ -552,15 +637,53 @@ def load_s3_details(
         if parsed_bucket_ownership_controls is not None:
             bucket_ownership_controls_configs.append(parsed_bucket_ownership_controls)
 
-    # cleanup existing policy properties set on S3 Buckets
-    run_cleanup_job(
-        "aws_s3_details.json",
-        neo4j_session,
-        {"UPDATE_TAG": update_tag, "AWS_ID": aws_account_id},
-    )
+        buckets_in_batch += 1
+        if buckets_in_batch >= batch_size:
+            _load_s3_details_batch(
+                neo4j_session,
+                acls,
+                policies,
+                statements,
+                encryption_configs,
+                versioning_configs,
+                public_access_block_configs,
+                bucket_ownership_controls_configs,
+                update_tag,
+            )
+            buckets_in_batch = 0
+
+    if buckets_in_batch:
+        _load_s3_details_batch(
+            neo4j_session,
+            acls,
+            policies,
+            statements,
+            encryption_configs,
+            versioning_configs,
+            public_access_block_configs,
+            bucket_ownership_controls_configs,
+            update_tag,
+        )
+
+    _run_s3_acl_analysis(neo4j_session, aws_account_id)
+    _set_default_values(neo4j_session, aws_account_id)
 
-    _load_s3_acls(neo4j_session, acls, aws_account_id, update_tag)
 
+def _load_s3_details_batch(
+    neo4j_session: neo4j.Session,
+    acls: List[Dict],
+    policies: List[Dict],
+    statements: List[Dict],
+    encryption_configs: List[Dict],
+    versioning_configs: List[Dict],
+    public_access_block_configs: List[Dict],
+    bucket_ownership_controls_configs: List[Dict],
+    update_tag: int,
+) -> None:
+    """
+    Load one batch of parsed bucket details, then empty the given lists so that they can collect the next batch.
+    """
+    _ingest_s3_acls(neo4j_session, acls, update_tag)
     _load_s3_policies(neo4j_session, policies, update_tag)
     _load_s3_policy_statements(neo4j_session, statements, update_tag)
     _load_s3_encryption(neo4j_session, encryption_configs, update_tag)
@@ -569,7 +692,16 @@ def load_s3_details(
     _load_bucket_ownership_controls(
         neo4j_session, bucket_ownership_controls_configs, update_tag
     )
-    _set_default_values(neo4j_session, aws_account_id)
+    for batch in (
+        acls,
+        policies,
+        statements,
+        encryption_configs,
+        versioning_configs,
+        public_access_block_configs,
+        bucket_ownership_controls_configs,
+    ):
+        batch.clear()
 
 
 @timeit
@@ -1015,7 +1147,11 @@ def sync(
     load_s3_buckets(neo4j_session, bucket_data, current_aws_account_id, update_tag)
     cleanup_s3_buckets(neo4j_session, common_job_parameters)
 
-    acl_and_policy_data_iter = get_s3_bucket_details(boto3_session, bucket_data)
+    acl_and_policy_data_iter = get_s3_bucket_details(
+        boto3_session,
+        bucket_data,
+        get_max_concurrent_buckets(common_job_parameters),
+    )
     load_s3_details(
         neo4j_session,
         acl_and_policy_data_iter,
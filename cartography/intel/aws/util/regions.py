@@ -0,0 +1,103 @@
+import logging
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import Tuple
+from typing import TypeVar
+
+import boto3
+
+from cartography.util import thread_event_loop
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# Key in common_job_parameters holding the value of `--aws-max-concurrent-regions`.
+MAX_CONCURRENT_REGIONS_PARAM = "aws_max_concurrent_regions"
+
+
+def get_max_concurrent_regions(common_job_parameters: dict[str, Any]) -> int:
+    """
+    Returns the number of regions to fetch concurrently for the current sync, as configured with
+    `--aws-max-concurrent-regions`. Defaults to 1.
+    """
+    return max(common_job_parameters.get(MAX_CONCURRENT_REGIONS_PARAM) or 1, 1)
+
+
+def _fetch_region_in_thread(
+    get_func: Callable[[boto3.session.Session, str], R],
+    boto3_session: boto3.session.Session,
+    region: str,
+) -> R:
+    # The get function may use cartography.util.to_synchronous, which needs an event loop bound to this thread.
+    with thread_event_loop():
+        return get_func(boto3_session, region)
+
+
+def fetch_regions_concurrently(
+    get_func: Callable[[boto3.session.Session, str], R],
+    boto3_session: boto3.session.Session,
+    regions: Iterable[str],
+    max_workers: int = 1,
+) -> Iterator[Tuple[str, R]]:
+    """
+    Calls `get_func(boto3_session, region)` for every region and yields `(region, result)` tuples in the order of
+    `regions`, so that callers can transform and load each region's data in a deterministic order as soon as it is
+    available.
+
+    Up to `max_workers` regions are fetched at the same time on a thread pool, and at most `max_workers` results are
+    held in memory ahead of the caller. `get_func` is expected to be one of the `get_*()` functions decorated with
+    cartography.util.aws_handle_regions, which skips regions that are disabled or not authorized and retries calls
+    throttled by AWS with exponential backoff. With `max_workers=1` (the default) the regions are fetched one at a
+    time on the calling thread, exactly like a plain `for region in regions` loop.
+
+    Example:
+        for region, data in fetch_regions_concurrently(get_subnet_data, boto3_session, regions, max_workers=4):
+            load_subnets(neo4j_session, transform_subnet_data(data), region, ...)
+
+    :param get_func: A function taking a boto3 session and a region name, and returning that region's data.
+    :param boto3_session: The boto3 session to pass to `get_func`.
+    :param regions: The regions to fetch.
+    :param max_workers: The maximum number of regions to fetch concurrently.
+    :return: An iterator of (region, data) tuples in the order of `regions`.
+    """
+    if max_workers <= 1:
+        for region in regions:
+            yield region, get_func(boto3_session, region)
+        return
+
+    region_iter = iter(regions)
+    in_flight: Deque[Tuple[str, Future]] = deque()
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="cartography-aws-region",
+    ) as executor:
+        try:
+            for region in region_iter:
+                in_flight.append(
+                    (
+                        region,
+                        executor.submit(
+                            _fetch_region_in_thread,
+                            get_func,
+                            boto3_session,
+                            region,
+                        ),
+                    ),
+                )
+                if len(in_flight) >= max_workers:
+                    done_region, future = in_flight.popleft()
+                    yield done_region, future.result()
+            while in_flight:
+                done_region, future = in_flight.popleft()
+                yield done_region, future.result()
+        finally:
+            # If the caller stops early or a fetch fails, don't start the regions that are still queued.
+            for _, future in in_flight:
+                future.cancel()
@@ -1,12 +1,20 @@
 import logging
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import Optional
+from typing import Tuple
 
 import neo4j
 from requests import Session
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
 
 from cartography.config import Config
+from cartography.http_client import RateLimitedSession
 from cartography.intel.cve import feed
 from cartography.stats import get_stats_client
 from cartography.util import merge_module_sync_metadata
@@ -15,19 +23,18 @@ from cartography.util import timeit
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Number of year archives downloaded at the same time by _sync_year_archives().
+MAX_CONCURRENT_YEARS = 4
+
 
 def _retryable_session() -> Session:
-    session = Session()
-    retry_policy = Retry(
-        total=8,
-        connect=1,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
+    # NVD does not advertise its quota in response headers; requests are paced by feed.get_rate_limiter() instead.
+    return RateLimitedSession(
+        timeout=feed.CONNECT_AND_READ_TIMEOUT,
+        max_retries=8,
+        retry_methods=["GET"],
+        pool_size=MAX_CONCURRENT_YEARS,
     )
-    session.mount("https://", HTTPAdapter(max_retries=retry_policy))
-    logger.info(f"Configured session with retry policy: {retry_policy}")
-    return session
 
 
 def _sync_year_archives(
@@ -35,39 +42,74 @@ def _sync_year_archives(
     neo4j_session: neo4j.Session,
     config: Config,
     cve_api_key: str | None,
+    cache: Optional[feed.CVEPageCache] = None,
 ) -> None:
     existing_years = feed.get_cve_sync_metadata(neo4j_session)
     current_year = datetime.now().year
     logger.info(
         f"Syncing CVE data for year archives. Existing years: {existing_years}. Current year: {current_year}",
     )
-    for year in range(1999, current_year + 1):
-        if year in existing_years:
-            continue
+    years = [
+        year for year in range(1999, current_year + 1) if year not in existing_years
+    ]
+
+    def get_year(year: int) -> Dict[Any, Any]:
         logger.info(f"Syncing CVE data for year {year}")
-        cves = feed.get_published_cves_per_year(
+        return feed.get_published_cves_per_year(
             http_session,
             config.nist_cve_url,
             str(year),
             cve_api_key,
+            cache=cache,
         )
-        feed_metadata = feed.transform_cve_feed(cves)
-        feed.load_cve_feed(neo4j_session, [feed_metadata], config.update_tag)
-        published_cves = feed.transform_cves(cves)
-        feed.load_cves(
-            neo4j_session,
-            published_cves,
-            feed_metadata["FEED_ID"],
-            config.update_tag,
-        )
-        merge_module_sync_metadata(
-            neo4j_session,
-            group_type="CVE",
-            group_id=year,
-            synced_type="year",
-            update_tag=config.update_tag,
-            stat_handler=stat_handler,
-        )
+
+    # Years are downloaded concurrently, within the NVD rate limit enforced by feed.get_rate_limiter(), and loaded in
+    # order, so that a failed sync resumes from the first year that was not loaded. At most MAX_CONCURRENT_YEARS years
+    # are held in memory.
+    in_flight: Deque[Tuple[int, Future]] = deque()
+    year_iter = iter(years)
+    with ThreadPoolExecutor(
+        max_workers=MAX_CONCURRENT_YEARS,
+        thread_name_prefix="cartography-cve-year",
+    ) as executor:
+        try:
+            while True:
+                for year in year_iter:
+                    in_flight.append((year, executor.submit(get_year, year)))
+                    if len(in_flight) >= MAX_CONCURRENT_YEARS:
+                        break
+                if not in_flight:
+                    break
+                year, future = in_flight.popleft()
+                _load_year(neo4j_session, config, year, future.result())
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+
+
+def _load_year(
+    neo4j_session: neo4j.Session,
+    config: Config,
+    year: int,
+    cves: Dict[Any, Any],
+) -> None:
+    feed_metadata = feed.transform_cve_feed(cves)
+    feed.load_cve_feed(neo4j_session, [feed_metadata], config.update_tag)
+    published_cves = feed.transform_cves(cves)
+    feed.load_cves(
+        neo4j_session,
+        published_cves,
+        feed_metadata["FEED_ID"],
+        config.update_tag,
+    )
+    merge_module_sync_metadata(
+        neo4j_session,
+        group_type="CVE",
+        group_id=year,
+        synced_type="year",
+        update_tag=config.update_tag,
+        stat_handler=stat_handler,
+    )
 
 
 def _sync_modified_data(
@@ -78,18 +120,22 @@ def _sync_modified_data(
 ) -> None:
     logger.info("Syncing CVE data for modified data")
     last_modified_date = feed.get_last_modified_cve_date(neo4j_session)
-    cves = feed.get_modified_cves(
+    # Modified CVEs are loaded page by page as they are downloaded, rather than all at once.
+    pages = feed.iter_modified_cve_pages(
         http_session,
         config.nist_cve_url,
         last_modified_date,
         cve_api_key,
     )
-    feed_metadata = feed.transform_cve_feed(cves)
+    first_page = next(pages, None)
+    if first_page is None:
+        logger.info(f"No CVE data modified since {last_modified_date}")
+        return
+    feed_metadata = feed.transform_cve_feed(first_page)
     feed.load_cve_feed(neo4j_session, [feed_metadata], config.update_tag)
-    modified_cves = feed.transform_cves(cves)
     feed.load_cves(
         neo4j_session,
-        modified_cves,
+        feed.iter_transformed_cves(chain([first_page], pages)),
         feed_metadata["FEED_ID"],
         config.update_tag,
     )
@@ -117,12 +163,18 @@ def start_cve_ingestion(
     if not config.cve_enabled:
         return
     cve_api_key: str | None = config.cve_api_key if config.cve_api_key else None
+    cache = (
+        feed.CVEPageCache(config.nist_cve_cache_dir)
+        if config.nist_cve_cache_dir
+        else None
+    )
     with _retryable_session() as http_session:
         _sync_year_archives(
             http_session,
             neo4j_session=neo4j_session,
             config=config,
             cve_api_key=cve_api_key,
+            cache=cache,
         )
         _sync_modified_data(
             http_session,
@@ -1,5 +1,8 @@
+import gzip
+import json
 import logging
-import time
+import os
+import threading
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -7,8 +10,11 @@ from functools import reduce
 from typing import Any
 from typing import cast
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 import neo4j
 from requests import Session
@@ -16,6 +22,7 @@ from requests import Session
 from cartography.client.core.tx import load
 from cartography.client.core.tx import read_list_of_values_tx
 from cartography.client.core.tx import read_single_value_tx
+from cartography.http_client import SlidingWindowRateLimiter
 from cartography.models.cve.cve import CVESchema
 from cartography.models.cve.cve_feed import CVEFeedSchema
 from cartography.util import timeit
@@ -27,8 +34,70 @@ CONNECT_AND_READ_TIMEOUT = (30, 120)
 CVE_FEED_ID = "NIST_NVD"
 BATCH_SIZE_DAYS = 120
 RESULTS_PER_PAGE = 2000
-DEFAULT_SLEEP_TIME = 3.0
-DELAYED_SLEEP_TIME = 6.0
+# NVD API rate limits, see https://nvd.nist.gov/developers/start-here#divRateLimits
+NVD_RATE_LIMIT_WINDOW_SECONDS = 30.0
+NVD_REQUESTS_PER_WINDOW_WITH_API_KEY = 50
+NVD_REQUESTS_PER_WINDOW_WITHOUT_API_KEY = 5
+
+
+# The NVD quota applies per API key or per client address, so all requests made by this process share a limiter.
+_rate_limiters: Dict[bool, SlidingWindowRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str | None) -> SlidingWindowRateLimiter:
+    """
+    Returns the process-wide rate limiter for NVD API requests made with or without an API key.
+    """
+    with _rate_limiters_lock:
+        has_api_key = bool(api_key)
+        if has_api_key not in _rate_limiters:
+            _rate_limiters[has_api_key] = SlidingWindowRateLimiter(
+                max_requests=(
+                    NVD_REQUESTS_PER_WINDOW_WITH_API_KEY
+                    if has_api_key
+                    else NVD_REQUESTS_PER_WINDOW_WITHOUT_API_KEY
+                ),
+                window_seconds=NVD_RATE_LIMIT_WINDOW_SECONDS,
+            )
+        return _rate_limiters[has_api_key]
+
+
+class CVEPageCache:
+    """
+    On-disk cache of raw NVD API responses, stored as one gzipped JSON file per page and keyed by the request's date
+    window and start index. Only pages of date windows that have ended are cached, since their content is not expected
+    to change; later modifications are picked up by the last-modified sync.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, params: Dict[str, Any]) -> str:
+        key = "_".join(
+            f"{name}-{value}" for name, value in sorted(params.items())
+        ).replace(":", "")
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[Any, Any]]:
+        path = self._path(params)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError):
+            logger.warning(f"Ignoring unreadable CVE cache file {path}")
+            return None
+
+    def put(self, params: Dict[str, Any], data: Dict[Any, Any]) -> None:
+        path = self._path(params)
+        # Write to a temporary file first so that an interrupted sync never leaves a truncated page in the cache.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
 
 
 @timeit
@@ -71,53 +140,72 @@ def _map_cve_dict(cve_dict: Dict[Any, Any], data: Dict[Any, Any]) -> None:
     cve_dict["startIndex"] = data["startIndex"]
 
 
-def _call_cves_api(
+def _iter_cves_api_pages(
     http_session: Session,
     url: str,
     api_key: str | None,
     params: Dict[str, Any],
-) -> Dict[Any, Any]:
+    cache: Optional[CVEPageCache] = None,
+) -> Iterator[Dict[Any, Any]]:
+    """
+    Yields the pages of NVD API results for the given query parameters, one page at a time.
+    """
     total_results = 0
     params["startIndex"] = 0
     params["resultsPerPage"] = RESULTS_PER_PAGE
     headers = {"Content-Type": "application/json"}
     if api_key:
-        sleep_between_requests = DEFAULT_SLEEP_TIME
         headers["apiKey"] = api_key
     else:
-        sleep_between_requests = DELAYED_SLEEP_TIME
         logger.warning(
-            f"No NIST NVD API key provided. Increasing sleep time to {sleep_between_requests}.",
+            "No NIST NVD API key provided. Requests are limited to "
+            f"{NVD_REQUESTS_PER_WINDOW_WITHOUT_API_KEY} every {NVD_RATE_LIMIT_WINDOW_SECONDS} seconds.",
         )
-    results: Dict[Any, Any] = dict()
+    rate_limiter = get_rate_limiter(api_key)
 
     while params["resultsPerPage"] > 0 or params["startIndex"] < total_results:
-        logger.info(f"Calling NIST NVD API at {url} with params {params}")
-        res = http_session.get(
-            url,
-            params=params,
-            headers=headers,
-            timeout=CONNECT_AND_READ_TIMEOUT,
-        )
-        res.raise_for_status()
-        data = res.json()
-        _map_cve_dict(results, data)
+        data = cache.get(params) if cache else None
+        if data is None:
+            rate_limiter.acquire()
+            logger.info(f"Calling NIST NVD API at {url} with params {params}")
+            res = http_session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=CONNECT_AND_READ_TIMEOUT,
+            )
+            res.raise_for_status()
+            data = res.json()
+            if cache:
+                cache.put(params, data)
+        yield data
         total_results = data["totalResults"]
         params["resultsPerPage"] = data["resultsPerPage"]
         params["startIndex"] += data["resultsPerPage"]
-        time.sleep(sleep_between_requests)
-    return results
 
 
-def get_cves_in_batches(
+def _call_cves_api(
     http_session: Session,
-    nist_cve_url: str,
+    url: str,
+    api_key: str | None,
+    params: Dict[str, Any],
+    cache: Optional[CVEPageCache] = None,
+) -> Dict[Any, Any]:
+    results: Dict[Any, Any] = dict()
+    for data in _iter_cves_api_pages(http_session, url, api_key, params, cache):
+        _map_cve_dict(results, data)
+    return results
+
+
+def _iter_date_windows(
     start_date: datetime,
     end_date: datetime,
     date_param_names: Dict[str, str],
-    api_key: str | None,
-) -> Dict[Any, Any]:
-    cves: Dict[Any, Any] = dict()
+) -> Iterator[Tuple[Dict[str, Any], bool]]:
+    """
+    Splits the given dates into windows of at most BATCH_SIZE_DAYS, as the NVD API requires, and yields the query
+    parameters of each window along with whether the window has ended.
+    """
     current_start_date: datetime = start_date
     current_end_date = end_date
     total_days = (current_end_date - current_start_date).days
@@ -143,22 +231,51 @@ def get_cves_in_batches(
         logger.info(
             f"Querying CVE data between {current_start_date} and {current_end_date}",
         )
-        batch_cves = _call_cves_api(http_session, nist_cve_url, api_key, params)
-        _map_cve_dict(cves, batch_cves)
+        window_ended = current_end_date <= datetime.now(tz=current_end_date.tzinfo)
+        yield params, window_ended
         current_start_date = current_end_date
         new_end_date = current_start_date + batch_size
         if new_end_date > end_date:
             new_end_date = end_date
         current_end_date = new_end_date
+
+
+def get_cves_in_batches(
+    http_session: Session,
+    nist_cve_url: str,
+    start_date: datetime,
+    end_date: datetime,
+    date_param_names: Dict[str, str],
+    api_key: str | None,
+    cache: Optional[CVEPageCache] = None,
+) -> Dict[Any, Any]:
+    cves: Dict[Any, Any] = dict()
+    for params, window_ended in _iter_date_windows(
+        start_date,
+        end_date,
+        date_param_names,
+    ):
+        batch_cves = _call_cves_api(
+            http_session,
+            nist_cve_url,
+            api_key,
+            params,
+            cache=cache if window_ended else None,
+        )
+        _map_cve_dict(cves, batch_cves)
     return cves
 
 
-def get_modified_cves(
+def iter_modified_cve_pages(
     http_session: Session,
     nist_cve_url: str,
     last_modified_date: str,
     api_key: str | None,
-) -> Dict[Any, Any]:
+) -> Iterator[Dict[Any, Any]]:
+    """
+    Yields the pages of CVEs modified since `last_modified_date`, one NVD API page at a time, so that they can be
+    loaded without holding all of them in memory.
+    """
     end_date = datetime.now(tz=timezone.utc)
     start_date = datetime.strptime(last_modified_date, "%Y-%m-%dT%H:%M:%S").replace(
         tzinfo=timezone.utc,
@@ -167,15 +284,8 @@ def get_modified_cves(
         "start": "lastModStartDate",
         "end": "lastModEndDate",
     }
-    cves = get_cves_in_batches(
-        http_session,
-        nist_cve_url,
-        start_date,
-        end_date,
-        date_param_names,
-        api_key,
-    )
-    return cves
+    for params, _ in _iter_date_windows(start_date, end_date, date_param_names):
+        yield from _iter_cves_api_pages(http_session, nist_cve_url, api_key, params)
 
 
 def get_published_cves_per_year(
@@ -183,6 +293,7 @@ def get_published_cves_per_year(
     nist_cve_url: str,
     year: str,
     api_key: str | None,
+    cache: Optional[CVEPageCache] = None,
 ) -> Dict[Any, Any]:
     start_of_year = datetime.strptime(f"{year}-01-01", "%Y-%m-%d")
     next_year = int(year) + 1
@@ -198,6 +309,7 @@ def get_published_cves_per_year(
         end_of_next_year,
         date_param_names,
         api_key,
+        cache=cache,
     )
     return cves
 
@@ -266,6 +378,16 @@ def transform_cves(cve_json: Dict[Any, Any]) -> List[Dict[Any, Any]]:
     return cves
 
 
+def iter_transformed_cves(
+    cve_pages: Iterable[Dict[Any, Any]],
+) -> Iterator[Dict[Any, Any]]:
+    """
+    Lazily transforms the CVEs of the given NVD API pages, see transform_cves().
+    """
+    for page in cve_pages:
+        yield from transform_cves(page)
+
+
 def transform_cve_feed(cve_json: Dict[Any, Any]) -> Dict[str, str]:
     """
     Extract version, timestamp, and lastupdated from the feed
@@ -281,14 +403,17 @@ def transform_cve_feed(cve_json: Dict[Any, Any]) -> Dict[str, str]:
 
 def load_cves(
     neo4j_session: neo4j.Session,
-    data: List[Dict[str, Any]],
+    data: Iterable[Dict[str, Any]],
     feed_id: str,
     update_tag: int,
 ) -> None:
     """
-    Load CVE's information
+    Load CVE's information. `data` can be a generator, e.g. from iter_transformed_cves(), to stream the CVEs.
     """
-    logger.info(f"Loading {len(data)} CVEs into the graph.")
+    if isinstance(data, list):
+        logger.info(f"Loading {len(data)} CVEs into the graph.")
+    else:
+        logger.info("Streaming CVEs into the graph.")
     load(
         neo4j_session,
         CVESchema(),
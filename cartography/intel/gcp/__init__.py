@@ -21,6 +21,7 @@ from cartography.intel.gcp import gke
 from cartography.intel.gcp import iam
 from cartography.intel.gcp import storage
 from cartography.util import run_analysis_job
+from cartography.util import run_incremental_analysis_job
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
@@ -519,11 +520,19 @@ def start_gcp_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
         common_job_parameters,
     )
 
-    run_analysis_job(
-        "gcp_compute_asset_inet_exposure.json",
-        neo4j_session,
-        common_job_parameters,
-    )
+    if config.incremental_analysis:
+        run_incremental_analysis_job(
+            "gcp_compute_asset_inet_exposure.json",
+            neo4j_session,
+            common_job_parameters,
+            "PROJECT_ID",
+        )
+    else:
+        run_analysis_job(
+            "gcp_compute_asset_inet_exposure.json",
+            neo4j_session,
+            common_job_parameters,
+        )
 
     run_analysis_job(
         "gcp_gke_asset_exposure.json",
@@ -1,5 +1,6 @@
 import json
 import logging
+import threading
 import time
 from datetime import datetime
 from datetime import timedelta
@@ -13,10 +14,19 @@ from typing import Tuple
 
 import requests
 
+from cartography.http_client import HeaderRateLimiter
+from cartography.http_client import RateLimitedSession
+
 logger = logging.getLogger(__name__)
 # Connect and read timeouts of 60 seconds each; see https://requests.readthedocs.io/en/master/user/advanced/#timeouts
 _TIMEOUT = (60, 60)
 _GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD = 500
+# Extra time to wait after the rate limit resets, for safety.
+_RATE_LIMIT_RESET_MARGIN_SECONDS = 60
+
+# GitHub rate limits apply per token, so all requests made with a token by this process share a session.
+_sessions: Dict[str, RateLimitedSession] = {}
+_sessions_lock = threading.Lock()
 
 
 class PaginatedGraphqlData(NamedTuple):
@@ -51,6 +61,26 @@ def handle_rate_limit_sleep(token: str) -> None:
     time.sleep(sleep_duration.seconds)
 
 
+def get_session(token: str) -> RateLimitedSession:
+    """
+    Returns the process-wide session for calls to the GitHub API made with `token`. The session waits for the rate limit
+    to reset once the GraphQL quota advertised by GitHub's responses falls to `_GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD`.
+    """
+    with _sessions_lock:
+        if token not in _sessions:
+            _sessions[token] = RateLimitedSession(
+                timeout=_TIMEOUT,
+                # Failed queries are retried by fetch_all().
+                max_retries=0,
+                rate_limiter=HeaderRateLimiter(
+                    min_remaining=_GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD,
+                    reset_margin_seconds=_RATE_LIMIT_RESET_MARGIN_SECONDS,
+                    name="Github graphql",
+                ),
+            )
+        return _sessions[token]
+
+
 def call_github_api(query: str, variables: str, token: str, api_url: str) -> Dict:
     """
     Calls the GitHub v4 API and executes a query
@@ -62,11 +92,10 @@ def call_github_api(query: str, variables: str, token: str, api_url: str) -> Dic
     """
     headers = {"Authorization": f"token {token}"}
     try:
-        response = requests.post(
+        response = get_session(token).post(
             api_url,
             json={"query": query, "variables": variables},
             headers=headers,
-            timeout=_TIMEOUT,
         )
     except requests.exceptions.Timeout:
         # Add context and re-raise for callers to handle
@@ -148,9 +177,11 @@ def fetch_all(
     while has_next_page:
         exc: Any = None
         try:
-            # In the future, we may use also use the rateLimit object from the graphql response.
-            # But we still need at least one call to the REST endpoint in case the graphql remaining is already 0
-            handle_rate_limit_sleep(token)
+            # The session paces requests using the rate limit headers of the graphql responses. Until it has seen
+            # one, call the REST endpoint in case the graphql remaining is already under the threshold.
+            rate_limiter = get_session(token).rate_limiter
+            if rate_limiter is None or not rate_limiter.has_state:
+                handle_rate_limit_sleep(token)
             resp = fetch_page(token, api_url, organization, query, cursor, **kwargs)
             retry = 0
         except requests.exceptions.Timeout as err:
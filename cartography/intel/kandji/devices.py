@@ -4,10 +4,11 @@ from typing import Dict
 from typing import List
 
 import neo4j
-from requests import Session
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.http_client import HeaderRateLimiter
+from cartography.http_client import RateLimitedSession
 from cartography.models.kandji.device import KandjiDeviceSchema
 from cartography.models.kandji.tenant import KandjiTenantSchema
 from cartography.util import timeit
@@ -33,14 +34,16 @@ def get(kandji_base_uri: str, kandji_token: str) -> List[Dict[str, Any]]:
     }
 
     devices: List[Dict[str, Any]] = []
-    session = Session()
+    # Kandji limits API calls per tenant; wait for the reset if its rate limit headers tell us the quota is used up.
+    session = RateLimitedSession(
+        timeout=_TIMEOUT,
+        rate_limiter=HeaderRateLimiter(name="Kandji API"),
+    )
     while True:
         logger.debug("Kandji device offset: %s", offset)
 
         params["offset"] = offset
-        response = session.get(
-            api_endpoint, headers=headers, timeout=_TIMEOUT, params=params
-        )
+        response = session.get(api_endpoint, headers=headers, params=params)
         response.raise_for_status()
 
         result = response.json()
@@ -1,13 +1,19 @@
 # Okta intel module - utility functions
 import logging
-import time
 
 from okta.framework import PagedResults
 from okta.framework.ApiClient import ApiClient
 from requests import Response
 
+from cartography.http_client import HeaderRateLimiter
+
 logger = logging.getLogger(__name__)
 
+# Okta rate limits are per endpoint and per minute, see https://developer.okta.com/docs/reference/rl-global-mgmt/.
+# Requests made by the Okta SDK are checked against the headers of the last response, keeping 10% of each window in
+# reserve, and wait for the advertised reset once the reserve is reached.
+_rate_limiter = HeaderRateLimiter(min_remaining_fraction=0.1, name="Okta API")
+
 
 def is_last_page(response: PagedResults) -> bool:
     """
@@ -41,24 +47,5 @@ def check_rate_limit(response: Response) -> None:
     Checks if we are about to hit the rate limit and waits until reset if so
     :param response: server response
     """
-    rate_limit_threshold = 0.1
-
-    remaining = response.headers.get("x-rate-limit-remaining")
-    limit = response.headers.get("x-rate-limit-limit")
-    reset_time = response.headers.get("x-rate-limit-reset")
-
-    if remaining and limit and reset_time:
-        if (int(remaining) / int(limit)) < rate_limit_threshold:
-            sleep_time_seconds = int(reset_time) - int(time.time())
-            if sleep_time_seconds <= 0:
-                # A negative sleep time does not make sense so treat it the same as a 0 sleep time
-                return
-            if sleep_time_seconds > 60:
-                raise ValueError(
-                    f"Okta API limit exceeded. Sleep time of {sleep_time_seconds} would exceed one minute. Crashing "
-                    f"Okta sync to avoid blocking.",
-                )
-            logger.warning(
-                f"Okta rate limit threshold reached. Waiting {sleep_time_seconds} seconds.",
-            )
-            time.sleep(sleep_time_seconds)
+    _rate_limiter.update(response)
+    _rate_limiter.wait()
@@ -11,27 +11,14 @@ from cartography.models.snipeit.tenant import SnipeitTenantSchema
 from cartography.models.snipeit.user import SnipeitUserSchema
 from cartography.util import timeit
 
-from .util import call_snipeit_api
+from .util import get_paginated
 
 logger = logging.getLogger(__name__)
 
 
 @timeit
 def get(base_uri: str, token: str) -> List[Dict]:
-    api_endpoint = "/api/v1/users"
-    results: List[Dict[str, Any]] = []
-    while True:
-        offset = len(results)
-        api_endpoint = f"{api_endpoint}?order='asc'&offset={offset}"
-        response = call_snipeit_api(api_endpoint, base_uri, token)
-        results.extend(response["rows"])
-
-        total = response["total"]
-        results_count = len(results)
-        if results_count >= total:
-            break
-
-    return results
+    return get_paginated("/api/v1/users", base_uri, token)
 
 
 @timeit
@@ -1,14 +1,33 @@
 import logging
 from typing import Any
 from typing import Dict
+from typing import List
+from typing import Optional
 
 import requests
 
+from cartography.http_client import fetch_concurrently
+from cartography.http_client import HeaderRateLimiter
+from cartography.http_client import RateLimitedSession
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 # Connect and read timeouts of 60 seconds each; see https://requests.readthedocs.io/en/master/user/advanced/#timeouts
 _TIMEOUT = (60, 60)
+# Number of pages requested at the same time by get_paginated().
+MAX_CONCURRENT_PAGES = 4
+
+
+def create_session() -> RateLimitedSession:
+    """
+    Returns a session for the SnipeIT API, which waits for the reset once the quota advertised by SnipeIT's
+    X-RateLimit-* response headers is used up.
+    """
+    return RateLimitedSession(
+        timeout=_TIMEOUT,
+        pool_size=MAX_CONCURRENT_PAGES,
+        rate_limiter=HeaderRateLimiter(name="SnipeIT API"),
+    )
 
 
 @timeit
@@ -16,14 +35,17 @@ def call_snipeit_api(
     api_and_parameters: str,
     base_uri: str,
     token: str,
+    http_session: Optional[requests.Session] = None,
 ) -> Dict[str, Any]:
     uri = base_uri + api_and_parameters
+    if http_session is None:
+        http_session = create_session()
     try:
         logger.debug(
             "SnipeIT: Get %s",
             uri,
         )
-        response = requests.get(
+        response = http_session.get(
             uri,
             headers={
                 "Accept": "application/json",
@@ -38,3 +60,39 @@ def call_snipeit_api(
     # if call failed, use requests library to raise an exception
     response.raise_for_status()
     return response.json()
+
+
+@timeit
+def get_paginated(api_endpoint: str, base_uri: str, token: str) -> List[Dict[str, Any]]:
+    """
+    Returns all the rows of a paginated SnipeIT API endpoint. The first page tells us the total number of rows and the
+    page size; the remaining pages are then requested concurrently, and their rows returned in order.
+    :param api_endpoint: The endpoint, e.g. `/api/v1/users`.
+    :param base_uri: The base URI of the SnipeIT instance.
+    :param token: The SnipeIT API token.
+    :return: The rows of all the pages.
+    """
+    with create_session() as http_session:
+
+        def get_page(offset: int) -> Dict[str, Any]:
+            return call_snipeit_api(
+                f"{api_endpoint}?order='asc'&offset={offset}",
+                base_uri,
+                token,
+                http_session=http_session,
+            )
+
+        first_page = get_page(0)
+        results: List[Dict[str, Any]] = list(first_page["rows"])
+        total = first_page["total"]
+        page_size = len(results)
+        if page_size == 0 or page_size >= total:
+            return results
+
+        for page in fetch_concurrently(
+            get_page,
+            range(page_size, total, page_size),
+            max_workers=MAX_CONCURRENT_PAGES,
+        ):
+            results.extend(page["rows"])
+    return results
@@ -8,8 +8,11 @@ from cartography.client.aws import list_accounts
 from cartography.client.aws.ecr import get_ecr_images
 from cartography.config import Config
 from cartography.intel.trivy.scanner import cleanup
-from cartography.intel.trivy.scanner import get_json_files_in_s3
-from cartography.intel.trivy.scanner import sync_single_image_from_s3
+from cartography.intel.trivy.scanner import DEFAULT_S3_DOWNLOAD_WORKERS
+from cartography.intel.trivy.scanner import get_json_file_etags_in_s3
+from cartography.intel.trivy.scanner import get_previous_scan_etags
+from cartography.intel.trivy.scanner import refresh_unchanged_scan_results
+from cartography.intel.trivy.scanner import sync_images_from_s3
 from cartography.stats import get_stats_client
 from cartography.util import timeit
 
@@ -74,10 +77,14 @@ def sync_trivy_aws_ecr_from_s3(
     update_tag: int,
     common_job_parameters: dict[str, Any],
     boto3_session: boto3.Session,
+    max_workers: int = DEFAULT_S3_DOWNLOAD_WORKERS,
 ) -> None:
     """
     Sync Trivy scan results from S3 for AWS ECR images.
 
+    Images whose S3 scan results have the same ETag as the ones loaded by the previous sync are not downloaded again;
+    their findings, packages and fixes are kept as they are in the graph.
+
     Args:
         neo4j_session: Neo4j session for database operations
         trivy_s3_bucket: S3 bucket containing scan results
@@ -85,15 +92,17 @@ def sync_trivy_aws_ecr_from_s3(
         update_tag: Update tag for tracking
         common_job_parameters: Common job parameters for cleanup
         boto3_session: boto3 session for S3 operations
+        max_workers: Number of scan results to download and parse concurrently
     """
     logger.info(
         f"Using Trivy scan results from s3://{trivy_s3_bucket}/{trivy_s3_prefix}"
     )
 
     images_in_graph: set[str] = get_scan_targets(neo4j_session)
-    json_files: set[str] = get_json_files_in_s3(
+    json_file_etags: dict[str, str] = get_json_file_etags_in_s3(
         trivy_s3_bucket, trivy_s3_prefix, boto3_session
     )
+    json_files: set[str] = set(json_file_etags)
     intersection: list[tuple[str, str]] = _get_intersection(
         images_in_graph, json_files, trivy_s3_prefix
     )
@@ -110,16 +119,36 @@ def sync_trivy_aws_ecr_from_s3(
         logger.error(f"JSON files in S3: {json_files}")
         raise ValueError("No ECR images with S3 json scan results found.")
 
-    logger.info(f"Processing {len(intersection)} ECR images with S3 scan results")
+    previous_scans = get_previous_scan_etags(
+        neo4j_session, [image_uri for image_uri, _ in intersection]
+    )
+    changed_images: list[tuple[str, str]] = []
+    unchanged_image_digests: list[str] = []
     for image_uri, s3_object_key in intersection:
-        sync_single_image_from_s3(
-            neo4j_session,
-            image_uri,
-            update_tag,
-            trivy_s3_bucket,
-            s3_object_key,
-            boto3_session,
-        )
+        previous_etag, previous_digest = previous_scans.get(image_uri, (None, None))
+        if (
+            previous_etag
+            and previous_digest
+            and previous_etag == json_file_etags[s3_object_key]
+        ):
+            unchanged_image_digests.append(previous_digest)
+        else:
+            changed_images.append((image_uri, s3_object_key))
+
+    logger.info(
+        f"Processing {len(changed_images)} ECR images with new or changed S3 scan results; "
+        f"{len(unchanged_image_digests)} are unchanged since the last sync"
+    )
+    refresh_unchanged_scan_results(neo4j_session, unchanged_image_digests, update_tag)
+    sync_images_from_s3(
+        neo4j_session,
+        changed_images,
+        json_file_etags,
+        update_tag,
+        trivy_s3_bucket,
+        boto3_session,
+        max_workers,
+    )
 
     cleanup(neo4j_session, common_job_parameters)
 
@@ -156,6 +185,7 @@ def start_trivy_ingestion(neo4j_session: Session, config: Config) -> None:
         config.update_tag,
         common_job_parameters,
         boto3_session,
+        config.trivy_s3_download_workers,
     )
 
     # Support other Trivy resource types here e.g. if Google Cloud has images.
@@ -1,11 +1,17 @@
 import json
 import logging
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import boto3
+import botocore.config
 from neo4j import Session
 
 from cartography.client.core.tx import load
+from cartography.client.core.tx import read_list_of_dicts_tx
+from cartography.client.core.tx import write_list_of_dicts_tx
 from cartography.graph.job import GraphJob
 from cartography.models.trivy.findings import TrivyImageFindingSchema
 from cartography.models.trivy.fix import TrivyFixSchema
@@ -16,6 +22,11 @@ from cartography.util import timeit
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Number of scan result files downloaded and parsed concurrently by sync_images_from_s3().
+DEFAULT_S3_DOWNLOAD_WORKERS = 10
+# Number of images whose findings, packages and fixes are loaded to Neo4j together by sync_images_from_s3().
+IMAGE_LOAD_BATCH_SIZE = 50
+
 
 def _validate_packages(package_list: list[dict]) -> list[dict]:
     """
@@ -142,13 +153,31 @@ def get_json_files_in_s3(
     Returns:
         Set of S3 object keys for JSON files in the S3 prefix
     """
+    return set(get_json_file_etags_in_s3(s3_bucket, s3_prefix, boto3_session))
+
+
+@timeit
+def get_json_file_etags_in_s3(
+    s3_bucket: str, s3_prefix: str, boto3_session: boto3.Session
+) -> dict[str, str]:
+    """
+    List S3 objects in the S3 prefix, with their ETags.
+
+    Args:
+        s3_bucket: S3 bucket name containing scan results
+        s3_prefix: S3 prefix path containing scan results
+        boto3_session: boto3 session for dependency injection
+
+    Returns:
+        Dict of S3 object key to ETag for JSON files in the S3 prefix
+    """
     s3_client = boto3_session.client("s3")
 
     try:
         # List objects in the S3 prefix
         paginator = s3_client.get_paginator("list_objects_v2")
         page_iterator = paginator.paginate(Bucket=s3_bucket, Prefix=s3_prefix)
-        results = set()
+        results: dict[str, str] = {}
 
         for page in page_iterator:
             if "Contents" not in page:
@@ -165,7 +194,7 @@ def get_json_files_in_s3(
                 if not object_key.startswith(s3_prefix):
                     continue
 
-                results.add(object_key)
+                results[object_key] = obj.get("ETag", "")
 
     except Exception as e:
         logger.error(
@@ -251,6 +280,7 @@ def read_scan_results_from_s3(
     s3_bucket: str,
     s3_object_key: str,
     image_uri: str,
+    s3_client: Any | None = None,
 ) -> tuple[list[dict], str | None]:
     """
     Read and parse Trivy scan results from S3.
@@ -260,19 +290,20 @@ def read_scan_results_from_s3(
         s3_bucket: S3 bucket containing scan results
         s3_object_key: S3 object key for the scan results
         image_uri: ECR image URI (for logging purposes)
+        s3_client: S3 client to reuse across calls. Optional; a new client is created from boto3_session if not set.
 
     Returns:
         Tuple of (list of scan result dictionaries from the "Results" key, image digest)
     """
-    s3_client = boto3_session.client("s3")
+    if s3_client is None:
+        s3_client = boto3_session.client("s3")
 
     # Read JSON scan results from S3
     logger.debug(f"Reading scan results from S3: s3://{s3_bucket}/{s3_object_key}")
     response = s3_client.get_object(Bucket=s3_bucket, Key=s3_object_key)
-    scan_data_json = response["Body"].read().decode("utf-8")
 
-    # Parse JSON data
-    trivy_data = json.loads(scan_data_json)
+    # Parse the UTF-8 bytes directly, without first decoding a copy of the body to a string
+    trivy_data = json.loads(response["Body"].read())
 
     # Extract results using the same logic as binary scanning
     if "Results" in trivy_data and trivy_data["Results"]:
@@ -361,3 +392,257 @@ def sync_single_image_from_s3(
             f"Failed to process S3 scan results for {image_uri} from {s3_object_key}: {e}"
         )
         raise
+
+
+@timeit
+def get_previous_scan_etags(
+    neo4j_session: Session,
+    image_uris: list[str],
+) -> dict[str, tuple[str, str]]:
+    """
+    Get the ETag of the S3 scan results last loaded for each of the given images, as recorded by load_scan_etags().
+
+    Args:
+        neo4j_session: Neo4j session for database operations
+        image_uris: ECR image URIs
+
+    Returns:
+        Dict of image URI to (ETag, image digest of the scan results) for the images that have a recorded ETag
+    """
+    query = """
+    UNWIND $ImageUris AS uri
+    MATCH (repo_img:ECRRepositoryImage{id: uri})
+    WHERE repo_img.trivy_scan_etag IS NOT NULL
+    RETURN uri, repo_img.trivy_scan_etag AS etag, repo_img.trivy_scan_image_digest AS image_digest
+    """
+    rows = neo4j_session.read_transaction(
+        read_list_of_dicts_tx,
+        query,
+        ImageUris=image_uris,
+    )
+    return {row["uri"]: (row["etag"], row["image_digest"]) for row in rows}
+
+
+@timeit
+def load_scan_etags(
+    neo4j_session: Session,
+    scans: list[dict[str, Any]],
+) -> None:
+    """
+    Record the ETag and the image digest of the S3 scan results loaded for each image on its ECRRepositoryImage node,
+    so that the next sync can skip the images whose scan results did not change.
+
+    Args:
+        neo4j_session: Neo4j session for database operations
+        scans: Dicts with the `image_uri`, `etag` and `image_digest` of each loaded scan
+    """
+    query = """
+    UNWIND $Scans AS scan
+    MATCH (repo_img:ECRRepositoryImage{id: scan.image_uri})
+    SET repo_img.trivy_scan_etag = scan.etag,
+        repo_img.trivy_scan_image_digest = scan.image_digest
+    """
+    neo4j_session.write_transaction(write_list_of_dicts_tx, query, Scans=scans)
+
+
+@timeit
+def refresh_unchanged_scan_results(
+    neo4j_session: Session,
+    image_digests: list[str],
+    update_tag: int,
+) -> None:
+    """
+    Set the update tag on the findings, packages and fixes previously loaded for images whose scan results did not
+    change since the last sync, and on the relationships between them, so that cleanup() keeps them.
+
+    Args:
+        neo4j_session: Neo4j session for database operations
+        image_digests: Image digests of the unchanged scan results
+        update_tag: Update tag for tracking
+    """
+    if not image_digests:
+        return
+    refresh_findings = """
+    UNWIND $ImageDigests AS digest
+    MATCH (:ECRImage{id: digest})<-[affects:AFFECTS]-(finding:TrivyImageFinding)
+    SET finding.lastupdated = $UpdateTag, affects.lastupdated = $UpdateTag
+    """
+    refresh_packages = """
+    UNWIND $ImageDigests AS digest
+    MATCH (:ECRImage{id: digest})<-[deployed:DEPLOYED]-(package:TrivyPackage)
+    SET package.lastupdated = $UpdateTag, deployed.lastupdated = $UpdateTag
+    """
+    refresh_fixes = """
+    UNWIND $ImageDigests AS digest
+    MATCH (image:ECRImage{id: digest})<-[:DEPLOYED]-(package:TrivyPackage)
+    MATCH (image)<-[:AFFECTS]-(finding:TrivyImageFinding)-[affects:AFFECTS]->(package)
+    SET affects.lastupdated = $UpdateTag
+    WITH package, finding
+    MATCH (package)-[should_update_to:SHOULD_UPDATE_TO]->(fix:TrivyFix)-[applies_to:APPLIES_TO]->(finding)
+    SET fix.lastupdated = $UpdateTag,
+        should_update_to.lastupdated = $UpdateTag,
+        applies_to.lastupdated = $UpdateTag
+    """
+    for query in (refresh_findings, refresh_packages, refresh_fixes):
+        neo4j_session.write_transaction(
+            write_list_of_dicts_tx,
+            query,
+            ImageDigests=image_digests,
+            UpdateTag=update_tag,
+        )
+    stat_handler.incr("images_unchanged_count", len(image_digests))
+
+
+def _read_and_transform_scan(
+    boto3_session: boto3.Session,
+    s3_client: Any,
+    s3_bucket: str,
+    s3_object_key: str,
+    image_uri: str,
+) -> tuple[str | None, list[dict], list[dict], list[dict]]:
+    results, image_digest = read_scan_results_from_s3(
+        boto3_session,
+        s3_bucket,
+        s3_object_key,
+        image_uri,
+        s3_client=s3_client,
+    )
+    if not image_digest:
+        return None, [], [], []
+    findings_list, packages_list, fixes_list = transform_scan_results(
+        results,
+        image_digest,
+    )
+    return image_digest, findings_list, packages_list, fixes_list
+
+
+def _load_scan_batch(
+    neo4j_session: Session,
+    findings_list: list[dict[str, Any]],
+    packages_list: list[dict[str, Any]],
+    fixes_list: list[dict[str, Any]],
+    scans: list[dict[str, Any]],
+    update_tag: int,
+) -> None:
+    load_scan_vulns(neo4j_session, findings_list, update_tag=update_tag)
+    load_scan_packages(neo4j_session, packages_list, update_tag=update_tag)
+    load_scan_fixes(neo4j_session, fixes_list, update_tag=update_tag)
+    # Only record the ETags once the scan results are in the graph, so that a failed sync retries them.
+    load_scan_etags(neo4j_session, scans)
+    stat_handler.incr("images_processed_count", len(scans))
+    for batch in (findings_list, packages_list, fixes_list, scans):
+        batch.clear()
+
+
+@timeit
+def sync_images_from_s3(
+    neo4j_session: Session,
+    images: list[tuple[str, str]],
+    s3_object_etags: dict[str, str],
+    update_tag: int,
+    s3_bucket: str,
+    boto3_session: boto3.Session,
+    max_workers: int = DEFAULT_S3_DOWNLOAD_WORKERS,
+) -> None:
+    """
+    Read the Trivy scan results of many images from S3 and sync them to Neo4j.
+
+    The scan results are downloaded, parsed and transformed on `max_workers` threads sharing one S3 client, and at
+    most twice as many results are held in memory ahead of the loading, which is done on the calling thread
+    IMAGE_LOAD_BATCH_SIZE images at a time.
+
+    Args:
+        neo4j_session: Neo4j session for database operations
+        images: Tuples of (image URI, S3 object key of its scan results)
+        s3_object_etags: ETag of each S3 object key, recorded on the images once their scan results are loaded
+        update_tag: Update tag for tracking
+        s3_bucket: S3 bucket containing scan results
+        boto3_session: boto3 session for S3 operations
+        max_workers: Number of scan results to download and parse concurrently
+    """
+    # boto3 clients are thread-safe; size the connection pool so that the workers don't wait for each other.
+    s3_client = boto3_session.client(
+        "s3",
+        config=botocore.config.Config(max_pool_connections=max(max_workers, 10)),
+    )
+    findings_list: list[dict[str, Any]] = []
+    packages_list: list[dict[str, Any]] = []
+    fixes_list: list[dict[str, Any]] = []
+    scans: list[dict[str, Any]] = []
+
+    image_iter = iter(images)
+    in_flight: deque[tuple[str, str, Future]] = deque()
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="cartography-trivy-s3",
+    ) as executor:
+        try:
+            while True:
+                for next_image_uri, next_s3_object_key in image_iter:
+                    in_flight.append(
+                        (
+                            next_image_uri,
+                            next_s3_object_key,
+                            executor.submit(
+                                _read_and_transform_scan,
+                                boto3_session,
+                                s3_client,
+                                s3_bucket,
+                                next_s3_object_key,
+                                next_image_uri,
+                            ),
+                        ),
+                    )
+                    if len(in_flight) >= 2 * max_workers:
+                        break
+                if not in_flight:
+                    break
+
+                image_uri, s3_object_key, future = in_flight.popleft()
+                try:
+                    image_digest, findings, packages, fixes = future.result()
+                except Exception as e:
+                    logger.error(
+                        f"Failed to process S3 scan results for {image_uri} from {s3_object_key}: {e}"
+                    )
+                    raise
+                if not image_digest:
+                    logger.warning(
+                        f"No image digest found for {image_uri}; skipping over."
+                    )
+                    continue
+
+                stat_handler.incr("image_scan_cve_count", len(findings))
+                findings_list.extend(findings)
+                packages_list.extend(packages)
+                fixes_list.extend(fixes)
+                scans.append(
+                    {
+                        "image_uri": image_uri,
+                        "etag": s3_object_etags.get(s3_object_key),
+                        "image_digest": image_digest,
+                    },
+                )
+                if len(scans) >= IMAGE_LOAD_BATCH_SIZE:
+                    _load_scan_batch(
+                        neo4j_session,
+                        findings_list,
+                        packages_list,
+                        fixes_list,
+                        scans,
+                        update_tag,
+                    )
+        finally:
+            # If a download or a load fails, don't start the images that are still queued.
+            for _, _, future in in_flight:
+                future.cancel()
+
+    if scans:
+        _load_scan_batch(
+            neo4j_session,
+            findings_list,
+            packages_list,
+            fixes_list,
+            scans,
+            update_tag,
+        )
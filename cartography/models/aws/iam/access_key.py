@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import OtherRelationships
+from cartography.models.core.relationships import TargetNodeMatcher
+
+
+@dataclass(frozen=True)
+class AccountAccessKeyNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef("AccessKeyId")
+    accesskeyid: PropertyRef = PropertyRef("AccessKeyId", extra_index=True)
+    createdate: PropertyRef = PropertyRef("CreateDate")
+    status: PropertyRef = PropertyRef("Status")
+    lastuseddate: PropertyRef = PropertyRef("LastUsedDate")
+    lastusedservice: PropertyRef = PropertyRef("LastUsedService")
+    lastusedregion: PropertyRef = PropertyRef("LastUsedRegion")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AccountAccessKeyToAWSUserRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AccountAccessKeyToAWSUserRel(CartographyRelSchema):
+    target_node_label: str = "AWSUser"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"arn": PropertyRef("UserArn")},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "AWS_ACCESS_KEY"
+    properties: AccountAccessKeyToAWSUserRelProperties = (
+        AccountAccessKeyToAWSUserRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AccountAccessKeyToAWSAccountRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AccountAccessKeyToAWSAccountRel(CartographyRelSchema):
+    target_node_label: str = "AWSAccount"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"id": PropertyRef("AWS_ID", set_in_kwargs=True)},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "RESOURCE"
+    properties: AccountAccessKeyToAWSAccountRelProperties = (
+        AccountAccessKeyToAWSAccountRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AccountAccessKeySchema(CartographyNodeSchema):
+    """
+    An access key of an IAM user.
+    """
+
+    # TODO change the node label to reflect that this is a user access key, not an account access key
+    label: str = "AccountAccessKey"
+    properties: AccountAccessKeyNodeProperties = AccountAccessKeyNodeProperties()
+    sub_resource_relationship: AccountAccessKeyToAWSAccountRel = (
+        AccountAccessKeyToAWSAccountRel()
+    )
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            AccountAccessKeyToAWSUserRel(),
+        ],
+    )
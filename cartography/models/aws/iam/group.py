@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.nodes import ExtraNodeLabels
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_source_node_matcher
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import SourceNodeMatcher
+from cartography.models.core.relationships import TargetNodeMatcher
+
+
+@dataclass(frozen=True)
+class AWSGroupNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef("Arn")
+    arn: PropertyRef = PropertyRef("Arn", extra_index=True)
+    groupid: PropertyRef = PropertyRef("GroupId")
+    name: PropertyRef = PropertyRef("GroupName")
+    path: PropertyRef = PropertyRef("Path")
+    createdate: PropertyRef = PropertyRef("CreateDate")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSGroupToAWSAccountRelRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSGroupToAWSAccountRel(CartographyRelSchema):
+    target_node_label: str = "AWSAccount"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"id": PropertyRef("AWS_ID", set_in_kwargs=True)},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "RESOURCE"
+    properties: AWSGroupToAWSAccountRelRelProperties = (
+        AWSGroupToAWSAccountRelRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AWSGroupSchema(CartographyNodeSchema):
+    label: str = "AWSGroup"
+    properties: AWSGroupNodeProperties = AWSGroupNodeProperties()
+    extra_node_labels: ExtraNodeLabels = ExtraNodeLabels(["AWSPrincipal"])
+    sub_resource_relationship: AWSGroupToAWSAccountRel = AWSGroupToAWSAccountRel()
+
+
+@dataclass(frozen=True)
+class AWSUserToAWSGroupRelProperties(CartographyRelProperties):
+    # Mandatory fields for MatchLinks
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+    _sub_resource_label: PropertyRef = PropertyRef(
+        "_sub_resource_label", set_in_kwargs=True
+    )
+    _sub_resource_id: PropertyRef = PropertyRef("_sub_resource_id", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSUserToAWSGroupMatchLink(CartographyRelSchema):
+    """
+    MatchLink for (:AWSUser)-[:MEMBER_AWS_GROUP]->(:AWSGroup), loaded after both users and groups.
+    """
+
+    source_node_label: str = "AWSUser"
+    source_node_matcher: SourceNodeMatcher = make_source_node_matcher(
+        {"arn": PropertyRef("UserArn")},
+    )
+    target_node_label: str = "AWSGroup"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"arn": PropertyRef("GroupArn")},
+    )
+    direction: LinkDirection = LinkDirection.OUTWARD
+    rel_label: str = "MEMBER_AWS_GROUP"
+    properties: AWSUserToAWSGroupRelProperties = AWSUserToAWSGroupRelProperties()
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.nodes import ExtraNodeLabels
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import OtherRelationships
+from cartography.models.core.relationships import TargetNodeMatcher
+
+
+@dataclass(frozen=True)
+class AWSRoleNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef("Arn")
+    arn: PropertyRef = PropertyRef("Arn", extra_index=True)
+    roleid: PropertyRef = PropertyRef("RoleId")
+    name: PropertyRef = PropertyRef("RoleName")
+    path: PropertyRef = PropertyRef("Path")
+    createdate: PropertyRef = PropertyRef("CreateDate")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSRoleToAWSAccountRelRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSRoleToAWSAccountRel(CartographyRelSchema):
+    target_node_label: str = "AWSAccount"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"id": PropertyRef("AWS_ID", set_in_kwargs=True)},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "RESOURCE"
+    properties: AWSRoleToAWSAccountRelRelProperties = (
+        AWSRoleToAWSAccountRelRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AWSRoleSchema(CartographyNodeSchema):
+    """
+    An IAM role. Roles are merged on the AWSPrincipal label rather than AWSRole, so that a role that was already added
+    to the graph as a bare AWSPrincipal, e.g. because a role in another account trusts it, is updated in place instead
+    of duplicated.
+    """
+
+    label: str = "AWSPrincipal"
+    properties: AWSRoleNodeProperties = AWSRoleNodeProperties()
+    extra_node_labels: ExtraNodeLabels = ExtraNodeLabels(["AWSRole"])
+    sub_resource_relationship: AWSRoleToAWSAccountRel = AWSRoleToAWSAccountRel()
+
+
+@dataclass(frozen=True)
+class AWSTrustedPrincipalNodeProperties(CartographyNodeProperties):
+    id: PropertyRef = PropertyRef("Arn")
+    arn: PropertyRef = PropertyRef("Arn", extra_index=True)
+    type: PropertyRef = PropertyRef("Type")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSTrustedPrincipalToAWSRoleRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSTrustedPrincipalToAWSRoleRel(CartographyRelSchema):
+    target_node_label: str = "AWSRole"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"arn": PropertyRef("RoleArn")},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "TRUSTS_AWS_PRINCIPAL"
+    properties: AWSTrustedPrincipalToAWSRoleRelProperties = (
+        AWSTrustedPrincipalToAWSRoleRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AWSTrustedPrincipalToAWSAccountRelRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSTrustedPrincipalToAWSAccountRel(CartographyRelSchema):
+    target_node_label: str = "AWSAccount"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"id": PropertyRef("AccountId")},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "RESOURCE"
+    properties: AWSTrustedPrincipalToAWSAccountRelRelProperties = (
+        AWSTrustedPrincipalToAWSAccountRelRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AWSTrustedPrincipalSchema(CartographyNodeSchema):
+    """
+    A principal named in the AssumeRolePolicyDocument of a role, e.g. another role, an account root, a SAML provider or
+    a service like ec2.amazonaws.com. The sub resource of the principal is the AWSAccount named in its ARN, which may
+    be a foreign account; principals like services have none.
+    """
+
+    label: str = "AWSPrincipal"
+    properties: AWSTrustedPrincipalNodeProperties = AWSTrustedPrincipalNodeProperties()
+    sub_resource_relationship: AWSTrustedPrincipalToAWSAccountRel = (
+        AWSTrustedPrincipalToAWSAccountRel()
+    )
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            AWSTrustedPrincipalToAWSRoleRel(),
+        ],
+    )
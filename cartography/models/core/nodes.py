@@ -116,3 +116,16 @@ class CartographyNodeSchema(abc.ABC):
         :return: True if not overridden. Else return the boolean value specified on the node.
         """
         return True
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        """
+        Optional.
+        Allows specifying the number of nodes to write per transaction when loading this node type. Use a smaller value
+        for wide nodes or nodes with many relationships that hit transaction memory limits or lock timeouts. Load
+        batch sizes are tuned automatically based on transaction latency and transient errors, and this value is used
+        as both the starting and the largest batch size for the node.
+        :return: None if not overridden, in which case cartography.client.core.tx.DEFAULT_LOAD_BATCH_SIZE is the
+        starting batch size. Else return the batch size specified on the node.
+        """
+        return None
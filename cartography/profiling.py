@@ -0,0 +1,268 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextlib import nullcontext
+from typing import Any
+from typing import ContextManager
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import neo4j
+
+logger = logging.getLogger(__name__)
+
+# Names of the neo4j.SummaryCounters attributes recorded for each Cypher statement.
+SUMMARY_COUNTERS = (
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+    "indexes_added",
+    "indexes_removed",
+    "constraints_added",
+    "constraints_removed",
+)
+FOLDED_STACKS_SUFFIX = ".folded"
+
+
+def query_id(query: str) -> str:
+    """
+    Returns a short, stable identifier for a Cypher statement, used to refer to it in the profile report and in the
+    folded stacks.
+    """
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+
+
+class _Frame:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = time.monotonic()
+        # Time spent in nested frames, subtracted from this frame's own time in the folded stacks.
+        self.child_seconds = 0.0
+
+
+class SyncProfiler:
+    """
+    Records the wall time spent in each sync stage, in each function decorated with cartography.util.timeit and in
+    each Cypher statement run by cartography.client.core.tx.load_graph_data() and GraphStatement, together with the
+    rows sent, the Neo4j counters and the server-side timings of each statement.
+
+    The profiler can be used from several threads at once: every thread has its own stack of frames, and work done on
+    a thread that did not open a frame (e.g. the region fetchers of cartography.intel.aws.util.regions) is reported at
+    the root of the folded stacks.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_at = time.time()
+        self._start = time.monotonic()
+        self._stages: List[Dict[str, Any]] = []
+        self._functions: Dict[str, Dict[str, Any]] = {}
+        self._queries: Dict[str, Dict[str, Any]] = {}
+        # Folded stack -> microseconds spent in the innermost frame of that stack.
+        self._folded: Counter = Counter()
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _pop(self, frame: _Frame) -> float:
+        """
+        Closes the innermost frame of the current thread, adds its own time to the folded stacks and returns its wall
+        time in seconds. Must be called with the lock held.
+        """
+        stack = self._stack()
+        elapsed = time.monotonic() - frame.start
+        path = ";".join(f.name for f in stack)
+        stack.pop()
+        self._folded[path] += int(max(elapsed - frame.child_seconds, 0) * 1_000_000)
+        if stack:
+            stack[-1].child_seconds += elapsed
+        return elapsed
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Records the wall time and the outcome of the sync stage `name` run in this context.
+        """
+        frame = _Frame(name)
+        self._stack().append(frame)
+        status = "failure"
+        try:
+            yield
+            status = "success"
+        finally:
+            with self._lock:
+                elapsed = self._pop(frame)
+                self._stages.append(
+                    {
+                        "name": name,
+                        "status": status,
+                        "wall_time_seconds": elapsed,
+                    },
+                )
+
+    @contextmanager
+    def function(self, name: str) -> Iterator[None]:
+        """
+        Records a call to the function `name`, e.g. `cartography.intel.aws.ec2.instances.sync_ec2_instances`, run in
+        this context.
+        """
+        frame = _Frame(name)
+        self._stack().append(frame)
+        try:
+            yield
+        finally:
+            with self._lock:
+                elapsed = self._pop(frame)
+                stats = self._functions.setdefault(
+                    name,
+                    {"name": name, "calls": 0, "wall_time_seconds": 0.0},
+                )
+                stats["calls"] += 1
+                stats["wall_time_seconds"] += elapsed
+
+    def record_query(
+        self,
+        query: str,
+        wall_time_seconds: float,
+        rows: Optional[int] = None,
+        summary: Optional[neo4j.ResultSummary] = None,
+    ) -> None:
+        """
+        Records one run of a Cypher statement as a leaf of the current thread's stack.
+        :param query: The Cypher statement.
+        :param wall_time_seconds: The client-side wall time of the run.
+        :param rows: The number of rows sent with the statement, e.g. the size of the `$DictList` batch. Optional.
+        :param summary: The neo4j.ResultSummary of the run, from which the counters and the server-side
+        `result_available_after` and `result_consumed_after` timings are read. Optional.
+        """
+        qid = query_id(query)
+        with self._lock:
+            stats = self._queries.get(qid)
+            if stats is None:
+                stats = self._queries[qid] = {
+                    "id": qid,
+                    "query": query,
+                    "calls": 0,
+                    "rows": 0,
+                    "wall_time_seconds": 0.0,
+                    "result_available_after_ms": 0,
+                    "result_consumed_after_ms": 0,
+                    "counters": dict.fromkeys(SUMMARY_COUNTERS, 0),
+                }
+            stats["calls"] += 1
+            stats["rows"] += rows or 0
+            stats["wall_time_seconds"] += wall_time_seconds
+            if summary is not None:
+                stats["result_available_after_ms"] += (
+                    summary.result_available_after or 0
+                )
+                stats["result_consumed_after_ms"] += summary.result_consumed_after or 0
+                for counter in SUMMARY_COUNTERS:
+                    stats["counters"][counter] += getattr(summary.counters, counter)
+
+            stack = self._stack()
+            path = ";".join([f.name for f in stack] + [f"cypher:{qid}"])
+            self._folded[path] += int(wall_time_seconds * 1_000_000)
+            if stack:
+                stack[-1].child_seconds += wall_time_seconds
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns the profile as a JSON-serializable dict. Functions and queries are sorted by decreasing wall time.
+        """
+        with self._lock:
+            return {
+                "started_at": self._started_at,
+                "wall_time_seconds": time.monotonic() - self._start,
+                "stages": [dict(s) for s in self._stages],
+                "functions": sorted(
+                    (dict(f) for f in self._functions.values()),
+                    key=lambda f: f["wall_time_seconds"],
+                    reverse=True,
+                ),
+                "queries": sorted(
+                    (
+                        dict(q, counters=dict(q["counters"]))
+                        for q in self._queries.values()
+                    ),
+                    key=lambda q: q["wall_time_seconds"],
+                    reverse=True,
+                ),
+            }
+
+    def folded_stacks(self) -> List[str]:
+        """
+        Returns the profile in the folded stacks format read by flamegraph.pl and speedscope: one `frame;frame;frame
+        value` line per stack, where the value is the number of microseconds spent in the innermost frame.
+        """
+        with self._lock:
+            return [
+                f"{path} {value}"
+                for path, value in sorted(self._folded.items())
+                if value > 0
+            ]
+
+    def write_report(self, path: str, **extra: Any) -> None:
+        """
+        Writes the JSON report to `path` and the folded stacks next to it, with the `.folded` extension.
+        :param path: The path of the JSON report.
+        :param extra: Additional top-level fields of the JSON report, e.g. the update tag of the sync.
+        """
+        report = self.report()
+        report.update(extra)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        folded_path = os.path.splitext(path)[0] + FOLDED_STACKS_SUFFIX
+        with open(folded_path, "w") as f:
+            for line in self.folded_stacks():
+                f.write(line + "\n")
+        logger.info(
+            "Wrote the sync profile to '%s' and its folded stacks to '%s'.",
+            path,
+            folded_path,
+        )
+
+
+# Global _profiler
+# Will be set for the duration of cartography.sync.run_with_config when config.profile_report_path is set
+_profiler: Optional[SyncProfiler] = None
+
+
+def set_profiler(profiler: Optional[SyncProfiler]) -> None:
+    """
+    Sets, or with None clears, the profiler that records the current sync.
+    """
+    global _profiler
+    _profiler = profiler
+
+
+def get_profiler() -> Optional[SyncProfiler]:
+    """
+    Returns the profiler recording the current sync, or None if profiling is disabled.
+    """
+    return _profiler
+
+
+def profile_stage(name: str) -> ContextManager[None]:
+    """
+    Records the sync stage `name` if profiling is enabled; does nothing otherwise.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name)
@@ -3,14 +3,21 @@ import logging
 import re
 import time
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from pkgutil import iter_modules
 from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Union
 
 import neo4j.exceptions
-from neo4j import GraphDatabase
 from statsd import StatsClient
 
 import cartography.intel.airbyte
@@ -44,9 +51,15 @@ import cartography.intel.snipeit
 import cartography.intel.tailscale
 import cartography.intel.trivy
 from cartography.config import Config
+from cartography.graph.job import set_concurrent_cleanup
+from cartography.profiling import profile_stage
+from cartography.profiling import set_profiler
+from cartography.profiling import SyncProfiler
 from cartography.stats import set_stats_client
+from cartography.util import build_neo4j_driver
 from cartography.util import STATUS_FAILURE
 from cartography.util import STATUS_SUCCESS
+from cartography.util import thread_event_loop
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +100,25 @@ TOP_LEVEL_MODULES = OrderedDict(
     }
 )
 
+# Stages that read data written by other stages. When stages run concurrently (see `--max-parallel-stages`), a stage
+# listed here only starts once all of its dependencies that are part of the sync have finished. `create-indexes` and
+# `analysis` do not need to be listed: the former always runs before every other stage and the latter after all of them.
+STAGE_DEPENDENCIES: Dict[str, List[str]] = {
+    # CVEs are attached to existing SpotlightVulnerability nodes
+    "cve": ["crowdstrike"],
+    # Okta AWS SAML role mapping attaches Okta groups to existing AWSRole nodes
+    "okta": ["aws"],
+    # LastPass users are attached to existing Human nodes, created by the Okta sync
+    "lastpass": ["okta"],
+    # Duo users are attached to existing Human nodes, created by the Okta sync
+    "duo": ["okta"],
+    # Semgrep findings and dependencies are attached to existing GitHubRepository nodes, and SCA findings to existing
+    # CVE nodes
+    "semgrep": ["crowdstrike", "cve", "github"],
+    # Trivy findings are attached to existing ECRImage nodes
+    "trivy": ["aws"],
+}
+
 
 class Sync:
     """
@@ -101,8 +133,14 @@ class Sync:
     def __init__(self):
         # NOTE we may need meta-stages at some point to allow hooking into pre-sync, sync, and post-sync
         self._stages = OrderedDict()
+        self._stage_dependencies: Dict[str, Set[str]] = {}
 
-    def add_stage(self, name: str, func: Callable) -> None:
+    def add_stage(
+        self,
+        name: str,
+        func: Callable,
+        depends_on: Optional[Iterable[str]] = None,
+    ) -> None:
         """
         Add one stage to the sync task.
 
@@ -110,8 +148,18 @@ class Sync:
         :param name: The name of the stage.
         :type func: Callable
         :param func: The object to call when the stage is executed.
+        :type depends_on: Iterable[string]
+        :param depends_on: Names of previously added stages that must finish before this stage starts when stages are
+            run concurrently. Optional.
         """
+        dependencies = set(depends_on) if depends_on else set()
+        unknown_dependencies = dependencies - set(self._stages.keys())
+        if unknown_dependencies:
+            raise ValueError(
+                f"Stage '{name}' depends on {sorted(unknown_dependencies)}, which must be added to the sync before it.",
+            )
         self._stages[name] = func
+        self._stage_dependencies[name] = dependencies
 
     def add_stages(self, stages: List[Tuple[str, Callable]]) -> None:
         """
@@ -129,7 +177,10 @@ class Sync:
         config: Union[Config, argparse.Namespace],
     ) -> int:
         """
-        Execute all stages in the sync task in sequence.
+        Execute all stages in the sync task.
+
+        By default the stages run in sequence on a single Neo4j session. If `config.max_parallel_stages` is greater
+        than 1, stages whose dependencies have finished are run concurrently, each on its own Neo4j session.
 
         :type neo4j_driver: neo4j.Driver
         :param neo4j_driver: Neo4j driver object.
@@ -137,24 +188,104 @@ class Sync:
         :param config: Configuration for the sync run.
         """
         logger.info("Starting sync with update tag '%d'", config.update_tag)
-        with neo4j_driver.session(database=config.neo4j_database) as neo4j_session:
-            for stage_name, stage_func in self._stages.items():
-                logger.info("Starting sync stage '%s'", stage_name)
-                try:
-                    stage_func(neo4j_session, config)
-                except (KeyboardInterrupt, SystemExit):
-                    logger.warning("Sync interrupted during stage '%s'.", stage_name)
-                    raise
-                except Exception:
-                    logger.exception(
-                        "Unhandled exception during sync stage '%s'",
-                        stage_name,
-                    )
-                    raise  # TODO this should be configurable
-                logger.info("Finishing sync stage '%s'", stage_name)
+        max_parallel_stages = getattr(config, "max_parallel_stages", None) or 1
+        if max_parallel_stages > 1:
+            self._run_stages_concurrently(neo4j_driver, config, max_parallel_stages)
+        else:
+            with neo4j_driver.session(
+                database=config.neo4j_database,
+            ) as neo4j_session:
+                for stage_name, stage_func in self._stages.items():
+                    self._run_stage(stage_name, stage_func, neo4j_session, config)
         logger.info("Finishing sync with update tag '%d'", config.update_tag)
         return STATUS_SUCCESS
 
+    def _run_stages_concurrently(
+        self,
+        neo4j_driver: neo4j.Driver,
+        config: Union[Config, argparse.Namespace],
+        max_parallel_stages: int,
+    ) -> None:
+        """
+        Run the stages on a pool of `max_parallel_stages` threads. A stage is submitted once all of its dependencies
+        have finished; among the ready stages, the ones added first are submitted first. If a stage fails, no further
+        stages are started, the stages already running are allowed to finish, and the error is re-raised.
+        """
+        pending = OrderedDict(self._stages)
+        finished: Set[str] = set()
+        running: Dict[Future, str] = {}
+        logger.info(
+            "Running up to %d sync stages concurrently.",
+            max_parallel_stages,
+        )
+        with ThreadPoolExecutor(
+            max_workers=max_parallel_stages,
+            thread_name_prefix="cartography-stage",
+        ) as executor:
+            while pending or running:
+                ready = [
+                    stage_name
+                    for stage_name in pending
+                    if self._stage_dependencies[stage_name] <= finished
+                ]
+                for stage_name in ready[: max_parallel_stages - len(running)]:
+                    future = executor.submit(
+                        self._run_stage_in_new_session,
+                        stage_name,
+                        pending.pop(stage_name),
+                        neo4j_driver,
+                        config,
+                    )
+                    running[future] = stage_name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage_name = running.pop(future)
+                    # Re-raises the stage's exception, if any. Exiting the executor waits for running stages.
+                    future.result()
+                    finished.add(stage_name)
+
+    def _run_stage_in_new_session(
+        self,
+        stage_name: str,
+        stage_func: Callable,
+        neo4j_driver: neo4j.Driver,
+        config: Union[Config, argparse.Namespace],
+    ) -> None:
+        with (
+            thread_event_loop(),
+            neo4j_driver.session(
+                database=config.neo4j_database,
+            ) as neo4j_session,
+        ):
+            self._run_stage(stage_name, stage_func, neo4j_session, config)
+
+    @staticmethod
+    def _run_stage(
+        stage_name: str,
+        stage_func: Callable,
+        neo4j_session: neo4j.Session,
+        config: Union[Config, argparse.Namespace],
+    ) -> None:
+        logger.info("Starting sync stage '%s'", stage_name)
+        start = time.monotonic()
+        try:
+            with profile_stage(stage_name):
+                stage_func(neo4j_session, config)
+        except (KeyboardInterrupt, SystemExit):
+            logger.warning("Sync interrupted during stage '%s'.", stage_name)
+            raise
+        except Exception:
+            logger.exception(
+                "Unhandled exception during sync stage '%s'",
+                stage_name,
+            )
+            raise  # TODO this should be configurable
+        logger.info(
+            "Finishing sync stage '%s' in %.2f seconds",
+            stage_name,
+            time.monotonic() - start,
+        )
+
     @classmethod
     def list_intel_modules(cls) -> OrderedDict:
         """
@@ -240,11 +371,7 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
     if config.neo4j_user or config.neo4j_password:
         neo4j_auth = (config.neo4j_user, config.neo4j_password)
     try:
-        neo4j_driver = GraphDatabase.driver(
-            config.neo4j_uri,
-            auth=neo4j_auth,
-            max_connection_lifetime=config.neo4j_max_connection_lifetime,
-        )
+        neo4j_driver = build_neo4j_driver(config)
     except neo4j.exceptions.ServiceUnavailable as e:
         logger.debug("Error occurred during Neo4j connect.", exc_info=True)
         logger.error(
@@ -280,7 +407,25 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
     default_update_tag = int(time.time())
     if not config.update_tag:
         config.update_tag = default_update_tag
-    return sync.run(neo4j_driver, config)
+
+    set_concurrent_cleanup(
+        neo4j_driver,
+        getattr(config, "max_concurrent_cleanup_statements", None) or 1,
+        getattr(config, "neo4j_database", None),
+    )
+    try:
+        profile_report_path = getattr(config, "profile_report_path", None)
+        if not profile_report_path:
+            return sync.run(neo4j_driver, config)
+        profiler = SyncProfiler()
+        set_profiler(profiler)
+        try:
+            return sync.run(neo4j_driver, config)
+        finally:
+            set_profiler(None)
+            profiler.write_report(profile_report_path, update_tag=config.update_tag)
+    finally:
+        set_concurrent_cleanup(None)
 
 
 def build_default_sync() -> Sync:
@@ -291,15 +436,27 @@ def build_default_sync() -> Sync:
     :return: The default cartography sync object.
     """
     sync = Sync()
-    sync.add_stages(
-        [
-            (stage_name, stage_func)
-            for stage_name, stage_func in TOP_LEVEL_MODULES.items()
-        ],
-    )
+    _add_top_level_stages(sync, list(TOP_LEVEL_MODULES.keys()))
     return sync
 
 
+def _add_top_level_stages(sync: Sync, stage_names: List[str]) -> None:
+    """
+    Add the given TOP_LEVEL_MODULES stages to the sync, in order, along with the dependencies that let them run
+    concurrently: `create-indexes` before everything, `analysis` after everything, and STAGE_DEPENDENCIES in between.
+    Dependencies on stages that are not selected, or that are selected after the dependent stage, are ignored.
+    """
+    for stage_name in stage_names:
+        if stage_name == "analysis":
+            depends_on = set(sync._stages.keys())
+        else:
+            depends_on = set(STAGE_DEPENDENCIES.get(stage_name, []))
+            if stage_name != "create-indexes":
+                depends_on.add("create-indexes")
+            depends_on &= set(sync._stages.keys())
+        sync.add_stage(stage_name, TOP_LEVEL_MODULES[stage_name], depends_on)
+
+
 def parse_and_validate_selected_modules(selected_modules: str) -> List[str]:
     """
     Ensures that user-selected modules passed through the CLI are valid and parses them to a list of str.
@@ -330,7 +487,5 @@ def build_sync(selected_modules_as_str: str) -> Sync:
     """
     selected_modules = parse_and_validate_selected_modules(selected_modules_as_str)
     sync = Sync()
-    sync.add_stages(
-        [(sync_name, TOP_LEVEL_MODULES[sync_name]) for sync_name in selected_modules],
-    )
+    _add_top_level_stages(sync, selected_modules)
     return sync
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import re
+from contextlib import contextmanager
 from functools import partial
 from functools import wraps
 from importlib.resources import open_binary
@@ -14,6 +15,7 @@ from typing import Callable
 from typing import cast
 from typing import Dict
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Set
@@ -26,8 +28,10 @@ import boto3
 import botocore
 import neo4j
 
+from cartography.config import Config
 from cartography.graph.job import GraphJob
 from cartography.graph.statement import get_job_shortname
+from cartography.profiling import get_profiler
 from cartography.stats import get_stats_client
 from cartography.stats import ScopedStatsClient
 
@@ -39,6 +43,13 @@ STATUS_FAILURE = 1
 STATUS_KEYBOARD_INTERRUPT = 130
 DEFAULT_BATCH_SIZE = 1000
 DEFAULT_MAX_PAGES = 10000
+# Key in common_job_parameters holding the value of `--incremental-analysis`.
+INCREMENTAL_ANALYSIS_PARAM = "incremental_analysis"
+# Parameters that scope a scoped analysis job to a single sub resource, and the label of that sub resource.
+SUB_RESOURCE_PARAMETERS = {
+    "AWS_ID": "AWSAccount",
+    "PROJECT_ID": "GCPProject",
+}
 
 
 def run_analysis_job(
@@ -72,6 +83,7 @@ def run_analysis_and_ensure_deps(
     requested_syncs: Set[str],
     common_job_parameters: Dict[str, Any],
     neo4j_session: neo4j.Session,
+    sub_resource_parameter: Optional[str] = None,
 ) -> None:
     """
     Runs analysis job only if the given set of resource dependencies was included in the requested_syncs.
@@ -81,6 +93,9 @@ def run_analysis_and_ensure_deps(
     :param requested_syncs: The value passed to cartography.config requested syncs as a set of strings.
     :param common_job_parameters: The common job params dict used in cartography.
     :param neo4j_session: The neo4j session object.
+    :param sub_resource_parameter: Optional. If the job has a version in cartography.data.jobs.scoped_analysis scoped
+    with this parameter (e.g. "AWS_ID") and `--incremental-analysis` is set, only run that version, for the sub
+    resources updated by this sync. See run_incremental_analysis_job().
     """
     if not resource_dependencies.issubset(requested_syncs):
         logger.info(
@@ -90,6 +105,17 @@ def run_analysis_and_ensure_deps(
         )
         return
 
+    if sub_resource_parameter and common_job_parameters.get(
+        INCREMENTAL_ANALYSIS_PARAM,
+    ):
+        run_incremental_analysis_job(
+            analysis_job_name,
+            neo4j_session,
+            common_job_parameters,
+            sub_resource_parameter,
+        )
+        return
+
     run_analysis_job(
         analysis_job_name,
         neo4j_session,
@@ -116,6 +142,70 @@ def run_scoped_analysis_job(
     )
 
 
+def get_sub_resources_updated_in_sync(
+    neo4j_session: neo4j.Session,
+    sub_resource_label: str,
+    update_tag: int,
+) -> List[str]:
+    """
+    Returns the ids of the sub resources (e.g. AWSAccounts or GCPProjects) that have at least one resource attached
+    with a RESOURCE relationship that was written with the given update tag, i.e. the sub resources synced in this run.
+    :param neo4j_session: The neo4j session object.
+    :param sub_resource_label: The label of the sub resource, e.g. "AWSAccount".
+    :param update_tag: The update tag of the current sync.
+    :return: The ids of the updated sub resources.
+    """
+    query = f"""
+    MATCH (s:{sub_resource_label})
+    WHERE EXISTS {{
+        MATCH (s)-[:RESOURCE]->(n)
+        WHERE n.lastupdated = $UPDATE_TAG
+    }}
+    RETURN s.id AS id
+    """
+    return [record["id"] for record in neo4j_session.run(query, UPDATE_TAG=update_tag)]
+
+
+def run_incremental_analysis_job(
+    filename: str,
+    neo4j_session: neo4j.Session,
+    common_job_parameters: Dict,
+    sub_resource_parameter: str,
+    package: str = "cartography.data.jobs.scoped_analysis",
+) -> None:
+    """
+    Runs the scoped analysis job `filename` once for each sub resource updated by the current sync, instead of running
+    its unscoped version from cartography.data.jobs.analysis over the whole graph. A sub resource is updated if any of
+    its resources carries the current `UPDATE_TAG` as `lastupdated`; see get_sub_resources_updated_in_sync(). The
+    results of the sub resources that were not synced are left as they were computed by the last sync that did.
+    :param filename: The name of the job in `package`, e.g. "aws_ec2_asset_exposure.json".
+    :param neo4j_session: The neo4j session object.
+    :param common_job_parameters: The common job params dict used in cartography. Must contain `UPDATE_TAG`.
+    :param sub_resource_parameter: The job parameter holding the sub resource id, e.g. "AWS_ID". Must be a key of
+    SUB_RESOURCE_PARAMETERS.
+    :param package: The package containing the scoped job.
+    """
+    sub_resource_label = SUB_RESOURCE_PARAMETERS[sub_resource_parameter]
+    sub_resource_ids = get_sub_resources_updated_in_sync(
+        neo4j_session,
+        sub_resource_label,
+        common_job_parameters["UPDATE_TAG"],
+    )
+    logger.info(
+        "Running %s for the %d %s nodes updated in this sync.",
+        filename,
+        len(sub_resource_ids),
+        sub_resource_label,
+    )
+    for sub_resource_id in sub_resource_ids:
+        run_scoped_analysis_job(
+            filename,
+            neo4j_session,
+            {**common_job_parameters, sub_resource_parameter: sub_resource_id},
+            package,
+        )
+
+
 def run_cleanup_job(
     filename: str,
     neo4j_session: neo4j.Session,
@@ -185,13 +275,21 @@ F = TypeVar("F", bound=Callable[..., Any])
 def timeit(method: F) -> F:
     """
     This decorator uses statsd to time the execution of the wrapped method and sends it to the statsd server.
-    This is only active if config.statsd_enabled is True.
+    This is only active if config.statsd_enabled is True. The call is also recorded by the sync profiler when
+    config.profile_report_path is set; see cartography.profiling.
     :param method: The function to measure execution
     """
 
     # Allow access via `inspect` to the wrapped function. This is used in integration tests to standardize param names.
     @wraps(method)
     def timed(*args, **kwargs):  # type: ignore
+        profiler = get_profiler()
+        if profiler is not None:
+            with profiler.function(f"{method.__module__}.{method.__name__}"):
+                return _timed(*args, **kwargs)
+        return _timed(*args, **kwargs)
+
+    def _timed(*args: Any, **kwargs: Any) -> Any:
         stats_client = get_stats_client(method.__module__)
         if stats_client.is_enabled():
             timer = stats_client.timer(method.__name__)
@@ -377,7 +475,13 @@ def is_throttling_exception(exc: Exception) -> bool:
     """
     # https://boto3.amazonaws.com/v1/documentation/api/1.19.9/guide/error-handling.html
     if isinstance(exc, botocore.exceptions.ClientError):
-        if exc.response["Error"]["Code"] in ["LimitExceededException", "Throttling"]:
+        if exc.response["Error"]["Code"] in [
+            "LimitExceededException",
+            "RequestLimitExceeded",
+            "Throttling",
+            "ThrottlingException",
+            "TooManyRequestsException",
+        ]:
             return True
     # add other exceptions here, if needed, like:
     # https://cloud.google.com/python/docs/reference/storage/1.39.0/retry_timeout#configuring-retries
@@ -441,6 +545,40 @@ def to_asynchronous(func: Callable[..., R], *args: Any, **kwargs: Any) -> Awaita
     return asyncio.get_event_loop().run_in_executor(None, call)
 
 
+@contextmanager
+def thread_event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """
+    Binds a new asyncio event loop to the current thread for the duration of the context, and closes it on exit.
+
+    Threads other than the main thread do not get an event loop by default, so code running on a worker thread (e.g. a
+    concurrently executed sync stage or AWS account) must be wrapped in this context manager to use
+    to_asynchronous() and to_synchronous().
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        yield loop
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def build_neo4j_driver(config: Union[Config, Any]) -> neo4j.Driver:
+    """
+    Creates a Neo4j driver from the connection settings (URI, auth, connection lifetime) of the given cartography
+    configuration object.
+    """
+    neo4j_auth = None
+    if config.neo4j_user or config.neo4j_password:
+        neo4j_auth = (config.neo4j_user, config.neo4j_password)
+    return neo4j.GraphDatabase.driver(
+        config.neo4j_uri,
+        auth=neo4j_auth,
+        max_connection_lifetime=config.neo4j_max_connection_lifetime,
+    )
+
+
 def to_synchronous(*awaitables: Awaitable[Any]) -> List[Any]:
     """
     Synchronously waits for the Awaitable(s) to complete and returns their result(s).
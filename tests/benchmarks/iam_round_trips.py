@@ -0,0 +1,225 @@
+"""
+Counts the Neo4j round trips made by the IAM user, group, role, group membership and access key loaders in
+cartography.intel.aws.iam on a synthetic account, and compares them with the one-query-per-row loops that these
+loaders replaced.
+
+Index creation queries are counted separately: they are run once per schema and, against a real driver, only once per
+process.
+
+Usage:
+    python -m tests.benchmarks.iam_round_trips --users 2000 --groups 100 --roles 1000
+"""
+
+import argparse
+import datetime
+import random
+import time
+from typing import Any
+from typing import Callable
+from typing import cast
+from typing import Dict
+from typing import List
+
+import neo4j
+
+from cartography.intel.aws import iam
+
+ACCOUNT_ID = "000000000000"
+FOREIGN_ACCOUNT_IDS = ["111111111111", "222222222222", "333333333333"]
+CREATE_DATE = datetime.datetime(2019, 1, 1, 0, 0, 1)
+UPDATE_TAG = 1
+
+
+class _DiscardingTransaction:
+    def __init__(self, session: "RoundTripCountingSession") -> None:
+        self.session = session
+
+    def run(self, query: str, parameters: Any = None, **kwargs: Any) -> None:
+        self.session.rows += len((parameters or {}).get("DictList", []))
+
+
+class RoundTripCountingSession:
+    """
+    Stands in for a neo4j.Session: runs the transaction functions against a transaction that discards its queries,
+    and counts the calls that would each be a round trip to the database.
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.transactions = 0
+        self.rows = 0
+
+    def run(self, query: str, *args: Any, **kwargs: Any) -> None:
+        self.queries += 1
+
+    def write_transaction(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        self.transactions += 1
+        return func(_DiscardingTransaction(self), *args, **kwargs)
+
+
+def generate_account(
+    users: int,
+    groups: int,
+    roles: int,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    user_list = [
+        {
+            "UserName": f"user-{i}",
+            "UserId": f"AIDA{i:017d}",
+            "Path": "/",
+            "CreateDate": CREATE_DATE,
+            "PasswordLastUsed": CREATE_DATE,
+            "Arn": f"arn:aws:iam::{ACCOUNT_ID}:user/user-{i}",
+        }
+        for i in range(users)
+    ]
+    group_list = [
+        {
+            "GroupName": f"group-{i}",
+            "GroupId": f"AGPA{i:018d}",
+            "Path": "/",
+            "CreateDate": CREATE_DATE,
+            "Arn": f"arn:aws:iam::{ACCOUNT_ID}:group/group-{i}",
+        }
+        for i in range(groups)
+    ]
+    role_list = []
+    for i in range(roles):
+        principal: Dict[str, Any] = rng.choice(
+            [
+                {"Service": "ec2.amazonaws.com"},
+                {"AWS": f"arn:aws:iam::{rng.choice(FOREIGN_ACCOUNT_IDS)}:root"},
+                {
+                    "AWS": [
+                        f"arn:aws:iam::{ACCOUNT_ID}:role/role-{rng.randrange(roles)}",
+                        f"arn:aws:iam::{ACCOUNT_ID}:user/user-{rng.randrange(max(users, 1))}",
+                    ],
+                },
+            ],
+        )
+        role_list.append(
+            {
+                "RoleName": f"role-{i}",
+                "RoleId": f"AROA{i:017d}",
+                "Path": "/",
+                "CreateDate": CREATE_DATE,
+                "Arn": f"arn:aws:iam::{ACCOUNT_ID}:role/role-{i}",
+                "AssumeRolePolicyDocument": {
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Principal": principal,
+                            "Action": "sts:AssumeRole",
+                        },
+                    ],
+                },
+            },
+        )
+    memberships = {
+        group["Arn"]: {
+            "Users": [
+                {"Arn": user["Arn"]}
+                for user in rng.sample(user_list, min(len(user_list), 20))
+            ],
+        }
+        for group in group_list
+    }
+    access_keys = {
+        user["Arn"]: {
+            "AccessKeyMetadata": [
+                {
+                    "AccessKeyId": f"AKIA{i:016d}{k}",
+                    "CreateDate": CREATE_DATE,
+                    "Status": "Active",
+                    "LastUsedDate": None,
+                    "LastUsedService": "N/A",
+                    "LastUsedRegion": "N/A",
+                }
+                for k in range(rng.randint(0, 2))
+            ],
+        }
+        for i, user in enumerate(user_list)
+    }
+    return {
+        "users": user_list,
+        "groups": group_list,
+        "roles": role_list,
+        "memberships": memberships,
+        "access_keys": access_keys,
+    }
+
+
+def count_per_row_round_trips(account: Dict[str, Any]) -> int:
+    """
+    The number of queries run by the per-row loaders: one per user, group and role, one or two per trusted principal
+    (two when the principal ARN names an account), one per group membership and one per access key.
+    """
+    trusted_principals = iam.transform_trusted_principals(account["roles"])
+    return (
+        len(account["users"])
+        + len(account["groups"])
+        + len(account["roles"])
+        + len(trusted_principals)
+        + sum(1 for p in trusted_principals if p["AccountId"])
+        + len(iam.transform_group_memberships(account["memberships"]))
+        + len(iam.transform_user_access_keys(account["access_keys"]))
+    )
+
+
+def run_loaders(session: RoundTripCountingSession, account: Dict[str, Any]) -> None:
+    # The counting session stands in for a neo4j.Session; it implements the calls that the loaders make.
+    neo4j_session = cast(neo4j.Session, session)
+    iam.load_users(neo4j_session, account["users"], ACCOUNT_ID, UPDATE_TAG)
+    iam.load_groups(neo4j_session, account["groups"], ACCOUNT_ID, UPDATE_TAG)
+    iam.load_roles(neo4j_session, account["roles"], ACCOUNT_ID, UPDATE_TAG)
+    iam.load_group_memberships(
+        neo4j_session,
+        account["memberships"],
+        ACCOUNT_ID,
+        UPDATE_TAG,
+    )
+    iam.load_user_access_keys(
+        neo4j_session,
+        account["access_keys"],
+        ACCOUNT_ID,
+        UPDATE_TAG,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--roles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    account = generate_account(
+        args.users,
+        args.groups,
+        args.roles,
+        random.Random(args.seed),
+    )
+    session = RoundTripCountingSession()
+    start = time.perf_counter()
+    run_loaders(session, account)
+    elapsed = time.perf_counter() - start
+
+    per_row = count_per_row_round_trips(account)
+    results: List[tuple] = [
+        ("per-row loaders (queries)", per_row),
+        ("batched loaders (write transactions)", session.transactions),
+        ("batched loaders (index queries)", session.queries),
+        ("rows written", session.rows),
+    ]
+    for name, value in results:
+        print(f"{name:<40} {value:>8}")
+    print(
+        f"{'round trip reduction':<40} {per_row / max(session.transactions, 1):>7.1f}x",
+    )
+    print(f"{'client-side time in batched loaders':<40} {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+Load-tests cartography against a local Neo4j with synthetic, API-shaped payloads, and reports the throughput of each
+module so that hardware can be sized and scaling cliffs caught without production credentials.
+
+The EC2 instance and IAM modules run their real sync functions (cartography.intel.aws.ec2.instances.sync_ec2_instances,
+cartography.intel.aws.iam.sync_users and sync_roles) on payloads shaped like the boto3 responses, with only the
+`get_*()` functions that call AWS replaced. Any other node schema in cartography.models can be load-tested with
+`--schema <class name>=<count>`: its rows are generated from the schema's PropertyRefs and written with
+cartography.client.core.tx.load() and the cleanup job from GraphJob.from_node_schema().
+
+Every module is synced `--passes` times. The first pass writes into an empty graph; on later passes a `--churn`
+fraction of the resources is replaced by new ones, so that the cleanup jobs delete the stale ones like they would in
+a real steady-state sync. The time spent in each @timeit function is read from cartography.profiling, and the time
+spent generating the payloads is not counted.
+
+This empties the database before it starts, so it refuses to run without --allow-wipe. Only point it at a disposable
+Neo4j, e.g. the one used by the integration tests.
+
+Usage:
+    python -m tests.benchmarks.load_test --allow-wipe --accounts 500 --ec2-instances 1000000 --iam-roles 100000
+    python -m tests.benchmarks.load_test --allow-wipe --modules schema --schema EC2SubnetSchema=200000
+"""
+
+import argparse
+import datetime
+import json
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+from unittest import mock
+
+import neo4j
+
+from cartography.client.core.tx import load
+from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.job import GraphJob
+from cartography.graph.querybuilder import build_ingestion_query
+from cartography.intel.aws import iam
+from cartography.intel.aws import organizations
+from cartography.intel.aws.ec2 import instances
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.profiling import set_profiler
+from cartography.profiling import SyncProfiler
+from tests.benchmarks.query_plans import iter_schemas
+from tests.benchmarks.query_plans import parameters_for
+from tests.benchmarks.query_plans import seed_matched_nodes
+from tests.benchmarks.query_plans import synthetic_rows
+from tests.benchmarks.query_plans import wipe
+from tests.integration import settings
+
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"]
+LAUNCH_TIME = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+# Resources shared by the instances of a region, like in a real account.
+SUBNETS_PER_REGION = 50
+SECURITY_GROUPS_PER_REGION = 100
+KEY_PAIRS_PER_REGION = 10
+INSTANCES_PER_RESERVATION = 4
+# Number of @timeit functions listed for each module in the report.
+TOP_FUNCTIONS = 3
+
+
+def account_ids(accounts: int) -> List[str]:
+    return [f"{100000000000 + i:012d}" for i in range(accounts)]
+
+
+def _split(total: int, parts: int, index: int) -> int:
+    """
+    The share of `total` given to the `index`-th of `parts` equal parts.
+    """
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def _resource_number(n: int, count: int, generation: int, churn: float) -> str:
+    """
+    The identifier suffix of the n-th of `count` resources at `generation`: the first `churn` fraction of the
+    resources is renamed on every generation, so that the previous ones become stale.
+    """
+    if generation and n < int(count * churn):
+        return f"{generation:02x}{n:010x}"
+    return f"00{n:010x}"
+
+
+def ec2_reservations(
+    account_id: str,
+    region: str,
+    count: int,
+    generation: int,
+    churn: float,
+) -> List[Dict[str, Any]]:
+    """
+    Returns `count` instances of the given account and region, shaped like the `Reservations` of the
+    ec2:DescribeInstances response.
+    """
+    prefix = f"{account_id[-4:]}{REGIONS.index(region) if region in REGIONS else 0}"
+    reservations: List[Dict[str, Any]] = []
+    for n in range(count):
+        suffix = _resource_number(n, count, generation, churn)
+        if n % INSTANCES_PER_RESERVATION == 0:
+            reservations.append(
+                {
+                    "ReservationId": f"r-{prefix}{suffix}",
+                    "OwnerId": account_id,
+                    "RequesterId": "",
+                    "Groups": [],
+                    "Instances": [],
+                },
+            )
+        subnet_id = f"subnet-{prefix}{n % SUBNETS_PER_REGION:08x}"
+        group = {
+            "GroupId": f"sg-{prefix}{n % SECURITY_GROUPS_PER_REGION:08x}",
+            "GroupName": f"sg-{n % SECURITY_GROUPS_PER_REGION}",
+        }
+        reservations[-1]["Instances"].append(
+            {
+                "InstanceId": f"i-{prefix}{suffix}",
+                "ImageId": "ami-0123456789abcdef0",
+                "InstanceType": "m5.large",
+                "KeyName": f"key-{n % KEY_PAIRS_PER_REGION}",
+                "LaunchTime": LAUNCH_TIME,
+                "Monitoring": {"State": "disabled"},
+                "Placement": {
+                    "AvailabilityZone": f"{region}a",
+                    "GroupName": "",
+                    "Tenancy": "default",
+                },
+                "PrivateDnsName": f"ip-10-0-{n % 256}-{n // 256 % 256}.ec2.internal",
+                "PrivateIpAddress": f"10.0.{n % 256}.{n // 256 % 256}",
+                "PublicDnsName": "",
+                "State": {"Code": 16, "Name": "running"},
+                "SubnetId": subnet_id,
+                "VpcId": f"vpc-{prefix}",
+                "Architecture": "x86_64",
+                "BlockDeviceMappings": [
+                    {
+                        "DeviceName": "/dev/xvda",
+                        "Ebs": {
+                            "AttachTime": LAUNCH_TIME,
+                            "DeleteOnTermination": True,
+                            "Status": "attached",
+                            "VolumeId": f"vol-{prefix}{suffix}",
+                        },
+                    },
+                ],
+                "EbsOptimized": False,
+                "IamInstanceProfile": {
+                    "Arn": f"arn:aws:iam::{account_id}:instance-profile/profile-{n % 10}",
+                    "Id": f"AIPA{n % 10:017d}",
+                },
+                "NetworkInterfaces": [
+                    {
+                        "Description": "",
+                        "Groups": [group],
+                        "MacAddress": "02:00:00:00:00:00",
+                        "NetworkInterfaceId": f"eni-{prefix}{suffix}",
+                        "PrivateDnsName": f"ip-10-0-{n % 256}-{n // 256 % 256}.ec2.internal",
+                        "PrivateIpAddress": f"10.0.{n % 256}.{n // 256 % 256}",
+                        "Status": "in-use",
+                        "SubnetId": subnet_id,
+                    },
+                ],
+                "SecurityGroups": [group],
+                "BootMode": "uefi",
+                "HibernationOptions": {"Configured": False},
+            },
+        )
+    return reservations
+
+
+def iam_users(
+    account_id: str,
+    count: int,
+    generation: int,
+    churn: float,
+) -> List[Dict[str, Any]]:
+    """
+    Returns `count` users shaped like the `Users` of the iam:ListUsers response.
+    """
+    users = []
+    for n in range(count):
+        name = f"user-{_resource_number(n, count, generation, churn)}"
+        users.append(
+            {
+                "Path": "/",
+                "UserName": name,
+                "UserId": f"AIDA{account_id[-4:]}{n:013d}",
+                "Arn": f"arn:aws:iam::{account_id}:user/{name}",
+                "CreateDate": LAUNCH_TIME,
+                "PasswordLastUsed": LAUNCH_TIME,
+            },
+        )
+    return users
+
+
+def iam_roles(
+    account_id: str,
+    count: int,
+    generation: int,
+    churn: float,
+) -> List[Dict[str, Any]]:
+    """
+    Returns `count` roles shaped like the `Roles` of the iam:ListRoles response, trusting a mix of AWS services, other
+    roles of the account and other accounts.
+    """
+    roles = []
+    for n in range(count):
+        name = f"role-{_resource_number(n, count, generation, churn)}"
+        principal: Dict[str, Any]
+        if n % 3 == 0:
+            principal = {"Service": "ec2.amazonaws.com"}
+        elif n % 3 == 1:
+            principal = {"AWS": f"arn:aws:iam::{account_id}:role/role-00{n // 2:010x}"}
+        else:
+            principal = {"AWS": f"arn:aws:iam::{999000000000 + n % 100:012d}:root"}
+        roles.append(
+            {
+                "Path": "/",
+                "RoleName": name,
+                "RoleId": f"AROA{account_id[-4:]}{n:013d}",
+                "Arn": f"arn:aws:iam::{account_id}:role/{name}",
+                "CreateDate": LAUNCH_TIME,
+                "AssumeRolePolicyDocument": {
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Principal": principal,
+                            "Action": "sts:AssumeRole",
+                        },
+                    ],
+                },
+            },
+        )
+    return roles
+
+
+def inline_policies(principals: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns one inline policy per principal, shaped like the output of iam.get_role_policy_data().
+    """
+    return {
+        principal["Arn"]: {
+            "inline": [
+                {
+                    "Effect": "Allow",
+                    "Action": ["s3:GetObject", "s3:ListBucket"],
+                    "Resource": ["arn:aws:s3:::bucket", "arn:aws:s3:::bucket/*"],
+                },
+            ],
+        }
+        for principal in principals
+    }
+
+
+class PayloadTimer:
+    """
+    Accumulates the time spent generating payloads, so that it can be subtracted from the sync time.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+    def timed(self, func: Callable) -> Callable:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.monotonic() - start
+
+        return wrapper
+
+
+def sync_ec2(
+    session: neo4j.Session,
+    args: argparse.Namespace,
+    generation: int,
+    update_tag: int,
+    payloads: PayloadTimer,
+) -> int:
+    accounts = account_ids(args.accounts)
+    regions = REGIONS[: args.regions]
+    for a, account_id in enumerate(accounts):
+        per_account = _split(args.ec2_instances, len(accounts), a)
+
+        def get_ec2_instances(boto3_session: Any, region: str) -> List[Dict[str, Any]]:
+            r = regions.index(region)
+            return ec2_reservations(
+                account_id,
+                region,
+                _split(per_account, len(regions), r),
+                generation,
+                args.churn,
+            )
+
+        with mock.patch.object(
+            instances,
+            "get_ec2_instances",
+            side_effect=payloads.timed(get_ec2_instances),
+        ):
+            instances.sync_ec2_instances(
+                session,
+                mock.MagicMock(),
+                regions,
+                account_id,
+                update_tag,
+                {"UPDATE_TAG": update_tag, "AWS_ID": account_id},
+            )
+    return args.ec2_instances
+
+
+def sync_iam(
+    session: neo4j.Session,
+    args: argparse.Namespace,
+    generation: int,
+    update_tag: int,
+    payloads: PayloadTimer,
+) -> int:
+    accounts = account_ids(args.accounts)
+    for a, account_id in enumerate(accounts):
+        users = payloads.timed(iam_users)(
+            account_id,
+            _split(args.iam_users, len(accounts), a),
+            generation,
+            args.churn,
+        )
+        roles = payloads.timed(iam_roles)(
+            account_id,
+            _split(args.iam_roles, len(accounts), a),
+            generation,
+            args.churn,
+        )
+        common_job_parameters = {"UPDATE_TAG": update_tag, "AWS_ID": account_id}
+        with mock.patch.multiple(
+            iam,
+            get_user_list_data=mock.MagicMock(return_value={"Users": users}),
+            get_user_policy_data=mock.MagicMock(
+                side_effect=payloads.timed(lambda _, users: inline_policies(users)),
+            ),
+            get_user_managed_policy_data=mock.MagicMock(return_value={}),
+            get_role_list_data=mock.MagicMock(return_value={"Roles": roles}),
+            get_role_policy_data=mock.MagicMock(
+                side_effect=payloads.timed(lambda _, roles: inline_policies(roles)),
+            ),
+            get_role_managed_policy_data=mock.MagicMock(return_value={}),
+        ):
+            iam.sync_users(
+                session,
+                mock.MagicMock(),
+                account_id,
+                update_tag,
+                common_job_parameters,
+            )
+            iam.sync_roles(
+                session,
+                mock.MagicMock(),
+                account_id,
+                update_tag,
+                common_job_parameters,
+            )
+    return args.iam_users + args.iam_roles
+
+
+def sync_schemas(
+    session: neo4j.Session,
+    args: argparse.Namespace,
+    generation: int,
+    update_tag: int,
+    payloads: PayloadTimer,
+) -> int:
+    requested = dict(_parse_schema_arg(s) for s in args.schema or [])
+    items = 0
+    for name, schema in iter_schemas():
+        count = next((c for s, c in requested.items() if name.endswith(f".{s}")), None)
+        if count is None or not isinstance(schema, CartographyNodeSchema):
+            continue
+        if generation == 0:
+            seed_matched_nodes(session, schema, min(count, 10000))
+        kwargs = parameters_for([build_ingestion_query(schema)])
+        kwargs["lastupdated"] = update_tag
+        rows = payloads.timed(synthetic_rows)(schema, count)
+        if generation:
+            id_field = schema.properties.id.name
+            for row in rows[: int(count * args.churn)]:
+                row[id_field] = f"{row[id_field]}-{generation}"
+        load(session, schema, rows, **kwargs)
+        cleanup_parameters = parameters_for(build_cleanup_queries(schema))
+        cleanup_parameters["UPDATE_TAG"] = update_tag
+        GraphJob.from_node_schema(schema, cleanup_parameters).run(session)
+        items += count
+    return items
+
+
+def _parse_schema_arg(value: str) -> Tuple[str, int]:
+    name, _, count = value.partition("=")
+    return name, int(count or 10000)
+
+
+MODULES: Dict[str, Callable[..., int]] = {
+    "ec2": sync_ec2,
+    "iam": sync_iam,
+    "schema": sync_schemas,
+}
+
+
+def run_module(
+    session: neo4j.Session,
+    module: str,
+    args: argparse.Namespace,
+    generation: int,
+) -> Dict[str, Any]:
+    update_tag = generation + 1
+    organizations.load_aws_accounts(
+        session,
+        {account_id: account_id for account_id in account_ids(args.accounts)},
+        update_tag,
+        {"UPDATE_TAG": update_tag},
+    )
+    profiler = SyncProfiler()
+    payloads = PayloadTimer()
+    set_profiler(profiler)
+    start = time.monotonic()
+    try:
+        items = MODULES[module](session, args, generation, update_tag, payloads)
+    finally:
+        set_profiler(None)
+    seconds = time.monotonic() - start - payloads.seconds
+    return {
+        "module": module,
+        "pass": generation + 1,
+        "items": items,
+        "seconds": seconds,
+        "items_per_second": items / seconds if seconds > 0 else None,
+        "functions": profiler.report()["functions"][:TOP_FUNCTIONS],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--neo4j-uri", default=settings.get("NEO4J_URL"))
+    parser.add_argument("--modules", nargs="+", choices=MODULES, default=["ec2", "iam"])
+    parser.add_argument("--accounts", type=int, default=5)
+    parser.add_argument(
+        "--regions", type=int, default=2, choices=range(1, len(REGIONS) + 1)
+    )
+    parser.add_argument("--ec2-instances", type=int, default=10000)
+    parser.add_argument("--iam-users", type=int, default=1000)
+    parser.add_argument("--iam-roles", type=int, default=1000)
+    parser.add_argument(
+        "--schema",
+        action="append",
+        help="<class name>=<count>, e.g. EC2SubnetSchema=100000. Used by the `schema` module. Can be repeated.",
+    )
+    parser.add_argument("--passes", type=int, default=2)
+    parser.add_argument("--churn", type=float, default=0.05)
+    parser.add_argument("--allow-wipe", action="store_true")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+    if not args.allow_wipe:
+        parser.error("The load test empties the database first; pass --allow-wipe.")
+
+    results: List[Dict[str, Any]] = []
+    driver = neo4j.GraphDatabase.driver(args.neo4j_uri)
+    with driver.session() as session:
+        wipe(session)
+        for module in args.modules:
+            for generation in range(args.passes):
+                result = run_module(session, module, args, generation)
+                results.append(result)
+                slowest = ", ".join(
+                    f"{f['name'].rsplit('.', 1)[-1]} {f['wall_time_seconds']:.1f}s"
+                    for f in result["functions"]
+                )
+                print(
+                    f"{module:<8} pass {result['pass']} {result['items']:>10} items "
+                    f"{result['seconds']:>9.1f}s {result['items_per_second'] or 0:>10.0f} items/s  {slowest}",
+                )
+    driver.close()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
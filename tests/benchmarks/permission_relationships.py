@@ -0,0 +1,124 @@
+"""
+Benchmarks cartography.intel.aws.permission_relationships.calculate_permission_relationships() against the original
+per-resource, per-principal evaluation on synthetic principals and S3 buckets, and checks that both return the same
+mappings.
+
+Usage:
+    python -m tests.benchmarks.permission_relationships --principals 500 --resources 2000
+"""
+
+import argparse
+import random
+import time
+from typing import Dict
+from typing import List
+
+from cartography.intel.aws import permission_relationships
+from cartography.intel.aws.permission_relationships import compile_statement
+from cartography.intel.aws.permission_relationships import principal_allowed_on_resource
+
+PERMISSIONS = ["S3:GetObject"]
+ACTIONS = ["s3:GetObject", "s3:Get*", "s3:*", "ec2:Describe*", "iam:PassRole", "*"]
+
+
+def calculate_permission_relationships_naive(
+    principals: Dict,
+    resource_arns: List[str],
+    permissions: List[str],
+) -> List[Dict]:
+    allowed_mappings: List[Dict] = []
+    for resource_arn in resource_arns:
+        for principal_arn, policies in principals.items():
+            if principal_allowed_on_resource(policies, resource_arn, permissions):
+                allowed_mappings.append(
+                    {"principal_arn": principal_arn, "resource_arn": resource_arn},
+                )
+    return allowed_mappings
+
+
+def generate_resource_arns(count: int) -> List[str]:
+    return [f"arn:aws:s3:::team{i % 50}-bucket-{i}" for i in range(count)]
+
+
+def generate_principals(count: int, rng: random.Random) -> Dict:
+    # A handful of managed policies shared by many principals, plus one inline policy per principal.
+    managed_policies = {
+        "arn:aws:iam::aws:policy/ReadOnlyAccess": [
+            {"effect": "Allow", "action": ["s3:Get*", "s3:List*"], "resource": ["*"]},
+        ],
+        "arn:aws:iam::aws:policy/AmazonEC2ReadOnlyAccess": [
+            {"effect": "Allow", "action": ["ec2:Describe*"], "resource": ["*"]},
+        ],
+        "arn:aws:iam::000000000000:policy/DenySecrets": [
+            {
+                "effect": "Deny",
+                "action": ["s3:*"],
+                "resource": ["arn:aws:s3:::team1-*", "arn:aws:s3:::team2?-*"],
+            },
+        ],
+    }
+    principals: Dict = {}
+    for i in range(count):
+        policies = {
+            policy_id: compile_statement([dict(s) for s in statements])
+            for policy_id, statements in managed_policies.items()
+            if rng.random() < 0.3
+        }
+        team = rng.randrange(50)
+        policies[f"inline-{i}"] = compile_statement(
+            [
+                {
+                    "effect": rng.choice(["Allow", "Allow", "Deny"]),
+                    "action": [rng.choice(ACTIONS)],
+                    "resource": [f"arn:aws:s3:::team{team}-*"],
+                },
+                {
+                    "effect": "Allow",
+                    "notaction": ["iam:*"],
+                    "resource": [
+                        f"arn:aws:s3:::team{team}-bucket-{rng.randrange(100)}"
+                    ],
+                },
+            ],
+        )
+        principals[f"arn:aws:iam::000000000000:role/role-{i}"] = policies
+    return principals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--principals", type=int, default=300)
+    parser.add_argument("--resources", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    principals = generate_principals(args.principals, rng)
+    resource_arns = generate_resource_arns(args.resources)
+
+    start = time.perf_counter()
+    expected = calculate_permission_relationships_naive(
+        principals,
+        resource_arns,
+        PERMISSIONS,
+    )
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = permission_relationships.calculate_permission_relationships(
+        principals,
+        resource_arns,
+        PERMISSIONS,
+    )
+    indexed_seconds = time.perf_counter() - start
+
+    assert actual == expected, "Indexed evaluation returned different mappings."
+    print(
+        f"{args.principals} principals x {args.resources} resources, {len(actual)} mappings\n"
+        f"  naive:   {naive_seconds:.2f}s\n"
+        f"  indexed: {indexed_seconds:.2f}s ({naive_seconds / max(indexed_seconds, 1e-9):.0f}x)",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Profiles the Cypher generated for every CartographyNodeSchema and MatchLink CartographyRelSchema in cartography.models
+against a local Neo4j, and reports the queries whose plans scan a whole label, scan all nodes or build a cartesian
+product, together with the db hits of each query so that regressions show up in review.
+
+For each node schema, the database is emptied, the schema's indexes are created, the nodes that its relationships
+point to are seeded, and then the ingestion query from build_ingestion_query() and the cleanup queries from
+build_cleanup_queries() are run with PROFILE on synthetic rows. MatchLink relationship schemas are profiled the same
+way with build_matchlink_query() and build_cleanup_query_for_matchlink(). With --explain the queries are only planned
+with EXPLAIN: nothing is written and no db hits are recorded.
+
+PROFILE runs the queries and empties the database between schemas, so it refuses to run without --allow-wipe. Only
+point it at a disposable Neo4j, e.g. the one used by the integration tests.
+
+Usage:
+    python -m tests.benchmarks.query_plans --allow-wipe --rows 1000 --output plans.json
+    python -m tests.benchmarks.query_plans --allow-wipe --baseline plans.json
+    python -m tests.benchmarks.query_plans --explain --schema AWSUserSchema
+"""
+
+import argparse
+import inspect
+import json
+import sys
+from dataclasses import fields
+from pkgutil import iter_modules
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+import neo4j
+
+import cartography.models
+from cartography.client.core.tx import load_graph_data
+from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.cleanupbuilder import build_cleanup_query_for_matchlink
+from cartography.graph.job import get_parameters
+from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import build_create_index_queries_for_matchlink
+from cartography.graph.querybuilder import build_ingestion_query
+from cartography.graph.querybuilder import build_matchlink_query
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import SourceNodeMatcher
+from cartography.models.core.relationships import TargetNodeMatcher
+from tests.integration import settings
+
+# Plan operators that touch every node of a label, or of the graph, or that multiply two independent row streams.
+FLAGGED_OPERATORS = {
+    "AllNodesScan": "all nodes scan",
+    "NodeByLabelScan": "label scan",
+    "CartesianProduct": "cartesian product",
+}
+# Update tags of the synthetic data and of the simulated next sync, which makes all synthetic data stale.
+UPDATE_TAG = 1
+NEXT_UPDATE_TAG = 2
+# Parameters that carry an update tag rather than a value taken from the data.
+UPDATE_TAG_PARAMETERS = {"lastupdated", "UPDATE_TAG"}
+LIMIT_SIZE = 100
+
+
+def iter_schemas() -> Iterator[Tuple[str, Any]]:
+    """
+    Yields `(qualified class name, instance)` for every node schema and every MatchLink rel schema defined in
+    cartography.models, once each.
+    """
+    seen: Set[type] = set()
+
+    def walk(module: Any) -> Iterator[Tuple[str, Any]]:
+        for sub_module_info in iter_modules(module.__path__):
+            sub_module = __import__(
+                f"{module.__name__}.{sub_module_info.name}",
+                fromlist=[""],
+            )
+            for v in sub_module.__dict__.values():
+                if not inspect.isclass(v) or v in seen or inspect.isabstract(v):
+                    continue
+                if not issubclass(v, (CartographyNodeSchema, CartographyRelSchema)):
+                    continue
+                seen.add(v)
+                try:
+                    schema = v()
+                except TypeError:
+                    # Not a concrete schema, e.g. a base class shared by several schemas.
+                    continue
+                if isinstance(schema, CartographyRelSchema) and (
+                    not schema.source_node_matcher
+                ):
+                    # Relationships defined on a node schema are profiled as part of that node schema.
+                    continue
+                yield f"{v.__module__}.{v.__name__}", schema
+            if hasattr(sub_module, "__path__"):
+                yield from walk(sub_module)
+
+    yield from walk(cartography.models)
+
+
+def _refs(obj: Any) -> Dict[str, PropertyRef]:
+    return {
+        f.name: getattr(obj, f.name)
+        for f in fields(obj)
+        if isinstance(getattr(obj, f.name, None), PropertyRef)
+    }
+
+
+def _data_value(ref: PropertyRef, i: int) -> Any:
+    if ref.one_to_many:
+        return [f"{ref.name}-{i}"]
+    return f"{ref.name}-{i}"
+
+
+def _matched_value(ref: PropertyRef, i: int) -> Any:
+    """
+    The value that a node matched with `ref` must have to be linked to the i-th synthetic row.
+    """
+    if ref.set_in_kwargs:
+        return parameter_value(ref.name)
+    return f"{ref.name}-{i}"
+
+
+def parameter_value(name: str) -> Any:
+    """
+    The synthetic value of the query parameter `$name`, other than `$DictList`.
+    """
+    if name in UPDATE_TAG_PARAMETERS:
+        return UPDATE_TAG
+    if name == "LIMIT_SIZE":
+        return LIMIT_SIZE
+    return f"bench-{name}"
+
+
+def parameters_for(queries: List[str]) -> Dict[str, Any]:
+    return {
+        name: parameter_value(name)
+        for name in get_parameters(queries)
+        if name != "DictList"
+    }
+
+
+def _rels(schema: Any) -> List[CartographyRelSchema]:
+    if isinstance(schema, CartographyRelSchema):
+        return [schema]
+    rels = (
+        [schema.sub_resource_relationship] if schema.sub_resource_relationship else []
+    )
+    if schema.other_relationships:
+        rels.extend(schema.other_relationships.rels)
+    return rels
+
+
+def synthetic_rows(schema: Any, rows: int) -> List[Dict[str, Any]]:
+    """
+    Returns `rows` dicts carrying every data field read by the schema's ingestion or matchlink query.
+    """
+    refs: List[PropertyRef] = []
+    if isinstance(schema, CartographyNodeSchema):
+        refs.extend(_refs(schema.properties).values())
+    else:
+        refs.extend(_refs(schema.source_node_matcher).values())
+    for rel in _rels(schema):
+        refs.extend(_refs(rel.properties).values())
+        refs.extend(_refs(rel.target_node_matcher).values())
+    data_refs = {ref.name: ref for ref in refs if not ref.set_in_kwargs}
+    return [
+        {name: _data_value(ref, i) for name, ref in data_refs.items()}
+        for i in range(rows)
+    ]
+
+
+def seed_matched_nodes(
+    session: neo4j.Session,
+    schema: Any,
+    rows: int,
+) -> None:
+    """
+    Creates the nodes that the schema's relationships (and, for a MatchLink, its source) match on, so that the
+    profiled queries find them like they would in a real graph.
+    """
+    matchers: List[Tuple[str, Union[TargetNodeMatcher, SourceNodeMatcher]]] = [
+        (rel.target_node_label, rel.target_node_matcher) for rel in _rels(schema)
+    ]
+    if isinstance(schema, CartographyRelSchema):
+        assert schema.source_node_label and schema.source_node_matcher
+        matchers.append((schema.source_node_label, schema.source_node_matcher))
+    for label, matcher in matchers:
+        refs = _refs(matcher)
+        nodes = [
+            {key: _matched_value(ref, i) for key, ref in refs.items()}
+            for i in range(1 if all(r.set_in_kwargs for r in refs.values()) else rows)
+        ]
+        load_graph_data(
+            session,
+            f"UNWIND $DictList AS item CREATE (n:{label}) SET n = item",
+            nodes,
+        )
+
+
+def wipe(session: neo4j.Session) -> None:
+    session.run(
+        "MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS",
+    ).consume()
+
+
+def plan_operators(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("children", []):
+        yield from plan_operators(child)
+
+
+def analyze(summary: neo4j.ResultSummary, explain: bool) -> Dict[str, Any]:
+    """
+    Returns the operators, the flagged operators and, for PROFILE, the total db hits of the query's plan.
+    """
+    plan = summary.plan if explain else summary.profile
+    operators = list(plan_operators(plan or {}))
+    names = sorted({op.get("operatorType", "").split("@")[0] for op in operators})
+    return {
+        "operators": names,
+        "flags": sorted(FLAGGED_OPERATORS[n] for n in names if n in FLAGGED_OPERATORS),
+        "db_hits": None if explain else sum(op.get("dbHits", 0) for op in operators),
+    }
+
+
+def profile_query(
+    session: neo4j.Session,
+    query: str,
+    parameters: Dict[str, Any],
+    explain: bool,
+) -> Dict[str, Any]:
+    prefix = "EXPLAIN" if explain else "PROFILE"
+    summary = session.run(f"{prefix} {query}", parameters).consume()
+    return analyze(summary, explain)
+
+
+def profile_schema(
+    session: neo4j.Session,
+    name: str,
+    schema: Any,
+    rows: int,
+    explain: bool,
+) -> List[Dict[str, Any]]:
+    if isinstance(schema, CartographyNodeSchema):
+        index_queries = build_create_index_queries(schema)
+        queries = [("ingestion", build_ingestion_query(schema))]
+        cleanup_queries = build_cleanup_queries(schema)
+    else:
+        index_queries = build_create_index_queries_for_matchlink(schema)
+        queries = [("matchlink", build_matchlink_query(schema))]
+        cleanup_queries = [build_cleanup_query_for_matchlink(schema)]
+    queries.extend((f"cleanup[{i}]", query) for i, query in enumerate(cleanup_queries))
+
+    if not explain:
+        wipe(session)
+    for index_query in index_queries:
+        session.run(index_query).consume()
+    if not explain:
+        seed_matched_nodes(session, schema, rows)
+    session.run("CALL db.awaitIndexes()").consume()
+
+    data = synthetic_rows(schema, rows)
+    results = []
+    for kind, query in queries:
+        parameters = parameters_for([query])
+        if kind.startswith("cleanup"):
+            parameters["UPDATE_TAG"] = NEXT_UPDATE_TAG
+        else:
+            parameters["DictList"] = data
+        results.append(
+            {
+                "schema": name,
+                "kind": kind,
+                **profile_query(session, query, parameters, explain),
+            },
+        )
+    return results
+
+
+def find_regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Returns a description of each query that has a flag or more db hits (beyond `tolerance`, e.g. 0.1 for 10%) than in
+    the baseline. Queries missing from the baseline are compared against an empty baseline.
+    """
+    previous = {(r["schema"], r["kind"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["schema"], result["kind"]), {})
+        new_flags = set(result["flags"]) - set(before.get("flags", []))
+        if new_flags:
+            regressions.append(
+                f"{result['schema']} {result['kind']}: new {', '.join(sorted(new_flags))}",
+            )
+        hits, hits_before = result["db_hits"], before.get("db_hits")
+        if hits is not None and hits_before is not None:
+            if hits > hits_before * (1 + tolerance):
+                regressions.append(
+                    f"{result['schema']} {result['kind']}: {hits_before} -> {hits} db hits",
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--neo4j-uri", default=settings.get("NEO4J_URL"))
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument(
+        "--schema",
+        action="append",
+        help="Only profile the schemas whose class name ends with this value. Can be repeated.",
+    )
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--allow-wipe", action="store_true")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--baseline",
+        help="Exit with status 1 if a query has new flags or more db hits than in this JSON file.",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    if not args.explain and not args.allow_wipe:
+        parser.error(
+            "PROFILE empties the database between schemas; pass --allow-wipe or --explain."
+        )
+
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    driver = neo4j.GraphDatabase.driver(args.neo4j_uri)
+    with driver.session() as session:
+        for name, schema in iter_schemas():
+            if args.schema and not any(name.endswith(s) for s in args.schema):
+                continue
+            try:
+                results.extend(
+                    profile_schema(session, name, schema, args.rows, args.explain),
+                )
+            except (ValueError, neo4j.exceptions.Neo4jError) as e:
+                errors.append(f"{name}: {e}")
+        if not args.explain:
+            wipe(session)
+    driver.close()
+
+    for result in results:
+        if result["flags"]:
+            print(f"{result['schema']} {result['kind']}: {', '.join(result['flags'])}")
+    print(
+        f"{len(results)} queries profiled, {sum(1 for r in results if r['flags'])} flagged, "
+        f"{sum(r['db_hits'] or 0 for r in results)} db hits, {len(errors)} schemas failed",
+    )
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    regressions: Optional[List[str]] = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+    return 1 if errors or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -111,6 +111,86 @@ def test_sync_multiple_accounts(
     assert mock_cleanup.call_count == 1
 
 
+@mock.patch.object(cartography.intel.aws.organizations, "sync", return_value=None)
+@mock.patch("cartography.intel.aws.boto3.Session")
+@mock.patch.object(cartography.intel.aws, "_sync_one_account", return_value=None)
+@mock.patch.object(cartography.intel.aws, "_autodiscover_accounts", return_value=None)
+@mock.patch.object(cartography.intel.aws, "run_cleanup_job", return_value=None)
+def test_sync_multiple_accounts_concurrently(
+    mock_cleanup,
+    mock_autodiscover,
+    mock_sync_one,
+    mock_boto3_session,
+    mock_sync_orgs,
+):
+    neo4j_session = mock.MagicMock()
+    neo4j_driver = mock.MagicMock()
+    common_job_parameters = {"UPDATE_TAG": TEST_UPDATE_TAG}
+
+    cartography.intel.aws._sync_multiple_accounts(
+        neo4j_session,
+        TEST_ACCOUNTS,
+        TEST_UPDATE_TAG,
+        common_job_parameters,
+        False,
+        neo4j_driver=neo4j_driver,
+        max_concurrent_accounts=2,
+    )
+
+    # Each account is synced once, on its own session, with its own AWS_ID.
+    assert mock_sync_one.call_count == len(TEST_ACCOUNTS)
+    synced_account_ids = sorted(call.args[2] for call in mock_sync_one.call_args_list)
+    assert synced_account_ids == sorted(TEST_ACCOUNTS.values())
+    for call in mock_sync_one.call_args_list:
+        assert call.args[0] is not neo4j_session
+        assert call.args[4] == {"UPDATE_TAG": TEST_UPDATE_TAG, "AWS_ID": call.args[2]}
+    assert neo4j_driver.session.call_count == len(TEST_ACCOUNTS)
+
+    # Autodiscovery and the cross-account cleanup run on the caller's session.
+    assert mock_autodiscover.call_count == len(TEST_ACCOUNTS)
+    mock_cleanup.assert_called_once_with(
+        "aws_post_ingestion_principals_cleanup.json",
+        neo4j_session,
+        {"UPDATE_TAG": TEST_UPDATE_TAG},
+    )
+
+
+@mock.patch.object(cartography.intel.aws.organizations, "sync", return_value=None)
+@mock.patch("cartography.intel.aws.boto3.Session")
+@mock.patch.object(cartography.intel.aws, "_sync_one_account")
+@mock.patch.object(cartography.intel.aws, "_autodiscover_accounts", return_value=None)
+@mock.patch.object(cartography.intel.aws, "run_cleanup_job", return_value=None)
+def test_sync_multiple_accounts_concurrently_best_effort(
+    mock_cleanup,
+    mock_autodiscover,
+    mock_sync_one,
+    mock_boto3_session,
+    mock_sync_orgs,
+):
+    def fail_for_one_account(neo4j_session, boto3_session, account_id, *args, **kwargs):
+        if account_id == "000000000001":
+            raise KeyError("foo")
+
+    mock_sync_one.side_effect = fail_for_one_account
+
+    with raises(Exception) as e:
+        cartography.intel.aws._sync_multiple_accounts(
+            mock.MagicMock(),
+            TEST_ACCOUNTS,
+            TEST_UPDATE_TAG,
+            {"UPDATE_TAG": TEST_UPDATE_TAG},
+            True,
+            neo4j_driver=mock.MagicMock(),
+            max_concurrent_accounts=3,
+        )
+
+    # The failing account does not prevent the others from being synced.
+    assert mock_sync_one.call_count == len(TEST_ACCOUNTS)
+    assert str(e.value).count("Exception for account ID") == 1
+    assert "000000000001" in str(e.value)
+    assert mock_cleanup.call_count == 0
+
+
 @mock.patch("cartography.intel.aws.boto3.Session")
 @mock.patch("cartography.intel.aws.organizations")
 @mock.patch.object(cartography.intel.aws, "_sync_multiple_accounts", return_value=True)
@@ -142,6 +222,10 @@ def test_start_aws_ingestion(
             "permission_relationships_file": test_config.permission_relationships_file,
             "aws_guardduty_severity_threshold": None,
             "aws_cloudtrail_management_events_lookback_hours": test_config.aws_cloudtrail_management_events_lookback_hours,
+            "aws_max_concurrent_regions": test_config.aws_max_concurrent_regions,
+            "aws_s3_max_concurrent_buckets": test_config.aws_s3_max_concurrent_buckets,
+            "permission_relationships_workers": test_config.permission_relationships_workers,
+            "incremental_analysis": test_config.incremental_analysis,
         },
     )
 
@@ -17,9 +17,9 @@ TEST_REGION = "us-east-1"
 
 @patch.object(
     cartography.intel.trivy,
-    "get_json_files_in_s3",
+    "get_json_file_etags_in_s3",
     return_value={
-        "trivy-scans/000000000000.dkr.ecr.us-east-1/test-repository:1234567890.json"
+        "trivy-scans/000000000000.dkr.ecr.us-east-1/test-repository:1234567890.json": '"etag-1"',
     },
 )
 @patch.object(
@@ -0,0 +1,254 @@
+import threading
+from unittest import mock
+
+import neo4j
+import pytest
+
+from cartography.client.core import tx
+from cartography.client.core.tx import AdaptiveBatchSize
+from cartography.client.core.tx import ensure_indexes
+from cartography.client.core.tx import load
+from cartography.client.core.tx import load_graph_data
+from cartography.client.core.tx import LoadPipeline
+from cartography.graph.querybuilder import build_create_index_queries
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetSchema,
+)
+
+
+class FakePool:
+    pass
+
+
+def _make_session(pool, database=None):
+    session = mock.MagicMock()
+    session._pool = pool
+    session._config.database = database
+    return session
+
+
+def test_ensure_indexes_runs_each_query_once_per_driver():
+    pool = FakePool()
+    expected_queries = build_create_index_queries(InterestingAssetSchema())
+    first_session = _make_session(pool)
+    second_session = _make_session(pool)
+
+    ensure_indexes(first_session, InterestingAssetSchema())
+    ensure_indexes(second_session, InterestingAssetSchema())
+
+    assert [c.args[0] for c in first_session.run.call_args_list] == expected_queries
+    second_session.run.assert_not_called()
+
+
+def test_ensure_indexes_tracks_drivers_and_databases_separately():
+    pool = FakePool()
+    sessions = [
+        _make_session(pool, "neo4j"),
+        _make_session(pool, "other"),
+        _make_session(FakePool(), "neo4j"),
+    ]
+
+    for session in sessions:
+        ensure_indexes(session, InterestingAssetSchema())
+
+    for session in sessions:
+        assert session.run.call_count == len(
+            build_create_index_queries(InterestingAssetSchema()),
+        )
+
+
+def test_ensure_indexes_failed_query_is_retried():
+    pool = FakePool()
+    failing_session = _make_session(pool)
+    failing_session.run.side_effect = RuntimeError("connection lost")
+    retry_session = _make_session(pool)
+
+    with pytest.raises(RuntimeError):
+        ensure_indexes(failing_session, InterestingAssetSchema())
+    ensure_indexes(retry_session, InterestingAssetSchema())
+
+    assert retry_session.run.call_count == len(
+        build_create_index_queries(InterestingAssetSchema()),
+    )
+
+
+def _make_write_session(side_effect=None):
+    """
+    Returns a mock session whose write_transaction() calls the given tx function with a mock transaction, and records
+    the size of each batch that was written.
+    """
+    session = mock.MagicMock()
+    session.written_batches = []
+
+    def write_transaction(tx_func):
+        if side_effect:
+            side_effect(session)
+        fake_tx = mock.MagicMock()
+        tx_func(fake_tx)
+        session.written_batches.append(len(fake_tx.run.call_args.args[1]["DictList"]))
+
+    session.write_transaction.side_effect = write_transaction
+    return session
+
+
+def test_adaptive_batch_size_shrinks_and_grows_within_bounds():
+    size = AdaptiveBatchSize(initial=1000, maximum=2000)
+
+    size.record(1000, tx.TARGET_LOAD_BATCH_SECONDS + 1, retried=False)
+    assert size.size == 500
+    size.record(500, 0.1, retried=True)
+    assert size.size == 250
+
+    size.record(250, 0.1, retried=False)
+    assert size.size == 500
+    for _ in range(5):
+        size.record(size.size, 0.1, retried=False)
+    assert size.size == 2000
+
+    while size.shrink():
+        pass
+    assert size.size == tx.MIN_LOAD_BATCH_SIZE
+
+
+@mock.patch.object(tx, "_batch_sizes", {})
+def test_load_graph_data_uses_batch_size():
+    session = _make_write_session()
+
+    load_graph_data(
+        session,
+        "UNWIND $DictList AS item RETURN item",
+        [{"id": i} for i in range(250)],
+        batch_size=100,
+    )
+
+    assert session.written_batches == [100, 100, 50]
+
+
+@mock.patch.object(tx, "_batch_sizes", {})
+def test_load_graph_data_shrinks_batches_on_transient_error():
+    def fail_first_call(session):
+        if not session.failed:
+            session.failed = True
+            raise neo4j.exceptions.TransientError("lock timeout")
+
+    session = _make_write_session(side_effect=fail_first_call)
+    session.failed = False
+
+    load_graph_data(
+        session,
+        "UNWIND $DictList AS item RETURN item",
+        [{"id": i} for i in range(400)],
+        batch_size=400,
+    )
+
+    # The failed batch of 400 is retried as batches of 200, and no rows are lost.
+    assert session.written_batches[0] == 200
+    assert sum(session.written_batches) == 400
+
+
+@mock.patch.object(tx, "_batch_sizes", {})
+def test_load_graph_data_reraises_transient_error_at_min_batch_size():
+    def always_fail(session):
+        raise neo4j.exceptions.TransientError("lock timeout")
+
+    session = _make_write_session(side_effect=always_fail)
+
+    with pytest.raises(neo4j.exceptions.TransientError):
+        load_graph_data(
+            session,
+            "UNWIND $DictList AS item RETURN item",
+            [{"id": i} for i in range(400)],
+            batch_size=400,
+        )
+
+    # 400 -> 200 -> 100, then give up.
+    assert session.write_transaction.call_count == 3
+
+
+def test_load_pipeline_runs_loads_in_order_on_writer_thread():
+    session = mock.MagicMock()
+    calls = []
+
+    def fake_load(neo4j_session, data, region):
+        calls.append((neo4j_session, data, region, threading.current_thread().name))
+
+    with LoadPipeline(session, max_queued_batches=1) as pipeline:
+        for i in range(5):
+            pipeline.submit(fake_load, [i], region=f"region-{i}")
+
+    assert [(c[1], c[2]) for c in calls] == [([i], f"region-{i}") for i in range(5)]
+    assert all(c[0] is session for c in calls)
+    assert all(c[3] == "cartography-load-pipeline" for c in calls)
+
+
+def test_load_pipeline_blocks_when_queue_is_full():
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_load(neo4j_session, data):
+        started.set()
+        release.wait(timeout=10)
+
+    with LoadPipeline(mock.MagicMock(), max_queued_batches=1) as pipeline:
+        pipeline.submit(slow_load, 1)
+        started.wait(timeout=10)
+        # The writer is busy with the first load, so the queue holds one more and the third submit blocks.
+        pipeline.submit(slow_load, 2)
+        producer = threading.Thread(target=pipeline.submit, args=(slow_load, 3))
+        producer.start()
+        producer.join(timeout=0.2)
+        assert producer.is_alive()
+        release.set()
+        producer.join(timeout=10)
+        assert not producer.is_alive()
+
+
+def test_load_pipeline_raises_load_errors():
+    loaded = []
+
+    def failing_load(neo4j_session, data):
+        if data == 1:
+            raise ValueError("bad batch")
+        loaded.append(data)
+
+    with pytest.raises(ValueError, match="bad batch"):
+        with LoadPipeline(mock.MagicMock()) as pipeline:
+            for i in range(3):
+                pipeline.submit(failing_load, i)
+
+    # Loads submitted after the failure are discarded.
+    assert loaded == [0]
+
+
+@mock.patch.object(tx, "_batch_sizes", {})
+@mock.patch.object(tx, "ensure_indexes")
+def test_load_streams_generator_lazily(mock_ensure_indexes):
+    session = _make_write_session()
+    produced = []
+
+    def rows():
+        for i in range(250):
+            # Each batch is written before the rows of the next one are produced.
+            if len(session.written_batches) < i // 100:
+                raise AssertionError(
+                    f"Row {i} was produced before batch {i // 100} was written"
+                )
+            produced.append(i)
+            yield {"id": i, "name": f"asset-{i}"}
+
+    with mock.patch.object(InterestingAssetSchema, "batch_size", 100):
+        load(session, InterestingAssetSchema(), rows(), lastupdated=1)
+
+    assert session.written_batches == [100, 100, 50]
+    assert len(produced) == 250
+    mock_ensure_indexes.assert_called_once()
+
+
+@mock.patch.object(tx, "ensure_indexes")
+def test_load_empty_generator_skips_indexes_and_writes(mock_ensure_indexes):
+    session = mock.MagicMock()
+
+    load(session, InterestingAssetSchema(), (row for row in []), lastupdated=1)
+
+    mock_ensure_indexes.assert_not_called()
+    session.write_transaction.assert_not_called()
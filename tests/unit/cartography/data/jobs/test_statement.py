@@ -1,3 +1,9 @@
+from unittest import mock
+
+import neo4j
+import pytest
+
+from cartography.graph import statement as statement_module
 from cartography.graph.statement import GraphStatement
 
 SAMPLE_STATEMENT_AS_DICT = {
@@ -15,3 +21,76 @@ def test_create_from_json():
     assert statement.parent_job_name == "my_job_name"
     assert statement.query == "Query goes here"
     assert statement.parent_job_sequence_num == 1
+
+
+def _make_session(updates, side_effects=None):
+    """
+    Returns a mock session whose write_transaction() returns summaries that contain updates as many times as given by
+    `updates`, and records the LIMIT_SIZE used by each call.
+    """
+    session = mock.MagicMock()
+    session.limit_sizes = []
+    summaries = iter([True] * updates + [False])
+    side_effects = iter(side_effects or [])
+
+    def write_transaction(func, parameters):
+        session.limit_sizes.append(parameters["LIMIT_SIZE"])
+        error = next(side_effects, None)
+        if error:
+            raise error
+        summary = mock.MagicMock()
+        summary.counters.contains_updates = next(summaries)
+        return summary
+
+    session.write_transaction.side_effect = write_transaction
+    return session
+
+
+def test_run_iterative_grows_limit_size_for_fast_transactions():
+    stm = GraphStatement(
+        "MATCH (n) WITH n LIMIT $LIMIT_SIZE DETACH DELETE n", {}, True, 100
+    )
+    session = _make_session(updates=4)
+
+    stm.run(session)
+
+    assert session.limit_sizes == [100, 200, 400, 800, 1600]
+    # The statement's own parameters are not changed by the iterations.
+    assert stm.parameters["LIMIT_SIZE"] == 100
+
+
+def test_run_iterative_shrinks_limit_size_on_transient_error():
+    stm = GraphStatement(
+        "MATCH (n) WITH n LIMIT $LIMIT_SIZE DETACH DELETE n", {}, True, 100
+    )
+    transient_error = neo4j.exceptions.TransientError("lock timeout")
+    session = _make_session(updates=2, side_effects=[None, None, transient_error])
+
+    stm.run(session)
+
+    assert session.limit_sizes == [100, 200, 400, 200]
+
+
+def test_run_iterative_raises_transient_error_at_iterationsize():
+    stm = GraphStatement(
+        "MATCH (n) WITH n LIMIT $LIMIT_SIZE DETACH DELETE n", {}, True, 100
+    )
+    session = _make_session(
+        updates=1,
+        side_effects=[neo4j.exceptions.TransientError("lock timeout")],
+    )
+
+    with pytest.raises(neo4j.exceptions.TransientError):
+        stm.run(session)
+
+
+@mock.patch.object(statement_module, "MAX_ITERATION_SIZE", 300)
+def test_run_iterative_caps_limit_size():
+    stm = GraphStatement(
+        "MATCH (n) WITH n LIMIT $LIMIT_SIZE DETACH DELETE n", {}, True, 100
+    )
+    session = _make_session(updates=4)
+
+    stm.run(session)
+
+    assert session.limit_sizes == [100, 200, 300, 300, 300]
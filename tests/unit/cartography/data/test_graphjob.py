@@ -1,4 +1,11 @@
+import threading
+from unittest import mock
+
+import pytest
+
 from cartography.graph.job import GraphJob
+from cartography.graph.job import set_concurrent_cleanup
+from cartography.graph.statement import GraphStatement
 from tests.data.jobs.sample import SAMPLE_CLEANUP_JOB
 
 
@@ -10,3 +17,110 @@ def test_graphjob_from_json():
     assert job.name == "cleanup stale resources"
     assert len(job.statements) == 3
     assert job.short_name is None
+
+
+def _make_job(statement_count):
+    statements = [
+        GraphStatement(
+            f"query {i}", {}, parent_job_name="test", parent_job_sequence_num=i
+        )
+        for i in range(statement_count)
+    ]
+    return GraphJob("test job", statements, "test_job")
+
+
+def test_graphjob_run_concurrently_uses_one_session_per_statement():
+    job = _make_job(3)
+    neo4j_driver = mock.MagicMock()
+    queries_by_thread = {}
+
+    def write_transaction(func):
+        tx = mock.MagicMock()
+        func(tx)
+        queries_by_thread.setdefault(threading.current_thread().name, []).append(
+            tx.run.call_args.args[0],
+        )
+
+    session = neo4j_driver.session.return_value.__enter__.return_value
+    session.write_transaction.side_effect = write_transaction
+
+    job.run_concurrently(neo4j_driver, max_concurrent_statements=3, neo4j_database="db")
+
+    assert sorted(q for queries in queries_by_thread.values() for q in queries) == [
+        "query 0",
+        "query 1",
+        "query 2",
+    ]
+    assert all(name.startswith("cartography-graph-job") for name in queries_by_thread)
+    assert neo4j_driver.session.call_count == 3
+    neo4j_driver.session.assert_called_with(database="db")
+
+
+def test_graphjob_run_concurrently_raises_statement_errors():
+    job = _make_job(2)
+    neo4j_driver = mock.MagicMock()
+    session = neo4j_driver.session.return_value.__enter__.return_value
+    session.write_transaction.side_effect = ValueError("bad statement")
+
+    with pytest.raises(ValueError, match="bad statement"):
+        job.run_concurrently(neo4j_driver, max_concurrent_statements=2)
+
+
+def test_graphjob_run_concurrently_deletes_nodes_first():
+    statements = [
+        GraphStatement(query, {}, parent_job_name="test", parent_job_sequence_num=i)
+        for i, query in enumerate(
+            [
+                "MATCH (n) DETACH DELETE n",
+                "MATCH ()-[r:A]->() DELETE r",
+                "MATCH ()-[r:B]->() DELETE r",
+            ],
+        )
+    ]
+    job = GraphJob("test job", statements, "test_job")
+    neo4j_driver = mock.MagicMock()
+    rels_started = threading.Barrier(2, timeout=5)
+    queries = []
+
+    def write_transaction(func):
+        tx = mock.MagicMock()
+        func(tx)
+        query = tx.run.call_args.args[0]
+        queries.append(query)
+        if "DETACH" not in query:
+            # Both relationship statements run at the same time.
+            rels_started.wait()
+
+    session = neo4j_driver.session.return_value.__enter__.return_value
+    session.write_transaction.side_effect = write_transaction
+
+    job.run_concurrently(neo4j_driver, max_concurrent_statements=3)
+
+    assert queries[0] == "MATCH (n) DETACH DELETE n"
+    assert sorted(queries[1:]) == [
+        "MATCH ()-[r:A]->() DELETE r",
+        "MATCH ()-[r:B]->() DELETE r",
+    ]
+
+
+def test_graphjob_run_uses_concurrent_cleanup_settings():
+    neo4j_driver = mock.MagicMock()
+    neo4j_session = mock.MagicMock()
+    independent_job = _make_job(2)
+    independent_job.independent_statements = True
+    dependent_job = _make_job(2)
+
+    set_concurrent_cleanup(neo4j_driver, 2, "db")
+    try:
+        with mock.patch.object(GraphJob, "run_concurrently") as mock_run_concurrently:
+            independent_job.run(neo4j_session)
+            dependent_job.run(neo4j_session)
+    finally:
+        set_concurrent_cleanup(None)
+
+    mock_run_concurrently.assert_called_once_with(neo4j_driver, 2, "db")
+    assert neo4j_session.write_transaction.call_count == 2
+
+    # Without the settings, independent statements run in sequence on the given session.
+    independent_job.run(neo4j_session)
+    assert neo4j_session.write_transaction.call_count == 4
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from cartography.graph import querybuilder
+from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import build_ingestion_query
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetSchema,
+)
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetToHelloAssetRel,
+)
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetToWorldAssetRel,
+)
+
+
+def test_build_ingestion_query_is_cached_per_schema_class():
+    build_ingestion_query.cache_clear()
+
+    with mock.patch.object(
+        querybuilder,
+        "_build_attach_relationships_statement",
+        wraps=querybuilder._build_attach_relationships_statement,
+    ) as mock_build_rels:
+        first = build_ingestion_query(InterestingAssetSchema())
+        second = build_ingestion_query(InterestingAssetSchema())
+
+    assert first == second
+    assert mock_build_rels.call_count == 1
+
+
+def test_build_ingestion_query_cache_respects_selected_relationships():
+    build_ingestion_query.cache_clear()
+
+    all_rels = build_ingestion_query(InterestingAssetSchema())
+    hello_only = build_ingestion_query(
+        InterestingAssetSchema(),
+        {InterestingAssetToHelloAssetRel()},
+    )
+    world_only = build_ingestion_query(
+        InterestingAssetSchema(),
+        {InterestingAssetToWorldAssetRel()},
+    )
+    no_rels = build_ingestion_query(InterestingAssetSchema(), set())
+
+    assert len({all_rels, hello_only, world_only, no_rels}) == 4
+    assert hello_only == build_ingestion_query(
+        InterestingAssetSchema(),
+        {InterestingAssetToHelloAssetRel()},
+    )
+
+
+def test_cached_query_lists_are_copies():
+    index_queries = build_create_index_queries(InterestingAssetSchema())
+    index_queries.append("garbage")
+    cleanup_queries = build_cleanup_queries(InterestingAssetSchema())
+    cleanup_queries.clear()
+
+    assert "garbage" not in build_create_index_queries(InterestingAssetSchema())
+    assert build_cleanup_queries(InterestingAssetSchema())
@@ -1,6 +1,11 @@
+import datetime
+from unittest import mock
+
 from cartography.intel.aws import iam
 from cartography.intel.aws.iam import PolicyType
 from cartography.intel.aws.iam import transform_policy_data
+from tests.data.aws.iam import LIST_ROLES
+from tests.data.aws.iam import LIST_USERS
 
 SINGLE_STATEMENT = {
     "Resource": "*",
@@ -120,3 +125,156 @@ def test_transform_policy_data_correctly_creates_lists_of_statements():
 
     # Assert that we correctly converted the statement to a list
     assert isinstance(pol_statement_map["some-arn"]["pol-name"], list)
+
+
+def test_transform_users():
+    users = iam.transform_users(LIST_USERS["Users"])
+    assert users[0] == {
+        "Arn": "arn:aws:iam::000000000000:user/example-user-0",
+        "UserId": "AIDA00000000000000000",
+        "UserName": "example-user-0",
+        "Path": "/",
+        "CreateDate": "2019-01-01 00:00:01",
+        "PasswordLastUsed": "2019-01-01 00:00:01",
+    }
+    # Users that never signed in with a password have no PasswordLastUsed
+    assert (
+        iam.transform_users([{**LIST_USERS["Users"][0], "PasswordLastUsed": None}])[0][
+            "PasswordLastUsed"
+        ]
+        == "None"
+    )
+    user = dict(LIST_USERS["Users"][1])
+    del user["PasswordLastUsed"]
+    assert iam.transform_users([user])[0]["PasswordLastUsed"] == ""
+
+
+def test_transform_trusted_principals():
+    principals = iam.transform_trusted_principals(LIST_ROLES["Roles"])
+    assert {
+        (p["RoleArn"], p["Arn"], p["Type"], p["AccountId"]) for p in principals
+    } == {
+        (
+            "arn:aws:iam::000000000000:role/example-role-0",
+            "arn:aws:iam::000000000000:root",
+            "AWS",
+            "000000000000",
+        ),
+        (
+            "arn:aws:iam::000000000000:role/example-role-1",
+            "arn:aws:iam::000000000000:role/example-role-0",
+            "AWS",
+            "000000000000",
+        ),
+        (
+            "arn:aws:iam::000000000000:role/example-role-2",
+            "ec2.amazonaws.com",
+            "Service",
+            None,
+        ),
+        (
+            "arn:aws:iam::000000000000:role/example-role-3",
+            "arn:aws:iam::000000000000:saml-provider/ADFS",
+            "Federated",
+            "000000000000",
+        ),
+    }
+
+
+def test_transform_group_memberships_and_access_keys():
+    group_arn = "arn:aws:iam::000000000000:group/example-group-0"
+    user_arn = "arn:aws:iam::000000000000:user/example-user-0"
+    assert iam.transform_group_memberships(
+        {group_arn: {"Users": [{"Arn": user_arn}]}, "other-group": {}},
+    ) == [{"GroupArn": group_arn, "UserArn": user_arn}]
+
+    access_keys = iam.transform_user_access_keys(
+        {
+            user_arn: {
+                "AccessKeyMetadata": [
+                    {
+                        "AccessKeyId": "AKIA0",
+                        "CreateDate": datetime.datetime(2019, 1, 1, 0, 0, 1),
+                        "Status": "Active",
+                        "LastUsedDate": None,
+                        "LastUsedService": "N/A",
+                        "LastUsedRegion": "N/A",
+                    },
+                    {"AccessKeyId": None},
+                ],
+            },
+        },
+    )
+    assert access_keys == [
+        {
+            "UserArn": user_arn,
+            "AccessKeyId": "AKIA0",
+            "CreateDate": "2019-01-01 00:00:01",
+            "Status": "Active",
+            "LastUsedDate": None,
+            "LastUsedService": "N/A",
+            "LastUsedRegion": "N/A",
+        },
+    ]
+
+
+@mock.patch.object(iam, "load")
+@mock.patch.object(iam, "load_graph_data")
+def test_load_roles_backfills_ids_before_loading(mock_load_graph_data, mock_load):
+    calls = mock.Mock()
+    calls.attach_mock(mock_load_graph_data, "load_graph_data")
+    calls.attach_mock(mock_load, "load")
+
+    iam.load_roles(mock.MagicMock(), LIST_ROLES["Roles"], "000000000000", 1)
+
+    # Bare AWSPrincipal nodes get an `id` before the roles are merged on it.
+    first_call = calls.mock_calls[0]
+    assert first_call[0] == "load_graph_data"
+    assert "MATCH (n:AWSPrincipal{arn: item.id})" in first_call.args[1]
+    assert first_call.kwargs["stat_name"] == "AWSPrincipal.id_backfill"
+    assert calls.mock_calls[1][0] == "load"
+
+
+@mock.patch.object(iam, "run_cleanup_job")
+@mock.patch.object(iam, "load_graph_data")
+@mock.patch.object(iam, "get_policies_for_principals")
+def test_sync_assumerole_relationships(
+    mock_get_policies,
+    mock_load_graph_data,
+    mock_cleanup,
+):
+    role_a = "arn:aws:iam::000000000000:role/role-a"
+    role_b = "arn:aws:iam::000000000000:role/role-b"
+    user = "arn:aws:iam::111111111111:user/user"
+    other_user = "arn:aws:iam::111111111111:user/other-user"
+    neo4j_session = mock.MagicMock()
+    neo4j_session.run.return_value = [
+        {"source_arn": user, "target_arn": role_a},
+        {"source_arn": user, "target_arn": role_b},
+        {"source_arn": other_user, "target_arn": role_a},
+    ]
+    mock_get_policies.return_value = {
+        # The user may assume any role, but is denied role-b.
+        user: {
+            "allow": [
+                {"effect": "Allow", "action": ["sts:AssumeRole"], "resource": ["*"]},
+            ],
+            "deny": [
+                {"effect": "Deny", "action": ["sts:*"], "resource": [role_b]},
+            ],
+        },
+        # role-b does not trust the other user, so this grant is not a relationship.
+        other_user: {
+            "allow": [
+                {"effect": "Allow", "action": ["sts:AssumeRole"], "resource": [role_b]},
+            ],
+        },
+    }
+
+    iam.sync_assumerole_relationships(neo4j_session, "000000000000", 1, {})
+
+    assert set(mock_get_policies.call_args.args[1]) == {user, other_user}
+    mock_load_graph_data.assert_called_once()
+    assert mock_load_graph_data.call_args.args[2] == [
+        {"principal_arn": user, "resource_arn": role_a},
+    ]
@@ -0,0 +1,118 @@
+import threading
+import time
+from unittest import mock
+
+from cartography.intel.aws import ecr
+
+TEST_REGION = "us-east-1"
+
+
+def _repositories(count):
+    # Unsorted on purpose: images are fetched and yielded in repository name order.
+    return [
+        {
+            "repositoryName": f"repo-{i}",
+            "repositoryUri": f"000000000000.dkr.ecr.us-east-1/repo-{i}",
+        }
+        for i in reversed(range(count))
+    ]
+
+
+def _images(boto3_session, region, repository_name, client=None):
+    return [
+        {"imageDigest": f"sha256:{repository_name}", "imageTag": "latest"},
+    ]
+
+
+@mock.patch.object(ecr, "get_ecr_repository_images", side_effect=_images)
+def test_get_image_data_yields_chunks_in_order(mock_get_images):
+    boto3_session = mock.MagicMock()
+
+    chunks = list(
+        ecr._get_image_data(
+            boto3_session,
+            TEST_REGION,
+            _repositories(5),
+            max_workers=2,
+            chunk_size=2,
+        ),
+    )
+
+    assert [list(chunk) for chunk in chunks] == [
+        [
+            "000000000000.dkr.ecr.us-east-1/repo-0",
+            "000000000000.dkr.ecr.us-east-1/repo-1",
+        ],
+        [
+            "000000000000.dkr.ecr.us-east-1/repo-2",
+            "000000000000.dkr.ecr.us-east-1/repo-3",
+        ],
+        ["000000000000.dkr.ecr.us-east-1/repo-4"],
+    ]
+    assert chunks[0]["000000000000.dkr.ecr.us-east-1/repo-1"] == [
+        {"imageDigest": "sha256:repo-1", "imageTag": "latest"},
+    ]
+    # One client for the region, shared by all workers
+    boto3_session.client.assert_called_once()
+    assert {c.kwargs["client"] for c in mock_get_images.call_args_list} == {
+        boto3_session.client.return_value,
+    }
+
+
+def test_get_image_data_bounds_concurrency():
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def get_images(boto3_session, region, repository_name, client=None):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return []
+
+    with mock.patch.object(ecr, "get_ecr_repository_images", side_effect=get_images):
+        chunks = list(
+            ecr._get_image_data(
+                mock.MagicMock(),
+                TEST_REGION,
+                _repositories(20),
+                max_workers=3,
+            ),
+        )
+
+    assert len(chunks[0]) == 20
+    assert max_running <= 3
+
+
+@mock.patch.object(ecr, "cleanup")
+@mock.patch.object(ecr, "load_ecr_repository_images")
+@mock.patch.object(ecr, "load_ecr_repositories")
+@mock.patch.object(ecr, "get_ecr_repository_images", side_effect=_images)
+@mock.patch.object(ecr, "get_ecr_repositories")
+def test_sync_loads_images_per_repository_chunk(
+    mock_get_repos,
+    mock_get_images,
+    mock_load_repos,
+    mock_load_images,
+    mock_cleanup,
+):
+    repo_count = ecr.REPOSITORY_CHUNK_SIZE + 1
+    mock_get_repos.return_value = _repositories(repo_count)
+
+    ecr.sync(
+        mock.MagicMock(),
+        mock.MagicMock(),
+        [TEST_REGION],
+        "000000000000",
+        1,
+        {"UPDATE_TAG": 1, "AWS_ID": "000000000000"},
+    )
+
+    mock_load_repos.assert_called_once()
+    loaded = [len(c.args[1]) for c in mock_load_images.call_args_list]
+    assert loaded == [ecr.REPOSITORY_CHUNK_SIZE, 1]
+    mock_cleanup.assert_called_once()
@@ -1,3 +1,8 @@
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
 from cartography.intel.aws import permission_relationships
 
 GET_OBJECT_LOWERCASE_RESOURCE_WILDCARD = [
@@ -528,3 +533,126 @@ def test_permissions_list():
         assert False
     except ValueError:
         assert True
+
+
+def test_calculate_permission_relationships_matches_per_resource_evaluation():
+    rng = random.Random(0)
+    resource_arns = [
+        "arn:aws:s3:::testbucket",
+        "arn:aws:s3:::TestBucket2",
+        "arn:aws:s3:::testbucket.logs",
+        "arn:aws:s3:::other-bucket",
+        "arn:aws:s3:::ſecret-bucket",
+        "arn:aws:dynamodb:us-east-1:000000000000:table/users",
+    ]
+    clauses = [
+        "*",
+        "arn:aws:s3:::test*",
+        "arn:aws:s3:::testbucket?",
+        "arn:aws:s3:::testbucket.*",
+        "arn:aws:s3:::s*",
+        "arn:aws:dynamodb:*:*:table/users",
+    ]
+    actions = ["s3:GetObject", "s3:Get*", "S3:*", "dynamodb:query", "*", "iam:*"]
+    permissions = ["S3:GetObject", "dynamodb:Query"]
+    principals = {}
+    for i in range(30):
+        policies = {}
+        for j in range(rng.randrange(1, 4)):
+            statement = {"effect": rng.choice(["Allow", "Allow", "Deny"])}
+            if rng.random() < 0.8:
+                statement["action"] = rng.sample(actions, 2)
+            if rng.random() < 0.2:
+                statement["notaction"] = [rng.choice(actions)]
+            statement["resource"] = [rng.choice(clauses)]
+            if rng.random() < 0.2:
+                statement["notresource"] = [rng.choice(clauses)]
+            policies[f"policy{j}"] = [statement]
+        principals[f"principal{i}"] = policies
+
+    expected = [
+        {"principal_arn": principal_arn, "resource_arn": resource_arn}
+        for resource_arn in resource_arns
+        for principal_arn, policies in principals.items()
+        if permission_relationships.principal_allowed_on_resource(
+            policies,
+            resource_arn,
+            permissions,
+        )
+    ]
+    assert expected
+    assert (
+        permission_relationships.calculate_permission_relationships(
+            principals,
+            resource_arns,
+            permissions,
+        )
+        == expected
+    )
+
+
+def test_calculate_permission_relationships_in_processes():
+    principals = {
+        f"principal{i}": {
+            "policy": [
+                {
+                    "action": ["s3:Get*"],
+                    "resource": [f"arn:aws:s3:::bucket{i % 3}*"],
+                    "effect": "Allow",
+                },
+            ],
+        }
+        for i in range(7)
+    }
+    resource_arns = [f"arn:aws:s3:::bucket{i}" for i in range(6)]
+    expected = permission_relationships.calculate_permission_relationships(
+        principals,
+        resource_arns,
+        ["S3:GetObject"],
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=2,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        shards = list(
+            permission_relationships.calculate_permission_relationships_in_processes(
+                executor,
+                principals,
+                resource_arns,
+                ["S3:GetObject"],
+                shards=3,
+            ),
+        )
+
+    assert len(shards) == 3
+    actual = [mapping for shard in shards for mapping in shard]
+    assert sorted(
+        actual, key=lambda m: (m["resource_arn"], m["principal_arn"])
+    ) == sorted(
+        expected,
+        key=lambda m: (m["resource_arn"], m["principal_arn"]),
+    )
+
+
+@mock.patch.object(permission_relationships, "PRINCIPAL_MAPPINGS_BATCH_SIZE", 2)
+def test_load_principal_mappings_batches():
+    neo4j_session = mock.MagicMock()
+    mappings = [
+        {"principal_arn": f"principal{i}", "resource_arn": "arn:aws:s3:::bucket"}
+        for i in range(5)
+    ]
+
+    permission_relationships.load_principal_mappings(
+        neo4j_session,
+        mappings,
+        "S3Bucket",
+        "CAN_READ",
+        1,
+    )
+
+    assert [len(c.kwargs["Mapping"]) for c in neo4j_session.run.call_args_list] == [
+        2,
+        2,
+        1,
+    ]
@@ -1,5 +1,6 @@
 import copy
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import cartography.intel.aws.resourcegroupstaggingapi as rgta
 import tests.data.aws.resourcegroupstaggingapi as test_data
@@ -72,3 +73,118 @@ def test_load_tags_empty_data():
 
     # Assert
     mock_neo4j_session.write_transaction.assert_not_called()
+
+
+# An example ARN of every resource type in TAG_RESOURCE_TYPE_MAPPINGS, in the format returned by AWS.
+EXAMPLE_ARNS = {
+    "autoscaling:autoScalingGroup": "arn:aws:autoscaling:us-east-1:1234:autoScalingGroup:uuid:autoScalingGroupName/asg-1",
+    "dynamodb:table": "arn:aws:dynamodb:us-east-1:1234:table/table-1",
+    "ec2:instance": "arn:aws:ec2:us-east-1:1234:instance/i-01",
+    "ec2:internet-gateway": "arn:aws:ec2:us-east-1:1234:internet-gateway/igw-1",
+    "ec2:key-pair": "arn:aws:ec2:us-east-1:1234:key-pair/key-1",
+    "ec2:network-interface": "arn:aws:ec2:us-east-1:1234:network-interface/eni-1",
+    "ecr:repository": "arn:aws:ecr:us-east-1:1234:repository/team/repo-1",
+    "ec2:security-group": "arn:aws:ec2:us-east-1:1234:security-group/sg-1",
+    "ec2:subnet": "arn:aws:ec2:us-east-1:1234:subnet/subnet-1",
+    "ec2:transit-gateway": "arn:aws:ec2:us-east-1:1234:transit-gateway/tgw-1",
+    "ec2:transit-gateway-attachment": "arn:aws:ec2:us-east-1:1234:transit-gateway-attachment/tgw-attach-1",
+    "ec2:vpc": "arn:aws:ec2:us-east-1:1234:vpc/vpc-1",
+    "ec2:volume": "arn:aws:ec2:us-east-1:1234:volume/vol-1",
+    "ec2:elastic-ip-address": "arn:aws:ec2:us-east-1:1234:elastic-ip/eipalloc-1",
+    "ecs:cluster": "arn:aws:ecs:us-east-1:1234:cluster/cluster-1",
+    "ecs:container": "arn:aws:ecs:us-east-1:1234:container/cluster-1/c-1",
+    "ecs:container-instance": "arn:aws:ecs:us-east-1:1234:container-instance/cluster-1/ci-1",
+    "ecs:task": "arn:aws:ecs:us-east-1:1234:task/cluster-1/task-1",
+    "ecs:task-definition": "arn:aws:ecs:us-east-1:1234:task-definition/family-1:3",
+    "eks:cluster": "arn:aws:eks:us-east-1:1234:cluster/cluster-1",
+    "elasticache:cluster": "arn:aws:elasticache:us-east-1:1234:cluster:cluster-1",
+    "elasticloadbalancing:loadbalancer": "arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/lb-1",
+    "elasticloadbalancing:loadbalancer/app": "arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/app/lb-1/ab123",
+    "elasticloadbalancing:loadbalancer/net": "arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/net/lb-1/ab123",
+    "elasticmapreduce:cluster": "arn:aws:elasticmapreduce:us-east-1:1234:cluster/j-1",
+    "es:domain": "arn:aws:es:us-east-1:1234:domain/domain-1",
+    "kms:key": "arn:aws:kms:us-east-1:1234:key/key-1",
+    "iam:group": "arn:aws:iam::1234:group/group-1",
+    "iam:role": "arn:aws:iam::1234:role/path/role-1",
+    "iam:user": "arn:aws:iam::1234:user/user-1",
+    "lambda:function": "arn:aws:lambda:us-east-1:1234:function:func-1",
+    "redshift:cluster": "arn:aws:redshift:us-east-1:1234:cluster:cluster-1",
+    "rds:db": "arn:aws:rds:us-east-1:1234:db:rds-db-1",
+    "rds:subgrp": "arn:aws:rds:us-east-1:1234:subgrp:subnet-group-1",
+    "rds:cluster": "arn:aws:rds:us-east-1:1234:cluster:cluster-1",
+    "rds:snapshot": "arn:aws:rds:us-east-1:1234:snapshot:snapshot-1",
+    "s3": "arn:aws:s3:::bucket-1",
+    "secretsmanager:secret": "arn:aws:secretsmanager:us-east-1:1234:secret:secret-1-AbCdEf",
+    "sqs": "arn:aws:sqs:us-east-1:1234:queue-1",
+}
+
+
+def test_get_resource_type_from_arn():
+    resource_types = list(rgta.TAG_RESOURCE_TYPE_MAPPINGS.keys())
+    assert set(EXAMPLE_ARNS) == set(resource_types)
+    for expected, arn in EXAMPLE_ARNS.items():
+        assert rgta.get_resource_type_from_arn(arn, resource_types) == expected, arn
+
+    for arn, expected in [
+        # A classic load balancer named "app"
+        (
+            "arn:aws:elasticloadbalancing:us-east-1:1234:loadbalancer/app",
+            "elasticloadbalancing:loadbalancer",
+        ),
+        ("arn:aws:sns:us-east-1:1234:topic-1", None),
+        ("not-an-arn", None),
+    ]:
+        assert rgta.get_resource_type_from_arn(arn, resource_types) == expected, arn
+
+
+def test_sync_sweeps_each_region_once():
+    """
+    Ensure that sync() fetches the tags of all resource types with one get_resources sweep per region, and loads them
+    to the label of each resource type.
+    """
+    # Arrange
+    boto3_session = MagicMock()
+    paginator = boto3_session.client.return_value.get_paginator.return_value
+    paginator.paginate.return_value = [
+        {"ResourceTagMappingList": copy.deepcopy(test_data.GET_RESOURCES_RESPONSE)},
+    ]
+    mock_neo4j_session = MagicMock()
+    mappings = {
+        "ec2:instance": rgta.TAG_RESOURCE_TYPE_MAPPINGS["ec2:instance"],
+        "s3": rgta.TAG_RESOURCE_TYPE_MAPPINGS["s3"],
+        "rds:db": rgta.TAG_RESOURCE_TYPE_MAPPINGS["rds:db"],
+    }
+
+    # Act
+    with patch.object(rgta, "cleanup"):
+        rgta.sync(
+            mock_neo4j_session,
+            boto3_session,
+            ["us-east-1", "us-west-2"],
+            "1234",
+            123456789,
+            {},
+            tag_resource_type_mappings=mappings,
+        )
+
+    # Assert
+    assert paginator.paginate.call_count == 2
+    paginator.paginate.assert_called_with(
+        ResourceTypeFilters=["ec2:instance", "s3", "rds:db"],
+    )
+    loaded = [
+        (
+            call.kwargs["resource_type"],
+            [t["resource_id"] for t in call.kwargs["tag_data"]],
+        )
+        for call in mock_neo4j_session.write_transaction.call_args_list
+    ]
+    assert (
+        loaded
+        == [
+            ("ec2:instance", ["i-01"]),
+            ("s3", ["bucket-1"]),
+            ("rds:db", ["arn:aws:rds:us-east-1:1234:db:rds-db-1"]),
+        ]
+        * 2
+    )
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+from cartography.intel.aws import s3
+from cartography.util import thread_event_loop
+
+DETAIL_GETTERS = (
+    "get_acl",
+    "get_policy",
+    "get_encryption",
+    "get_versioning",
+    "get_public_access_block",
+    "get_bucket_ownership_controls",
+)
+
+
+def _bucket_data(regions):
+    return {
+        "Buckets": [
+            {"Name": f"bucket-{i}", "Region": region}
+            for i, region in enumerate(regions)
+        ],
+    }
+
+
+def test_get_s3_bucket_details_bounds_concurrency_per_region():
+    lock = threading.Lock()
+    running: Counter = Counter()
+    max_running: Counter = Counter()
+
+    def get_acl(bucket, client):
+        with lock:
+            running[bucket["Region"]] += 1
+            max_running[bucket["Region"]] = max(
+                max_running[bucket["Region"]],
+                running[bucket["Region"]],
+            )
+        time.sleep(0.01)
+        with lock:
+            running[bucket["Region"]] -= 1
+        return {"bucket": bucket["Name"]}
+
+    bucket_data = _bucket_data(["us-east-1"] * 12 + ["eu-west-1"] * 3)
+    boto3_session = mock.MagicMock()
+    with (
+        mock.patch.multiple(
+            s3,
+            **{name: mock.DEFAULT for name in DETAIL_GETTERS},
+        ) as getters,
+        thread_event_loop(),
+    ):
+        getters["get_acl"].side_effect = get_acl
+        details = list(
+            s3.get_s3_bucket_details(
+                boto3_session,
+                bucket_data,
+                max_concurrent_buckets=2,
+            ),
+        )
+
+    assert sorted(d[0] for d in details) == sorted(
+        b["Name"] for b in bucket_data["Buckets"]
+    )
+    assert all(d[1] == {"bucket": d[0]} for d in details)
+    assert max_running["us-east-1"] <= 2
+    assert max_running["eu-west-1"] <= 2
+    # One client per region
+    assert boto3_session.client.call_count == 2
+
+
+def test_get_s3_bucket_details_stops_when_closed():
+    bucket_data = _bucket_data(["us-east-1"] * 10)
+    with (
+        mock.patch.multiple(
+            s3,
+            **{name: mock.DEFAULT for name in DETAIL_GETTERS},
+        ) as getters,
+        thread_event_loop(),
+    ):
+        details = s3.get_s3_bucket_details(
+            mock.MagicMock(),
+            bucket_data,
+            max_concurrent_buckets=3,
+        )
+        next(details)
+        details.close()
+
+    # The first three buckets and the ones started to replace the finished ones, not all ten.
+    assert getters["get_acl"].call_count < 10
+
+
+def test_get_max_concurrent_buckets():
+    assert s3.get_max_concurrent_buckets({}) == s3.DEFAULT_MAX_CONCURRENT_BUCKETS
+    assert s3.get_max_concurrent_buckets({"aws_s3_max_concurrent_buckets": 4}) == 4
+
+
+@mock.patch.object(s3, "_set_default_values")
+@mock.patch.object(s3, "_run_s3_acl_analysis")
+@mock.patch.object(s3, "_load_bucket_ownership_controls")
+@mock.patch.object(s3, "_load_s3_public_access_block")
+@mock.patch.object(s3, "_load_s3_versioning")
+@mock.patch.object(s3, "_load_s3_encryption")
+@mock.patch.object(s3, "_load_s3_policy_statements")
+@mock.patch.object(s3, "_load_s3_policies")
+@mock.patch.object(s3, "_ingest_s3_acls")
+@mock.patch.object(s3, "run_cleanup_job")
+def test_load_s3_details_loads_in_batches(
+    mock_cleanup,
+    mock_ingest_acls,
+    mock_load_policies,
+    mock_load_statements,
+    mock_load_encryption,
+    mock_load_versioning,
+    mock_load_public_access_block,
+    mock_load_ownership_controls,
+    mock_acl_analysis,
+    mock_set_defaults,
+):
+    loaded_batches = []
+    mock_load_versioning.side_effect = lambda session, configs, tag: (
+        loaded_batches.append([c["bucket"] for c in configs])
+    )
+    details = (
+        (
+            f"bucket-{i}",
+            None,
+            None,
+            None,
+            {"Status": "Enabled", "MFADelete": "Disabled"},
+            None,
+            None,
+        )
+        for i in range(5)
+    )
+    session = mock.MagicMock()
+
+    s3.load_s3_details(session, details, "000000000000", 1, batch_size=2)
+
+    assert loaded_batches == [
+        ["bucket-0", "bucket-1"],
+        ["bucket-2", "bucket-3"],
+        ["bucket-4"],
+    ]
+    assert mock_ingest_acls.call_count == 3
+    mock_cleanup.assert_called_once()
+    # The ACL analysis appends to anonymous_actions, so it must only run once, after all batches.
+    mock_acl_analysis.assert_called_once_with(session, "000000000000")
+    mock_set_defaults.assert_called_once_with(session, "000000000000")
@@ -1,7 +1,14 @@
+import threading
+from unittest import mock
+
+import botocore.exceptions
 import pytest
 
 from cartography.intel.aws.util.common import parse_and_validate_aws_regions
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
+from cartography.intel.aws.util.regions import fetch_regions_concurrently
+from cartography.intel.aws.util.regions import get_max_concurrent_regions
+from cartography.util import aws_handle_regions
 
 
 def test_parse_and_validate_requested_syncs():
@@ -67,3 +74,87 @@ def test_parse_and_validate_aws_regions():
         ValueError, match="`aws-regions` was set but no regions were specified"
     ):
         parse_and_validate_aws_regions(only_empty)
+
+
+def test_fetch_regions_concurrently_preserves_region_order():
+    regions = ["us-east-1", "us-west-2", "eu-west-1", "ap-south-1"]
+    # Two regions can only return if they are fetched at the same time.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def get_func(boto3_session, region):
+        barrier.wait()
+        return [f"{region}-data"]
+
+    result = list(
+        fetch_regions_concurrently(get_func, mock.MagicMock(), regions, max_workers=2),
+    )
+
+    assert result == [(region, [f"{region}-data"]) for region in regions]
+
+
+def test_fetch_regions_concurrently_sequential():
+    calls = []
+
+    def get_func(boto3_session, region):
+        calls.append((boto3_session, region, threading.current_thread()))
+        return region
+
+    boto3_session = mock.MagicMock()
+
+    result = list(
+        fetch_regions_concurrently(get_func, boto3_session, ["us-east-1", "us-west-2"]),
+    )
+
+    assert result == [("us-east-1", "us-east-1"), ("us-west-2", "us-west-2")]
+    assert calls == [
+        (boto3_session, "us-east-1", threading.current_thread()),
+        (boto3_session, "us-west-2", threading.current_thread()),
+    ]
+
+
+def test_fetch_regions_concurrently_retries_throttling():
+    throttled = botocore.exceptions.ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+        "DescribeInstances",
+    )
+    responses = [throttled, ["data"]]
+
+    # Throttled calls are retried by aws_handle_regions, which decorates the get functions.
+    @aws_handle_regions
+    def get_func(boto3_session, region):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    with mock.patch("time.sleep"):
+        result = list(
+            fetch_regions_concurrently(get_func, mock.MagicMock(), ["us-east-1"]),
+        )
+
+    assert result == [("us-east-1", ["data"])]
+    assert responses == []
+
+
+def test_fetch_regions_concurrently_raises_errors():
+    def get_func(boto3_session, region):
+        raise botocore.exceptions.ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "Bad request"}},
+            "DescribeInstances",
+        )
+
+    with pytest.raises(botocore.exceptions.ClientError):
+        list(
+            fetch_regions_concurrently(
+                get_func,
+                mock.MagicMock(),
+                ["us-east-1", "us-west-2"],
+                max_workers=2,
+            ),
+        )
+
+
+def test_get_max_concurrent_regions():
+    assert get_max_concurrent_regions({}) == 1
+    assert get_max_concurrent_regions({"aws_max_concurrent_regions": None}) == 1
+    assert get_max_concurrent_regions({"aws_max_concurrent_regions": 8}) == 8
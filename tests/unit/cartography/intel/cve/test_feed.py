@@ -1,3 +1,4 @@
+from copy import deepcopy
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -8,11 +9,15 @@ from unittest.mock import patch
 import pytest
 from requests import Session
 
+from cartography.intel.cve import feed
 from cartography.intel.cve.feed import _call_cves_api
 from cartography.intel.cve.feed import _map_cve_dict
+from cartography.intel.cve.feed import CVEPageCache
 from cartography.intel.cve.feed import get_cves_in_batches
-from cartography.intel.cve.feed import get_modified_cves
 from cartography.intel.cve.feed import get_published_cves_per_year
+from cartography.intel.cve.feed import iter_modified_cve_pages
+from cartography.intel.cve.feed import iter_transformed_cves
+from cartography.intel.cve.feed import transform_cves
 from tests.data.cve.feed import GET_CVE_API_DATA
 from tests.data.cve.feed import GET_CVE_API_DATA_BATCH_2
 
@@ -184,10 +189,12 @@ def test_get_cves_in_batches(mock_call_cves_api: Mock, mock_session: Session):
     assert cves == excepted_cves
 
 
-@patch("cartography.intel.cve.feed._call_cves_api")
-def test_get_modified_cves(mock_call_cves_api: Mock, mock_session: Session):
+@patch("cartography.intel.cve.feed._iter_cves_api_pages")
+def test_iter_modified_cve_pages(mock_iter_pages: Mock, mock_session: Session):
     # Arrange
-    mock_call_cves_api.side_effect = [GET_CVE_API_DATA]
+    mock_iter_pages.side_effect = [
+        iter([GET_CVE_API_DATA, GET_CVE_API_DATA_BATCH_2]),
+    ]
     last_modified_date = datetime.now(tz=timezone.utc) + timedelta(days=-1)
     last_modified_date_iso8601 = last_modified_date.strftime("%Y-%m-%dT%H:%M:%S")
     current_date_iso8601 = datetime.now(tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
@@ -196,20 +203,26 @@ def test_get_modified_cves(mock_call_cves_api: Mock, mock_session: Session):
         "lastModEndDate": current_date_iso8601,
     }
     # Act
-    cves = get_modified_cves(
+    pages = iter_modified_cve_pages(
         mock_session,
         NIST_CVE_URL,
         last_modified_date_iso8601,
         API_KEY,
     )
-    # Assert
-    mock_call_cves_api.assert_called_once_with(
+    # Assert: pages are requested lazily, as they are consumed.
+    mock_iter_pages.assert_not_called()
+    assert next(pages) == GET_CVE_API_DATA
+    mock_iter_pages.assert_called_once_with(
         mock_session,
         NIST_CVE_URL,
         API_KEY,
         expected_params,
     )
-    assert cves == GET_CVE_API_DATA
+    assert list(pages) == [GET_CVE_API_DATA_BATCH_2]
+    # transform_cves() updates the CVEs in place, so each side transforms its own copy.
+    assert list(iter_transformed_cves([deepcopy(GET_CVE_API_DATA)])) == transform_cves(
+        deepcopy(GET_CVE_API_DATA),
+    )
 
 
 @patch("cartography.intel.cve.feed._call_cves_api")
@@ -232,3 +245,69 @@ def test_get_published_cves_per_year(mock_call_cves_api: Mock, mock_session: Ses
     # Assert
     assert mock_call_cves_api.call_count == 4
     assert cves == expected_cves
+
+
+def test_call_cves_api_uses_cache(mock_session, tmp_path):
+    cache = CVEPageCache(str(tmp_path))
+    params = {
+        "pubStartDate": "2020-01-01T00:00:00",
+        "pubEndDate": "2020-05-01T00:00:00",
+    }
+    mock_session.get.side_effect = _mock_good_responses()
+    first = _call_cves_api(mock_session, NIST_CVE_URL, API_KEY, dict(params), cache)
+    assert mock_session.get.call_count == 3
+    assert len(list(tmp_path.glob("*.json.gz"))) == 3
+
+    # A rerun reads every page from the cache.
+    second = _call_cves_api(mock_session, NIST_CVE_URL, API_KEY, dict(params), cache)
+    assert mock_session.get.call_count == 3
+    assert second == first
+
+
+@patch("cartography.intel.cve.feed._call_cves_api")
+def test_get_cves_in_batches_caches_only_past_windows(
+    mock_call_cves_api: Mock,
+    mock_session: Session,
+    tmp_path,
+):
+    mock_call_cves_api.side_effect = [GET_CVE_API_DATA, GET_CVE_API_DATA_BATCH_2]
+    cache = CVEPageCache(str(tmp_path))
+    end_date = datetime.now() + timedelta(days=10)
+    get_cves_in_batches(
+        mock_session,
+        NIST_CVE_URL,
+        end_date - timedelta(days=130),
+        end_date,
+        {"start": "pubStartDate", "end": "pubEndDate"},
+        API_KEY,
+        cache=cache,
+    )
+    assert [c.kwargs["cache"] for c in mock_call_cves_api.call_args_list] == [
+        cache,
+        None,
+    ]
+
+
+def test_nvd_rate_limiter(mocker):
+    clock = mocker.patch("cartography.http_client.time.monotonic", return_value=0.0)
+    sleep = mocker.patch("cartography.http_client.time.sleep")
+    feed._rate_limiters.clear()
+    limiter = feed.get_rate_limiter(None)
+    quota = feed.NVD_REQUESTS_PER_WINDOW_WITHOUT_API_KEY
+    window = feed.NVD_RATE_LIMIT_WINDOW_SECONDS
+
+    # Send each request as soon as the limiter allows it.
+    sent = []
+    for _ in range(10 * quota):
+        limiter.acquire()
+        if sleep.called:
+            clock.return_value += sleep.call_args.args[0]
+            sleep.reset_mock()
+        sent.append(clock.return_value)
+
+    # No rolling window has more requests than the quota...
+    for i in range(len(sent) - quota):
+        assert sent[i + quota] - sent[i] >= window
+    # ...and after the initial burst, requests are sent at the full rate of the quota.
+    assert sent[-1] - sent[quota - 1] == (len(sent) - quota) * window / quota
+    feed._rate_limiters.clear()
@@ -0,0 +1,52 @@
+import json
+from unittest import mock
+
+from cartography.config import Config
+from cartography.graph.job import GraphJob
+from cartography.intel import analysis
+
+
+def _write_job(directory, name, query):
+    (directory / name).write_text(
+        json.dumps(
+            {"name": name, "statements": [{"query": query, "iterative": False}]},
+        ),
+    )
+
+
+@mock.patch.object(
+    analysis,
+    "get_sub_resources_updated_in_sync",
+    return_value=["000000000001", "000000000002"],
+)
+def test_run_scopes_jobs_to_updated_sub_resources(mock_get_updated, tmp_path):
+    _write_job(
+        tmp_path,
+        "scoped.json",
+        "MATCH (:AWSAccount{id: $AWS_ID})-[:RESOURCE]->(n) SET n.x = $UPDATE_TAG",
+    )
+    _write_job(tmp_path, "global.json", "MATCH (n) SET n.y = $UPDATE_TAG")
+    neo4j_session = mock.MagicMock()
+    runs = []
+
+    def record_run(job, session):
+        parameters = dict(job.statements[0].parameters)
+        parameters.pop("LIMIT_SIZE", None)
+        runs.append((job.name, parameters))
+
+    with mock.patch.object(GraphJob, "run", autospec=True, side_effect=record_run):
+        analysis.run(
+            neo4j_session,
+            Config(
+                neo4j_uri="bolt://localhost:7687",
+                update_tag=1,
+                analysis_job_directory=str(tmp_path),
+            ),
+        )
+
+    mock_get_updated.assert_called_once_with(neo4j_session, "AWSAccount", 1)
+    assert sorted(runs, key=lambda r: (r[0], sorted(r[1].items()))) == [
+        ("global.json", {"UPDATE_TAG": 1}),
+        ("scoped.json", {"UPDATE_TAG": 1, "AWS_ID": "000000000001"}),
+        ("scoped.json", {"UPDATE_TAG": 1, "AWS_ID": "000000000002"}),
+    ]
@@ -8,6 +8,7 @@ from cartography.intel.trivy import _get_intersection
 from cartography.intel.trivy import sync_trivy_aws_ecr_from_s3
 from cartography.intel.trivy.scanner import get_json_files_in_s3
 from cartography.intel.trivy.scanner import read_scan_results_from_s3
+from cartography.intel.trivy.scanner import sync_images_from_s3
 from cartography.intel.trivy.scanner import sync_single_image_from_s3
 
 
@@ -185,9 +186,7 @@ def test_read_scan_results_from_s3_with_results(mock_boto3_session):
     }
 
     mock_response_body = MagicMock()
-    mock_response_body.read.return_value.decode.return_value = json.dumps(
-        mock_scan_data
-    )
+    mock_response_body.read.return_value = json.dumps(mock_scan_data)
     mock_boto3_session.return_value.client.return_value.get_object.return_value = {
         "Body": mock_response_body
     }
@@ -220,9 +219,7 @@ def test_read_scan_results_from_s3_empty_results(mock_boto3_session):
     mock_scan_data = {"Results": []}
 
     mock_response_body = MagicMock()
-    mock_response_body.read.return_value.decode.return_value = json.dumps(
-        mock_scan_data
-    )
+    mock_response_body.read.return_value = json.dumps(mock_scan_data)
     mock_boto3_session.return_value.client.return_value.get_object.return_value = {
         "Body": mock_response_body
     }
@@ -254,9 +251,7 @@ def test_read_scan_results_from_s3_null_results(mock_boto3_session):
     mock_scan_data = {"Results": None}
 
     mock_response_body = MagicMock()
-    mock_response_body.read.return_value.decode.return_value = json.dumps(
-        mock_scan_data
-    )
+    mock_response_body.read.return_value = json.dumps(mock_scan_data)
     mock_boto3_session.return_value.client.return_value.get_object.return_value = {
         "Body": mock_response_body
     }
@@ -286,9 +281,7 @@ def test_read_scan_results_from_s3_missing_results_key(mock_boto3_session):
     mock_scan_data = {"Metadata": {"ImageID": "test-image"}}
 
     mock_response_body = MagicMock()
-    mock_response_body.read.return_value.decode.return_value = json.dumps(
-        mock_scan_data
-    )
+    mock_response_body.read.return_value = json.dumps(mock_scan_data)
     mock_boto3_session.return_value.client.return_value.get_object.return_value = {
         "Body": mock_response_body
     }
@@ -341,7 +334,7 @@ def test_read_scan_results_from_s3_invalid_json(mock_boto3_session):
     s3_object_key = f"{image_uri}.json"
 
     mock_response_body = MagicMock()
-    mock_response_body.read.return_value.decode.return_value = "invalid json content"
+    mock_response_body.read.return_value = "invalid json content"
     mock_boto3_session.return_value.client.return_value.get_object.return_value = {
         "Body": mock_response_body
     }
@@ -662,3 +655,168 @@ def test_sync_trivy_aws_ecr_from_s3_no_matches(
             common_job_parameters={},
             boto3_session=MagicMock(),
         )
+
+
+@patch("cartography.intel.trivy.scanner.IMAGE_LOAD_BATCH_SIZE", 2)
+@patch("cartography.intel.trivy.scanner.load_scan_etags")
+@patch("cartography.intel.trivy.scanner.load_scan_fixes")
+@patch("cartography.intel.trivy.scanner.load_scan_packages")
+@patch("cartography.intel.trivy.scanner.load_scan_vulns")
+@patch("cartography.intel.trivy.scanner.transform_scan_results")
+@patch("cartography.intel.trivy.scanner.read_scan_results_from_s3")
+def test_sync_images_from_s3_loads_in_batches(
+    mock_read_scan_results,
+    mock_transform,
+    mock_load_vulns,
+    mock_load_packages,
+    mock_load_fixes,
+    mock_load_etags,
+):
+    """Test that scan results are read with one shared client and loaded in batches with their ETags."""
+    # Arrange
+    images = [(f"repo:v{i}", f"scans/repo:v{i}.json") for i in range(5)]
+    etags = {key: f'"etag-{i}"' for i, (_, key) in enumerate(images)}
+    mock_read_scan_results.side_effect = lambda session, bucket, key, uri, s3_client: (
+        [{"Target": uri}],
+        "sha256:" + uri,
+    )
+    mock_transform.side_effect = lambda results, digest: (
+        [{"id": digest}],
+        [],
+        [],
+    )
+    loaded_findings = []
+    mock_load_vulns.side_effect = lambda session, findings, update_tag: (
+        loaded_findings.append([f["id"] for f in findings])
+    )
+    loaded_scans = []
+    mock_load_etags.side_effect = lambda session, scans: loaded_scans.append(
+        list(scans)
+    )
+    boto3_session = MagicMock()
+
+    # Act
+    sync_images_from_s3(
+        MagicMock(),
+        images,
+        etags,
+        123,
+        "test-bucket",
+        boto3_session,
+        max_workers=3,
+    )
+
+    # Assert
+    boto3_session.client.assert_called_once()
+    assert {
+        call.kwargs["s3_client"] for call in mock_read_scan_results.call_args_list
+    } == {boto3_session.client.return_value}
+    assert loaded_findings == [
+        ["sha256:repo:v0", "sha256:repo:v1"],
+        ["sha256:repo:v2", "sha256:repo:v3"],
+        ["sha256:repo:v4"],
+    ]
+    assert loaded_scans[0] == [
+        {
+            "image_uri": "repo:v0",
+            "etag": '"etag-0"',
+            "image_digest": "sha256:repo:v0",
+        },
+        {
+            "image_uri": "repo:v1",
+            "etag": '"etag-1"',
+            "image_digest": "sha256:repo:v1",
+        },
+    ]
+
+
+@patch("cartography.intel.trivy.scanner.load_scan_etags")
+@patch("cartography.intel.trivy.scanner.load_scan_vulns")
+@patch("cartography.intel.trivy.scanner.read_scan_results_from_s3")
+def test_sync_images_from_s3_read_error(
+    mock_read_scan_results,
+    mock_load_vulns,
+    mock_load_etags,
+):
+    """Test that a failed download is raised and that nothing is recorded for the images."""
+    mock_read_scan_results.side_effect = Exception("S3 read error")
+
+    with pytest.raises(Exception, match="S3 read error"):
+        sync_images_from_s3(
+            MagicMock(),
+            [("repo:v1", "scans/repo:v1.json")],
+            {"scans/repo:v1.json": '"etag-1"'},
+            123,
+            "test-bucket",
+            MagicMock(),
+        )
+
+    mock_load_vulns.assert_not_called()
+    mock_load_etags.assert_not_called()
+
+
+@patch("cartography.intel.trivy.cleanup")
+@patch("cartography.intel.trivy.sync_images_from_s3")
+@patch("cartography.intel.trivy.refresh_unchanged_scan_results")
+@patch("cartography.intel.trivy.get_previous_scan_etags")
+@patch("cartography.intel.trivy.get_json_file_etags_in_s3")
+@patch("cartography.intel.trivy.get_scan_targets")
+def test_sync_trivy_aws_ecr_from_s3_skips_unchanged_scan_results(
+    mock_get_scan_targets,
+    mock_get_json_file_etags,
+    mock_get_previous_scan_etags,
+    mock_refresh_unchanged,
+    mock_sync_images,
+    mock_cleanup,
+):
+    """Test that only the images whose scan results have a new ETag are downloaded."""
+    # Arrange
+    mock_get_scan_targets.return_value = {
+        "repo:unchanged",
+        "repo:changed",
+        "repo:new",
+        "repo:no-digest",
+    }
+    json_file_etags = {
+        "trivy-scans/repo:unchanged.json": '"etag-1"',
+        "trivy-scans/repo:changed.json": '"etag-3"',
+        "trivy-scans/repo:new.json": '"etag-4"',
+        "trivy-scans/repo:no-digest.json": '"etag-5"',
+    }
+    mock_get_json_file_etags.return_value = json_file_etags
+    mock_get_previous_scan_etags.return_value = {
+        "repo:unchanged": ('"etag-1"', "sha256:1"),
+        "repo:changed": ('"etag-2"', "sha256:2"),
+        # Without the digest of the previous scan its results cannot be refreshed, so the image is downloaded again.
+        "repo:no-digest": ('"etag-5"', None),
+    }
+    neo4j_session = MagicMock()
+    boto3_session = MagicMock()
+
+    # Act
+    sync_trivy_aws_ecr_from_s3(
+        neo4j_session,
+        "test-bucket",
+        "trivy-scans/",
+        123,
+        {"UPDATE_TAG": 123},
+        boto3_session,
+        max_workers=4,
+    )
+
+    # Assert
+    mock_refresh_unchanged.assert_called_once_with(neo4j_session, ["sha256:1"], 123)
+    images = mock_sync_images.call_args.args[1]
+    assert sorted(images) == [
+        ("repo:changed", "trivy-scans/repo:changed.json"),
+        ("repo:new", "trivy-scans/repo:new.json"),
+        ("repo:no-digest", "trivy-scans/repo:no-digest.json"),
+    ]
+    assert mock_sync_images.call_args.args[2:] == (
+        json_file_etags,
+        123,
+        "test-bucket",
+        boto3_session,
+        4,
+    )
+    mock_cleanup.assert_called_once()
@@ -0,0 +1,129 @@
+import threading
+import time
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from requests import Response
+from requests import Session
+
+from cartography.http_client import fetch_concurrently
+from cartography.http_client import HeaderRateLimiter
+from cartography.http_client import parse_rate_limit_headers
+from cartography.http_client import RateLimit
+from cartography.http_client import RateLimitedSession
+from cartography.http_client import TokenBucket
+
+
+def _response(**headers: str) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.headers.update({k.replace("_", "-"): v for k, v in headers.items()})
+    return response
+
+
+def test_token_bucket(mocker):
+    clock = mocker.patch("cartography.http_client.time.monotonic", return_value=0.0)
+    sleep = mocker.patch("cartography.http_client.time.sleep")
+    bucket = TokenBucket(rate=0.5, capacity=2)
+
+    # The bucket starts full.
+    bucket.acquire()
+    bucket.acquire()
+    sleep.assert_not_called()
+
+    # Then callers wait for the refill, queued behind each other.
+    bucket.acquire()
+    bucket.acquire()
+    assert [c.args[0] for c in sleep.call_args_list] == [2.0, 4.0]
+
+    # Waiting refills the bucket, up to its capacity.
+    clock.return_value = 100.0
+    sleep.reset_mock()
+    bucket.acquire()
+    bucket.acquire()
+    sleep.assert_not_called()
+
+
+@patch("cartography.http_client.time.time", return_value=1_700_000_000.0)
+def test_parse_rate_limit_headers(mock_time: Mock) -> None:
+    # GitHub and SnipeIT: the reset is an epoch timestamp.
+    assert parse_rate_limit_headers(
+        _response(
+            X_RateLimit_Remaining="10",
+            X_RateLimit_Limit="5000",
+            X_RateLimit_Reset="1700000030",
+        ).headers,
+    ) == RateLimit(remaining=10, limit=5000, reset_at=1_700_000_030.0)
+    # Okta
+    assert parse_rate_limit_headers(
+        _response(x_rate_limit_remaining="3", x_rate_limit_reset="1700000005").headers,
+    ) == RateLimit(remaining=3, limit=None, reset_at=1_700_000_005.0)
+    # IETF draft: the reset is a number of seconds from now.
+    assert parse_rate_limit_headers(
+        _response(RateLimit_Remaining="0", RateLimit_Reset="30").headers,
+    ) == RateLimit(remaining=0, limit=None, reset_at=1_700_000_030.0)
+
+    assert parse_rate_limit_headers(_response().headers) is None
+    assert (
+        parse_rate_limit_headers(_response(X_RateLimit_Remaining="n/a").headers) is None
+    )
+
+
+@patch("cartography.http_client.time.sleep")
+def test_header_rate_limiter_waits_for_reset(mock_sleep: Mock) -> None:
+    limiter = HeaderRateLimiter(min_remaining=2, reset_margin_seconds=60)
+    # Nothing is known before the first response.
+    limiter.wait()
+    assert not limiter.has_state
+
+    limiter.update(
+        _response(
+            X_RateLimit_Remaining="4", X_RateLimit_Reset=str(int(time.time()) + 30)
+        ),
+    )
+    # Requests sent since the last response count against the quota.
+    limiter.wait()
+    limiter.wait()
+    mock_sleep.assert_not_called()
+
+    limiter.wait()
+    assert 89 <= mock_sleep.call_args.args[0] <= 90
+    # The quota is unknown again after the reset.
+    assert not limiter.has_state
+
+
+@patch.object(Session, "request")
+def test_rate_limited_session(mock_request: Mock) -> None:
+    mock_request.return_value = _response(X_RateLimit_Remaining="100")
+    token_bucket = Mock(spec=TokenBucket)
+    session = RateLimitedSession(
+        timeout=(1, 2),
+        rate_limiter=HeaderRateLimiter(),
+        token_bucket=token_bucket,
+    )
+
+    session.get("https://example.com/a")
+    session.get("https://example.com/b", timeout=5)
+
+    assert [c.kwargs["timeout"] for c in mock_request.call_args_list] == [(1, 2), 5]
+    assert token_bucket.acquire.call_count == 2
+    assert session.rate_limiter is not None and session.rate_limiter.has_state
+
+
+def test_fetch_concurrently() -> None:
+    threads = set()
+
+    def fetch(i: int) -> int:
+        threads.add(threading.get_ident())
+        # Make the first items finish last.
+        time.sleep((10 - i) / 1000)
+        return i * 2
+
+    assert list(fetch_concurrently(fetch, range(10), max_workers=4)) == [
+        i * 2 for i in range(10)
+    ]
+    assert threading.get_ident() not in threads
+
+    threads.clear()
+    assert list(fetch_concurrently(fetch, range(3), max_workers=1)) == [0, 2, 4]
+    assert threads == {threading.get_ident()}
@@ -0,0 +1,143 @@
+import json
+import threading
+from unittest import mock
+
+import pytest
+
+from cartography.client.core.tx import load_graph_data
+from cartography.profiling import get_profiler
+from cartography.profiling import query_id
+from cartography.profiling import set_profiler
+from cartography.profiling import SyncProfiler
+from cartography.util import timeit
+
+QUERY = "UNWIND $DictList AS item MERGE (n:Node{id: item.id})"
+
+
+@pytest.fixture
+def profiler():
+    profiler = SyncProfiler()
+    set_profiler(profiler)
+    yield profiler
+    set_profiler(None)
+
+
+def _summary(nodes_created, available_after=3, consumed_after=4):
+    summary = mock.MagicMock(
+        result_available_after=available_after,
+        result_consumed_after=consumed_after,
+    )
+    summary.counters = mock.MagicMock(
+        **{
+            "nodes_created": nodes_created,
+            "nodes_deleted": 0,
+            "relationships_created": 0,
+            "relationships_deleted": 0,
+            "properties_set": nodes_created,
+            "labels_added": 0,
+            "labels_removed": 0,
+            "indexes_added": 0,
+            "indexes_removed": 0,
+            "constraints_added": 0,
+            "constraints_removed": 0,
+        },
+    )
+    return summary
+
+
+@timeit
+def _sync_nodes(profiler):
+    profiler.record_query(QUERY, 0.5, rows=10, summary=_summary(10))
+    profiler.record_query(QUERY, 0.25, rows=5, summary=_summary(5))
+
+
+def test_profiler_records_stages_functions_and_queries(profiler):
+    with profiler.stage("aws"):
+        _sync_nodes(profiler)
+
+    report = profiler.report()
+    assert [(s["name"], s["status"]) for s in report["stages"]] == [("aws", "success")]
+    assert report["functions"][0]["name"] == f"{__name__}._sync_nodes"
+    assert report["functions"][0]["calls"] == 1
+    query = report["queries"][0]
+    assert query["id"] == query_id(QUERY)
+    assert query["calls"] == 2
+    assert query["rows"] == 15
+    assert query["wall_time_seconds"] == 0.75
+    assert query["result_available_after_ms"] == 6
+    assert query["result_consumed_after_ms"] == 8
+    assert query["counters"]["nodes_created"] == 15
+    assert query["counters"]["properties_set"] == 15
+
+    # Query time is attributed to the query frame, not to the enclosing function.
+    folded = dict(line.rsplit(" ", 1) for line in profiler.folded_stacks())
+    query_stack = f"aws;{__name__}._sync_nodes;cypher:{query_id(QUERY)}"
+    assert int(folded[query_stack]) == 750000
+    assert int(folded.get(f"aws;{__name__}._sync_nodes", 0)) < 750000
+
+
+def test_profiler_records_failed_stage(profiler):
+    with pytest.raises(RuntimeError):
+        with profiler.stage("gcp"):
+            raise RuntimeError("boom")
+
+    assert profiler.report()["stages"][0]["status"] == "failure"
+
+
+def test_profiler_stacks_are_per_thread(profiler):
+    def run_stage(name):
+        with profiler.stage(name):
+            profiler.record_query(QUERY, 0.1)
+
+    threads = [threading.Thread(target=run_stage, args=(n,)) for n in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stacks = {line.rsplit(" ", 1)[0] for line in profiler.folded_stacks()}
+    assert f"a;cypher:{query_id(QUERY)}" in stacks
+    assert f"b;cypher:{query_id(QUERY)}" in stacks
+    assert all(not s.startswith(("a;b", "b;a")) for s in stacks)
+
+
+def test_load_graph_data_records_batches(profiler):
+    tx = mock.MagicMock()
+    tx.run.return_value.consume.return_value = _summary(2)
+    session = mock.MagicMock()
+    session.write_transaction.side_effect = lambda func: func(tx)
+
+    load_graph_data(session, QUERY, [{"id": i} for i in range(250)], batch_size=100)
+
+    query = profiler.report()["queries"][0]
+    assert query["calls"] == 3
+    assert query["rows"] == 250
+    assert query["counters"]["nodes_created"] == 6
+    assert query["result_available_after_ms"] == 9
+    tx.run.assert_called_with(QUERY, {"DictList": [{"id": i} for i in range(200, 250)]})
+
+
+def test_load_graph_data_without_profiler():
+    assert get_profiler() is None
+    tx = mock.MagicMock()
+    session = mock.MagicMock()
+    session.write_transaction.side_effect = lambda func: func(tx)
+
+    load_graph_data(session, QUERY, [{"id": 1}], lastupdated=1)
+
+    tx.run.assert_called_once_with(QUERY, {"DictList": [{"id": 1}], "lastupdated": 1})
+    tx.run.return_value.consume.assert_not_called()
+
+
+def test_write_report(profiler, tmp_path):
+    with profiler.stage("aws"):
+        profiler.record_query(QUERY, 0.1, rows=1)
+
+    profiler.write_report(str(tmp_path / "profile.json"), update_tag=123)
+
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert report["update_tag"] == 123
+    assert report["queries"][0]["query"] == QUERY
+    assert (tmp_path / "profile.folded").read_text() == (
+        f"aws;cypher:{query_id(QUERY)} 100000\n"
+    )
@@ -1,8 +1,26 @@
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import re
+import threading
+from typing import Dict
+from typing import Set
+from unittest import mock
+
 import pytest
 
+import cartography.models
+from cartography.config import Config
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.profiling import get_profiler
 from cartography.sync import build_default_sync
 from cartography.sync import build_sync
 from cartography.sync import parse_and_validate_selected_modules
+from cartography.sync import run_with_config
+from cartography.sync import STAGE_DEPENDENCIES
 from cartography.sync import Sync
 from cartography.sync import TOP_LEVEL_MODULES
 
@@ -52,3 +70,201 @@ def test_parse_and_validate_selected_modules():
     absolute_garbage = "#@$@#RDFFHKjsdfkjsd,KDFJHW#@,"
     with pytest.raises(ValueError):
         parse_and_validate_selected_modules(absolute_garbage)
+
+
+def test_build_sync_dependencies():
+    sync = build_sync("create-indexes, aws, trivy, gcp, analysis")
+
+    assert sync._stage_dependencies == {
+        "create-indexes": set(),
+        "aws": {"create-indexes"},
+        "trivy": {"create-indexes", "aws"},
+        "gcp": {"create-indexes"},
+        "analysis": {"create-indexes", "aws", "trivy", "gcp"},
+    }
+
+
+def test_build_sync_dependencies_ignores_unselected_stages():
+    sync = build_sync("trivy, analysis")
+
+    assert sync._stage_dependencies == {"trivy": set(), "analysis": {"trivy"}}
+
+
+def test_add_stage_unknown_dependency():
+    sync = Sync()
+    with pytest.raises(ValueError):
+        sync.add_stage("trivy", mock.MagicMock(), depends_on=["aws"])
+
+
+def _stage_schemas(stage):
+    if stage not in {m.name for m in pkgutil.iter_modules(cartography.models.__path__)}:
+        return
+    package = importlib.import_module(f"cartography.models.{stage}")
+    modules = [package] + [
+        importlib.import_module(m.name)
+        for m in pkgutil.walk_packages(package.__path__, f"{package.__name__}.")
+    ]
+    for module in modules:
+        for v in vars(module).values():
+            if (
+                inspect.isclass(v)
+                and v.__module__ == module.__name__
+                and issubclass(v, (CartographyNodeSchema, CartographyRelSchema))
+                and not inspect.isabstract(v)
+            ):
+                yield v()
+
+
+def _labels_created_by_stage(stage):
+    labels = set()
+    for schema in _stage_schemas(stage):
+        if isinstance(schema, CartographyNodeSchema):
+            labels.add(schema.label)
+            if schema.extra_node_labels:
+                labels.update(schema.extra_node_labels.labels)
+    # Some modules still create nodes with handwritten Cypher, e.g. the Human nodes of the Okta sync.
+    intel_path = os.path.join(
+        os.path.dirname(cartography.models.__file__), "..", "intel", stage
+    )
+    paths = (
+        [intel_path + ".py"]
+        if os.path.isfile(intel_path + ".py")
+        else [
+            os.path.join(root, name)
+            for root, _, names in os.walk(intel_path)
+            for name in names
+            if name.endswith(".py")
+        ]
+    )
+    for path in paths:
+        with open(path) as f:
+            labels.update(re.findall(r"MERGE\s*\(\w*:(\w+)", f.read()))
+    return labels
+
+
+def _labels_matched_by_stage(stage):
+    labels = set()
+    for schema in _stage_schemas(stage):
+        if isinstance(schema, CartographyNodeSchema):
+            rels = (
+                list(schema.other_relationships.rels)
+                if schema.other_relationships
+                else []
+            )
+            if schema.sub_resource_relationship:
+                rels.append(schema.sub_resource_relationship)
+            labels.update(rel.target_node_label for rel in rels)
+        else:
+            # MatchLinks match both their source and their target nodes.
+            labels.update(
+                filter(None, (schema.source_node_label, schema.target_node_label))
+            )
+    return labels
+
+
+def test_stage_dependencies_cover_matched_labels():
+    """
+    A stage that attaches its nodes to nodes created by a stage that runs before it in the default sync must depend on
+    that stage, so that running stages concurrently with `--max-parallel-stages` never drops the relationships.
+    """
+    stages = [s for s in TOP_LEVEL_MODULES if s not in ("create-indexes", "analysis")]
+    created = {stage: _labels_created_by_stage(stage) for stage in stages}
+    dependencies: Dict[str, Set[str]] = {}
+    for stage in stages:
+        dependencies[stage] = set()
+        for dependency in STAGE_DEPENDENCIES.get(stage, []):
+            dependencies[stage] |= {dependency} | dependencies[dependency]
+
+    missing = set()
+    for i, stage in enumerate(stages):
+        for label in _labels_matched_by_stage(stage) - created[stage]:
+            for earlier_stage in stages[:i]:
+                if (
+                    label in created[earlier_stage]
+                    and earlier_stage not in dependencies[stage]
+                ):
+                    missing.add((stage, earlier_stage, label))
+    assert missing == set()
+
+
+def _make_config(max_parallel_stages):
+    return mock.MagicMock(
+        update_tag=1,
+        neo4j_database=None,
+        max_parallel_stages=max_parallel_stages,
+    )
+
+
+def test_run_sequential_single_session():
+    calls = []
+    sync = Sync()
+    sync.add_stage("a", lambda session, config: calls.append(("a", session)))
+    sync.add_stage("b", lambda session, config: calls.append(("b", session)))
+    driver = mock.MagicMock()
+
+    sync.run(driver, _make_config(1))
+
+    session = driver.session.return_value.__enter__.return_value
+    assert calls == [("a", session), ("b", session)]
+    driver.session.assert_called_once()
+
+
+def test_run_concurrent_respects_dependencies():
+    # Arrange: "a" and "b" can only both finish if they run at the same time, "c" must wait for both.
+    barrier = threading.Barrier(2, timeout=5)
+    finished = []
+
+    def independent_stage(name):
+        def stage(session, config):
+            barrier.wait()
+            finished.append(name)
+
+        return stage
+
+    def dependent_stage(session, config):
+        assert sorted(finished) == ["a", "b"]
+        finished.append("c")
+
+    sync = Sync()
+    sync.add_stage("a", independent_stage("a"))
+    sync.add_stage("b", independent_stage("b"))
+    sync.add_stage("c", dependent_stage, depends_on=["a", "b"])
+    driver = mock.MagicMock()
+
+    # Act
+    sync.run(driver, _make_config(2))
+
+    # Assert
+    assert finished[-1] == "c"
+    assert driver.session.call_count == 3
+
+
+def test_run_concurrent_stops_on_failure():
+    downstream = mock.MagicMock()
+    sync = Sync()
+    sync.add_stage("a", mock.MagicMock(side_effect=RuntimeError("boom")))
+    sync.add_stage("b", downstream, depends_on=["a"])
+
+    with pytest.raises(RuntimeError):
+        sync.run(mock.MagicMock(), _make_config(4))
+
+    downstream.assert_not_called()
+
+
+@mock.patch("cartography.sync.build_neo4j_driver")
+def test_run_with_config_writes_profile_report(mock_build_driver, tmp_path):
+    sync = Sync()
+    sync.add_stage("a", lambda session, config: None)
+    config = Config(
+        neo4j_uri="bolt://localhost:7687",
+        update_tag=1,
+        profile_report_path=str(tmp_path / "profile.json"),
+    )
+
+    assert run_with_config(sync, config) == 0
+
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert report["update_tag"] == 1
+    assert [stage["name"] for stage in report["stages"]] == ["a"]
+    assert (tmp_path / "profile.folded").exists()
+    assert get_profiler() is None
@@ -192,3 +192,52 @@ def test_run_analysis_and_ensure_deps_no_requirements(
         neo4j_session,
         common_job_parameters,
     )
+
+
+@mock.patch.object(cartography.util, "run_incremental_analysis_job", return_value=None)
+@mock.patch.object(cartography.util, "run_analysis_job", return_value=None)
+def test_run_analysis_and_ensure_deps_incremental(
+    mock_run_analysis_job: mock.MagicMock,
+    mock_run_incremental_analysis_job: mock.MagicMock,
+):
+    neo4j_session = mock.MagicMock()
+    common_job_parameters = {"UPDATE_TAG": 1, "incremental_analysis": True}
+
+    run_analysis_and_ensure_deps(
+        "aws_ec2_asset_exposure.json",
+        {"ec2:instance"},
+        {"ec2:instance"},
+        common_job_parameters,
+        neo4j_session,
+        sub_resource_parameter="AWS_ID",
+    )
+
+    mock_run_analysis_job.assert_not_called()
+    mock_run_incremental_analysis_job.assert_called_once_with(
+        "aws_ec2_asset_exposure.json",
+        neo4j_session,
+        common_job_parameters,
+        "AWS_ID",
+    )
+
+
+@mock.patch.object(cartography.util, "run_scoped_analysis_job", return_value=None)
+def test_run_incremental_analysis_job(mock_run_scoped_analysis_job: mock.MagicMock):
+    neo4j_session = mock.MagicMock()
+    neo4j_session.run.return_value = [{"id": "000000000001"}, {"id": "000000000002"}]
+
+    util.run_incremental_analysis_job(
+        "aws_ec2_asset_exposure.json",
+        neo4j_session,
+        {"UPDATE_TAG": 1},
+        "AWS_ID",
+    )
+
+    # Only the accounts updated by this sync are analyzed, each with its own AWS_ID.
+    query = neo4j_session.run.call_args.args[0]
+    assert "MATCH (s:AWSAccount)" in query
+    assert neo4j_session.run.call_args.kwargs == {"UPDATE_TAG": 1}
+    assert [c.args[2] for c in mock_run_scoped_analysis_job.call_args_list] == [
+        {"UPDATE_TAG": 1, "AWS_ID": "000000000001"},
+        {"UPDATE_TAG": 1, "AWS_ID": "000000000002"},
+    ]
@@ -1,8 +1,21 @@
+import tempfile
+from unittest.mock import patch
+
 import pytest
 
+from cartography.driftdetect.config import GetDriftConfig
+from cartography.driftdetect.detect_deviations import _to_drift
+from cartography.driftdetect.detect_deviations import iter_added_results
+from cartography.driftdetect.detect_deviations import merge_sorted_runs
 from cartography.driftdetect.detect_deviations import perform_drift_detection
+from cartography.driftdetect.detect_deviations import run_drift_detection
+from cartography.driftdetect.detect_deviations import sort_results_on_disk
+from cartography.driftdetect.model import State
 from cartography.driftdetect.serializers import StateSchema
+from cartography.driftdetect.storage import _JSONObjectStream
 from cartography.driftdetect.storage import FileSystem
+from cartography.driftdetect.storage import SQLITE_STATE_FILENAME
+from cartography.driftdetect.storage import SQLiteStateStore
 
 
 def test_basic_drift_detection():
@@ -37,3 +50,150 @@ def test_drift_detection_errors():
     start_state.validation_query = "Invalid Validation Query"
     with pytest.raises(ValueError):
         perform_drift_detection(start_state, end_state)
+
+
+def test_sqlite_state_store(tmp_path):
+    start_state = StateSchema().load(
+        FileSystem.load("tests/data/test_cli_detectors/detector/1.json"),
+    )
+    end_state = StateSchema().load(
+        FileSystem.load("tests/data/test_cli_detectors/detector/2.json"),
+    )
+    with SQLiteStateStore(str(tmp_path / SQLITE_STATE_FILENAME)) as store:
+        assert store.save_state(start_state, "1")
+        assert store.save_state(end_state, "2")
+        # Unchanged results are deduplicated.
+        assert not store.save_state(end_state, "3")
+        assert store.list_snapshots() == ["1", "2", "3"]
+
+        loaded = store.load_state("1")
+        assert loaded.name == start_state.name
+        assert loaded.properties == start_state.properties
+        assert loaded.results == sorted(start_state.results)
+
+        assert store.add_shortcut("baseline", "1")
+        assert store.add_shortcut("most-recent", "3")
+        assert not store.add_shortcut("missing", "4")
+        assert store.resolve("baseline") == "1"
+        assert list(store.iter_added_results("2", "most-recent")) == []
+
+        new_results, missing_results = perform_drift_detection(start_state, end_state)
+        assert [
+            _to_drift(r) for r in sorted(store.iter_added_results("baseline", "2"))
+        ] == sorted(new_results)
+        assert [
+            _to_drift(r) for r in sorted(store.iter_added_results("2", "baseline"))
+        ] == sorted(missing_results)
+
+
+def test_sqlite_state_store_keeps_duplicate_results(tmp_path):
+    start_state = StateSchema().load(
+        FileSystem.load("tests/data/test_cli_detectors/detector/1.json"),
+    )
+    end_state = StateSchema().load(
+        FileSystem.load("tests/data/test_cli_detectors/detector/1.json"),
+    )
+    added = ["36", "37", "38|39|40"]
+    end_state.results = end_state.results + end_state.results[:1] + [added, added]
+    with SQLiteStateStore(str(tmp_path / SQLITE_STATE_FILENAME)) as store:
+        store.save_state(start_state, "1")
+        # A state that only differs by the number of times a result occurs has different results.
+        assert store.save_state(end_state, "2")
+
+        assert store.load_state("2").results == sorted(end_state.results)
+        # Like with JSON states, every duplicate of an added result is reported.
+        new_results, _ = perform_drift_detection(start_state, end_state)
+        assert [_to_drift(r) for r in store.iter_added_results("1", "2")] == sorted(
+            new_results,
+        )
+        assert len(new_results) == 2
+
+
+@patch("cartography.driftdetect.detect_deviations.report_drift")
+def test_run_drift_detection_sqlite(mock_report_drift, tmp_path):
+    with SQLiteStateStore(str(tmp_path / SQLITE_STATE_FILENAME)) as store:
+        for snapshot in ("1", "2"):
+            store.save_state(
+                StateSchema().load(
+                    FileSystem.load(
+                        f"tests/data/test_cli_detectors/detector/{snapshot}.json",
+                    ),
+                ),
+                f"{snapshot}.json",
+            )
+        store.add_shortcut("most-recent", "2.json")
+
+    run_drift_detection(
+        GetDriftConfig(str(tmp_path), "1.json", "most-recent", state_store="sqlite"),
+    )
+
+    new_results, missing_results, name, properties = mock_report_drift.call_args.args
+    assert ["36", "37", ["38", "39", "40"]] in new_results
+    assert ["7", "14", ["21", "28", "35"]] in missing_results
+    assert name == "Test-Multiple-Properties"
+
+
+def test_json_state_streaming_reader(tmp_path):
+    path = "tests/data/test_cli_detectors/detector/1.json"
+    data = FileSystem.load(path)
+    assert list(FileSystem.iter_results(path)) == data["results"]
+    assert FileSystem.load_header(path) == {**data, "results": []}
+
+    # Values that span chunk boundaries are read correctly, also from files written by FileSystem.write().
+    state_path = str(tmp_path / "state.json")
+    results = [[str(i), "a" * (i % 7), "x|y"] for i in range(1000)]
+    FileSystem.write({**data, "results": results, "count": 12345}, state_path)
+    with open(state_path) as f:
+        stream = _JSONObjectStream(f, chunk_size=3)
+        items = {
+            key: list(value) if key == "results" else value
+            for key, value in stream.items("results")
+        }
+    assert items["results"] == results
+    assert items["count"] == 12345
+
+
+def test_streaming_drift_detection(tmp_path):
+    start_results = [[str(i % 50), str(i)] for i in range(300)]
+    end_results = [[str(i % 50), str(i)] for i in range(100, 400)] + [["0", "100"]]
+    with tempfile.TemporaryDirectory(dir=tmp_path) as directory:
+        start_runs = sort_results_on_disk(iter(start_results), directory, run_size=7)
+        end_runs = sort_results_on_disk(end_results, directory, run_size=7)
+        assert len(start_runs) == 43
+        assert list(merge_sorted_runs(start_runs)) == sorted(start_results)
+
+        added = list(
+            iter_added_results(
+                merge_sorted_runs(start_runs), merge_sorted_runs(end_runs)
+            ),
+        )
+        missing = list(
+            iter_added_results(
+                merge_sorted_runs(end_runs), merge_sorted_runs(start_runs)
+            ),
+        )
+    start_state = State("q", "MATCH (n) RETURN n", ["a", "b"], start_results)
+    end_state = State("q", "MATCH (n) RETURN n", ["a", "b"], end_results)
+    new_results, missing_results = perform_drift_detection(start_state, end_state)
+    assert added == sorted(new_results)
+    assert missing == sorted(missing_results)
+
+
+@patch("cartography.driftdetect.detect_deviations.report_drift_streaming")
+def test_run_streaming_drift_detection(mock_report_drift_streaming):
+    reported = []
+    mock_report_drift_streaming.side_effect = lambda new, missing, name, props: (
+        reported.extend([list(new), list(missing), name])
+    )
+    run_drift_detection(
+        GetDriftConfig(
+            "tests/data/test_cli_detectors/detector",
+            "1.json",
+            "most-recent",
+            streaming=True,
+        ),
+    )
+    new_results, missing_results, name = reported
+    assert ["36", "37", ["38", "39", "40"]] in new_results
+    assert ["7", "14", ["21", "28", "35"]] in missing_results
+    assert name == "Test-Multiple-Properties"
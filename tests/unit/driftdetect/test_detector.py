@@ -1,8 +1,13 @@
 from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import neo4j
 
 from cartography.client.core.tx import read_list_of_dicts_tx
+from cartography.driftdetect.config import UpdateConfig
 from cartography.driftdetect.detect_deviations import compare_states
 from cartography.driftdetect.get_states import get_state
+from cartography.driftdetect.get_states import run_get_states
 from cartography.driftdetect.model import State
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
@@ -226,3 +231,46 @@ def test_json_loader():
     assert state.name == "Test-Expectations"
     assert state.validation_query == "MATCH (d) RETURN d.test"
     assert state.results == [["1"], ["2"], ["3"], ["4"], ["5"], ["6"]]
+
+
+@patch("cartography.driftdetect.get_states.GraphDatabase")
+def test_run_get_states_concurrently(mock_graph_database, tmp_path):
+    """
+    Test that every query directory gets a new state when the queries run concurrently, each in its own read session.
+    """
+    query_directories = [tmp_path / f"query-{i}" for i in range(5)]
+    for i, query_directory in enumerate(query_directories):
+        query_directory.mkdir()
+        FileSystem.write(
+            {
+                "name": f"query-{i}",
+                "validation_query": f"MATCH (d) RETURN {i} AS n",
+                "properties": [],
+                "results": [],
+            },
+            str(query_directory / "template.json"),
+        )
+        FileSystem.write(
+            {"name": f"query-{i}", "shortcuts": {}},
+            str(query_directory / "shortcut.json"),
+        )
+    mock_driver = mock_graph_database.driver.return_value
+    mock_session = mock_driver.session.return_value.__enter__.return_value
+    mock_session.read_transaction.return_value = [{"n": "1"}, {"n": "2"}]
+
+    run_get_states(
+        UpdateConfig(str(tmp_path), "bolt://localhost:7687", max_concurrent_queries=3),
+    )
+
+    assert mock_driver.session.call_count == len(query_directories)
+    for call in mock_driver.session.call_args_list:
+        assert call.kwargs == {"default_access_mode": neo4j.READ_ACCESS}
+    for query_directory in query_directories:
+        shortcut = FileSystem.load(str(query_directory / "shortcut.json"))
+        state = StateSchema().load(
+            FileSystem.load(
+                str(query_directory / shortcut["shortcuts"]["most-recent"]),
+            ),
+        )
+        assert state.results == [["1"], ["2"]]
+        assert not list(query_directory.glob("*.tmp"))